@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from typing import Any, Mapping, NamedTuple, Union
+
+from app.models import Bind, Hotkey, Settings
+
+# Events DataStore hands to its subscribers after a mutation (see
+# DataStore.subscribe). Listeners get them in order, batched per mutation
+# or per transaction().
+
+
+class BindAdded(NamedTuple):
+    profile_id: str
+    bind: Bind
+
+
+class BindUpdated(NamedTuple):
+    profile_id: str
+    bind: Bind
+    previous: Bind
+
+
+class BindDeleted(NamedTuple):
+    profile_id: str
+    bind: Bind
+
+
+class HotkeysChanged(NamedTuple):
+    profile_id: str
+    hotkeys: tuple[Hotkey, ...]
+
+
+class SettingsChanged(NamedTuple):
+    profile_id: str
+    settings: Settings
+    previous: Settings
+
+
+class VariablesChanged(NamedTuple):
+    profile_id: str
+    variables: Mapping[str, Any]
+
+
+class ActiveProfileChanged(NamedTuple):
+    profile_id: str
+
+
+class ProfilesChanged(NamedTuple):
+    # A profile was added, renamed, imported or deleted.
+    profile_id: str
+
+
+Change = Union[
+    BindAdded,
+    BindUpdated,
+    BindDeleted,
+    HotkeysChanged,
+    SettingsChanged,
+    VariablesChanged,
+    ActiveProfileChanged,
+    ProfilesChanged,
+]
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from typing import Any, Callable
+
+# A stuck key (key-up lost to a UAC prompt or a focus change) must not
+# poison every later chord; no real chord holds this many keys.
+MAX_PRESSED = 8
+
+
+class ChordDispatcher:
+    """
+    Resolves hotkey chords from a single key hook.
+
+    Every key of every registered combo is mapped to one canonical scan code
+    (``ctrl`` has separate left/right codes, for example), the pressed set is
+    kept in canonical codes and a chord lookup is one frozenset hash, so the
+    per-keystroke cost does not grow with the number of hotkeys. Only keys
+    that appear in some chord (``codes``) are tracked; the hook can skip the
+    key-ups of every other key.
+    """
+
+    def __init__(self, parse_hotkey: Callable[[str], Any]) -> None:
+        self._parse = parse_hotkey
+        self._canonical: dict[int, int] = {}
+        self._table: dict[frozenset[int], Callable[[], None]] = {}
+        self._pressed: set[int] = set()
+        self.codes: frozenset[int] = frozenset()
+
+    def set_bindings(self, bindings: dict[str, Callable[[], None]]) -> list[str]:
+        """Replaces the chord table; returns combos that could not be parsed."""
+        canonical: dict[int, int] = {}
+        table: dict[frozenset[int], Callable[[], None]] = {}
+        invalid: list[str] = []
+        for combo, callback in bindings.items():
+            try:
+                steps = self._parse(combo)
+            except Exception:
+                invalid.append(combo)
+                continue
+            # Multi-step sequences ("ctrl+k, c") are not chords.
+            if len(steps) != 1:
+                invalid.append(combo)
+                continue
+            keys: set[int] = set()
+            for alternatives in steps[0]:
+                if not alternatives:
+                    continue
+                code = canonical.setdefault(alternatives[0], alternatives[0])
+                for alternative in alternatives[1:]:
+                    canonical.setdefault(alternative, code)
+                keys.add(code)
+            if keys:
+                table[frozenset(keys)] = callback
+            else:
+                invalid.append(combo)
+        self._canonical = canonical
+        self.codes = frozenset(canonical)
+        self._table = table
+        self._pressed.clear()
+        return invalid
+
+    def press(self, scan_code: int) -> bool:
+        """Registers a key-down; runs and reports the chord it completes."""
+        code = self._canonical.get(scan_code)
+        if code is None:
+            return False  # not part of any chord
+        if code in self._pressed:
+            return False  # auto-repeat
+        if len(self._pressed) >= MAX_PRESSED:
+            self._pressed.clear()
+        self._pressed.add(code)
+        callback = self._table.get(frozenset(self._pressed))
+        if callback is None:
+            return False
+        callback()
+        return True
+
+    def release(self, scan_code: int) -> None:
+        self._pressed.discard(self._canonical.get(scan_code, scan_code))
+
+    def reset(self) -> None:
+        self._pressed.clear()
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 
@@ -12,3 +13,17 @@ LOG_DIR = DATA_DIR / "logs"
 LOG_FILE = LOG_DIR / "events.jsonl"
 APP_LOG_FILE = LOG_DIR / "app.log"
 PROFILES_FILE = DATA_DIR / "profiles.json"
+USAGE_FILE = DATA_DIR / "usage.json"
+
+# Run the keyboard hook in a separate process (see app/engine_process.py).
+ENGINE_PROCESS = os.environ.get("BINDER_ENGINE_PROCESS", "") == "1"
+
+# profiles storage: "json" (single profiles.json), "journal" (profiles.json
+# snapshot + append-only profiles.journal), "sharded" (index + one file per
+# profile under data/profiles/) or "sqlite" (data/profiles.db). The other
+# layouts pick up an existing profiles.json on first start.
+STORAGE_BACKEND = os.environ.get("BINDER_STORAGE", "json")
+
+# Binary profiles.cache next to profiles.json (json backend), so unchanged
+# data starts without re-parsing the JSON; see app/snapshot_cache.py.
+SNAPSHOT_CACHE = os.environ.get("BINDER_SNAPSHOT_CACHE", "1") != "0"
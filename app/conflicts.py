@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, NamedTuple
+
+from app.hotkeys import SETTINGS_HOTKEY_LABELS, normalize_hotkey
+from app.layout import convert_layout
+
+# Profile id used for data that is being imported and not stored yet.
+IMPORT_ID = "__import__"
+
+
+class Claim(NamedTuple):
+    kind: str  # "trigger" | "hotkey" | "settings" | "commit"
+    profile_id: str
+    item_id: str
+    label: str
+
+
+def trigger_keys(trigger: str) -> set[str]:
+    value = str(trigger or "").strip().lower()
+    if not value:
+        return set()
+    # With auto_layout on, a trigger typed in the wrong layout still fires.
+    return {value, convert_layout(value)}
+
+
+def hotkey_keys(combo: str) -> set[str]:
+    value = normalize_hotkey(str(combo or ""))
+    if not value:
+        return set()
+    return {value, normalize_hotkey(convert_layout(value))}
+
+
+class ConflictIndex:
+    """
+    Key -> claims over every profile: macro hotkeys, settings hotkeys, commit
+    keys and triggers (with their layout-converted forms). Updated per item,
+    so a lookup is one dict access instead of a scan over the profiles.
+    """
+
+    def __init__(self, profiles: Iterable[dict[str, Any]] = ()) -> None:
+        self._by_key: dict[str, dict[tuple[str, str, str], Claim]] = {}
+        self._owned: dict[tuple[str, str, str], tuple[set[str], Claim]] = {}
+        # profile id -> kind -> owners, so dropping a profile or its commit
+        # keys touches only that profile's claims.
+        self._by_profile: dict[str, dict[str, set[tuple[str, str, str]]]] = {}
+        self._profile_names: dict[str, str] = {}
+        for profile in profiles:
+            self.set_profile(profile)
+
+    def set_profile(self, profile: dict[str, Any]) -> None:
+        profile_id = str(profile.get("id", ""))
+        self.remove_profile(profile_id)
+        self._profile_names[profile_id] = str(profile.get("name", ""))
+        # Imported lists may lack ids; fall back to the position.
+        for index, bind in enumerate(profile.get("binds", []) or []):
+            self.set_bind(profile_id, {"id": f"#{index}", **bind})
+        for index, hotkey in enumerate(profile.get("hotkeys", []) or []):
+            self.set_hotkey(profile_id, {"id": f"#{index}", **hotkey})
+        self.set_settings(profile_id, profile.get("settings", {}) or {})
+
+    def rename_profile(self, profile_id: str, name: str) -> None:
+        self._profile_names[profile_id] = name
+
+    def remove_profile(self, profile_id: str) -> None:
+        self._profile_names.pop(profile_id, None)
+        for owners in list(self._by_profile.get(profile_id, {}).values()):
+            for owner in list(owners):
+                self._drop(owner)
+
+    def profile_name(self, profile_id: str) -> str:
+        return self._profile_names.get(profile_id, "")
+
+    def set_bind(self, profile_id: str, bind: dict[str, Any]) -> None:
+        bind_id = str(bind.get("id", ""))
+        claim = Claim("trigger", profile_id, bind_id, str(bind.get("title", "") or bind.get("trigger", "")))
+        self._claim(claim, trigger_keys(bind.get("trigger", "")))
+
+    def remove_bind(self, profile_id: str, bind_id: str) -> None:
+        self._drop((profile_id, "trigger", bind_id))
+
+    def set_hotkey(self, profile_id: str, hotkey: dict[str, Any]) -> None:
+        hotkey_id = str(hotkey.get("id", ""))
+        claim = Claim("hotkey", profile_id, hotkey_id, str(hotkey.get("title", "")))
+        self._claim(claim, hotkey_keys(hotkey.get("hotkey", "")))
+
+    def remove_hotkey(self, profile_id: str, hotkey_id: str) -> None:
+        self._drop((profile_id, "hotkey", hotkey_id))
+
+    def set_settings(self, profile_id: str, settings: dict[str, Any]) -> None:
+        hotkeys = settings.get("hotkeys", {}) or {}
+        for key, label in SETTINGS_HOTKEY_LABELS.items():
+            self._claim(Claim("settings", profile_id, key, label), hotkey_keys(hotkeys.get(key, "")))
+        commit_keys = set(settings.get("commit_keys", []) or [])
+        commits = self._by_profile.get(profile_id, {}).get("commit", ())
+        for owner in [owner for owner in commits if owner[2] not in commit_keys]:
+            self._drop(owner)
+        for key in commit_keys:
+            self._claim(Claim("commit", profile_id, key, key), {normalize_hotkey(key)})
+
+    def lookup(self, keys: Iterable[str], exclude: tuple[str, str, str] | None = None) -> list[Claim]:
+        found: dict[tuple[str, str, str], Claim] = {}
+        for key in keys:
+            for owner, claim in self._by_key.get(key, {}).items():
+                if owner != exclude:
+                    found[owner] = claim
+        return list(found.values())
+
+    def hotkey_conflicts(self, combo: str, exclude: tuple[str, str, str] | None = None) -> list[Claim]:
+        keys = hotkey_keys(combo)
+        claims = self.lookup(keys, exclude)
+        # Multi-key chords never collide with typed triggers or commit keys.
+        if all("+" in key for key in keys):
+            claims = [claim for claim in claims if claim.kind in {"hotkey", "settings"}]
+        return claims
+
+    def trigger_conflicts(self, trigger: str, exclude: tuple[str, str, str] | None = None) -> list[Claim]:
+        return self.lookup(trigger_keys(trigger), exclude)
+
+    def report(self, profile_data: dict[str, Any], profile_id: str | None = None) -> list[dict[str, Any]]:
+        """
+        Conflicts an import would introduce: clashes inside the imported data
+        itself and, when merging, with the target profile.
+        """
+        incoming = ConflictIndex([{**profile_data, "id": IMPORT_ID}])
+        results: list[dict[str, Any]] = []
+        seen: set[frozenset] = set()
+        for owner, (keys, claim) in incoming._owned.items():
+            others = incoming.lookup(keys, exclude=owner)
+            if profile_id is not None:
+                others += [other for other in self.lookup(keys) if other.profile_id == profile_id]
+            for other in others:
+                if claim.kind == other.kind == "commit":
+                    continue
+                pair = frozenset({owner, (other.profile_id, other.kind, other.item_id)})
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                results.append(
+                    {
+                        "kind": claim.kind,
+                        "label": claim.label,
+                        "other_kind": other.kind,
+                        "other_label": other.label,
+                        "existing": other.profile_id != IMPORT_ID,
+                    }
+                )
+        return results
+
+    def _claim(self, claim: Claim, keys: set[str]) -> None:
+        owner = (claim.profile_id, claim.kind, claim.item_id)
+        self._drop(owner)
+        if not keys:
+            return
+        self._owned[owner] = (keys, claim)
+        self._by_profile.setdefault(claim.profile_id, {}).setdefault(claim.kind, set()).add(owner)
+        for key in keys:
+            self._by_key.setdefault(key, {})[owner] = claim
+
+    def _drop(self, owner: tuple[str, str, str]) -> None:
+        entry = self._owned.pop(owner, None)
+        if entry is None:
+            return
+        kinds = self._by_profile[owner[0]]
+        kinds[owner[1]].discard(owner)
+        if not kinds[owner[1]]:
+            del kinds[owner[1]]
+            if not kinds:
+                del self._by_profile[owner[0]]
+        for key in entry[0]:
+            claims = self._by_key.get(key)
+            if claims is None:
+                continue
+            claims.pop(owner, None)
+            if not claims:
+                del self._by_key[key]
@@ -1,16 +1,212 @@
-import json
-from copy import deepcopy
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timezone
+from functools import wraps
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
 from uuid import uuid4
 
-from app.config import DATA_DIR, PROFILES_FILE
+from app.changes import (
+    ActiveProfileChanged,
+    BindAdded,
+    BindDeleted,
+    BindUpdated,
+    Change,
+    HotkeysChanged,
+    ProfilesChanged,
+    SettingsChanged,
+    VariablesChanged,
+)
+from app.config import PROFILES_FILE
+from app.conflicts import ConflictIndex
+from app.file_watcher import FileWatcher
+from app.frozen import freeze
+from app.models import Bind, Hotkey, Profile, Record, Settings
+from app.storage import JsonFileStorage, ShardedStorage, SqliteStorage, full_ops, open_storage, profile_header
+
+# Mutations within this window are written to disk together.
+SAVE_DELAY = 0.5
+
+
+def _locked(method):
+    # Mutations hold the store lock so the writer thread never serializes a
+    # half-applied change; subscribers are called after it is released.
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            result = method(self, *args, **kwargs)
+        self._dispatch()
+        return result
+
+    return wrapper
+
+
+class _Positions:
+    """
+    id -> position over a stored tuple of records. Tuples are never mutated:
+    each change returns a new tuple that shares every untouched record.
+    """
+
+    __slots__ = ("positions",)
+
+    def __init__(self, items: tuple) -> None:
+        self.positions = {item.id: idx for idx, item in enumerate(items)}
+
+    def get(self, items: tuple, item_id: str | None) -> Record | None:
+        idx = self.positions.get(item_id)
+        return None if idx is None else items[idx]
+
+    def appended(self, items: tuple, item: Record) -> tuple:
+        self.positions[item.id] = len(items)
+        return items + (item,)
+
+    def replaced(self, items: tuple, item: Record) -> tuple | None:
+        idx = self.positions.get(item.id)
+        if idx is None:
+            return None
+        return items[:idx] + (item,) + items[idx + 1 :]
+
+    def removed(self, items: tuple, item_id: str) -> tuple | None:
+        idx = self.positions.pop(item_id, None)
+        if idx is None:
+            return None
+        items = items[:idx] + items[idx + 1 :]
+        for position in range(idx, len(items)):
+            self.positions[items[position].id] = position
+        return items
+
+    def merged(self, items: tuple, records: list[Record]) -> tuple[tuple, list[Record | None]]:
+        """Replaces or appends many records at once; returns what each one replaced."""
+        merged = list(items)
+        previous: list[Record | None] = []
+        for item in records:
+            idx = self.positions.get(item.id)
+            if idx is None:
+                self.positions[item.id] = len(merged)
+                merged.append(item)
+                previous.append(None)
+            else:
+                previous.append(merged[idx])
+                merged[idx] = item
+        return tuple(merged), previous
 
 
 class DataStore:
-    def __init__(self, path: Path = PROFILES_FILE) -> None:
+    def __init__(
+        self,
+        path: Path = PROFILES_FILE,
+        save_delay: float = SAVE_DELAY,
+        storage: JsonFileStorage | ShardedStorage | SqliteStorage | None = None,
+    ) -> None:
         self.path = path
+        self._storage = storage or open_storage(path)
+        self._lock = threading.RLock()
+        self._save_cond = threading.Condition(self._lock)
+        # Held across serialize + write so two writes never land out of order.
+        self._io_lock = threading.Lock()
+        self._save_delay = save_delay
+        self._dirty_since: float | None = None
+        self._writer: threading.Thread | None = None
+        self._closed = False
+        # Changes since the last save, in order (see app/storage.py).
+        self._ops: list[tuple] = []
+        # Open transaction() blocks; saves are held back until the last one ends.
+        self._batch_depth = 0
+        self._batch_dirty = False
+        self._listeners: list[Callable[[list[Change]], None]] = []
+        self._events: list[Change] = []
+        self._watcher: FileWatcher | None = None
         self.data = self._load()
+        # Template IR by bind content when the storage had it cached.
+        self.template_ir: dict[str, tuple] = getattr(self._storage, "template_ir", {})
+        self._reindex(loaded=not self._storage.lazy)
+        # Profiles as last read from or written to the storage: the common
+        # base when an external change is merged with pending edits.
+        self._saved_profiles: tuple = self.data["profiles"]
+        if self._storage.lazy:
+            self.get_active_profile()
+
+    def _reindex(self, loaded: bool = True) -> None:
+        # With a lazy storage the profiles start as headers; a profile is
+        # loaded and indexed (self._binds holds its id) on first access.
+        self.data["profiles"] = profiles = tuple(Profile.from_dict(p) for p in self.data.get("profiles", []))
+        self._profiles = _Positions(profiles)
+        self._binds: dict[str, _Positions] = {}
+        self._hotkeys: dict[str, _Positions] = {}
+        # profile id -> trigger -> {bind id: bind}
+        self._triggers: dict[str, dict[str, dict[str, Bind]]] = {}
+        self._conflicts: ConflictIndex | None = None
+        if loaded:
+            for profile in profiles:
+                self._index_profile(profile)
+
+    @property
+    def conflicts(self) -> ConflictIndex:
+        # Built on first use. Profiles a lazy storage has not loaded yet are
+        # indexed from its light claims view and replaced once they load.
+        with self._lock:
+            if self._conflicts is None:
+                self._conflicts = ConflictIndex(
+                    profile
+                    if profile.id in self._binds
+                    else self._storage.load_claims(profile.id, profile_header(profile))
+                    for profile in self.data["profiles"]
+                )
+            return self._conflicts
+
+    def _lookup(self, profile_id: str | None) -> Profile | None:
+        profile = self._profiles.get(self.data["profiles"], profile_id)
+        if profile is None or profile.id in self._binds:
+            return profile
+        with self._lock:
+            profile = self._profiles.get(self.data["profiles"], profile_id)
+            if profile is None or profile.id in self._binds:
+                return profile
+            profile = Profile.from_dict(self._storage.load_profile(profile.id, profile_header(profile)))
+            self.data["profiles"] = self._profiles.replaced(self.data["profiles"], profile)
+            self._index_profile(profile)
+            if self._conflicts is not None:
+                self._conflicts.set_profile(profile)
+            return profile
+
+    def _index_profile(self, profile: Profile) -> None:
+        profile_id = profile.id
+        self._binds[profile_id] = _Positions(profile.binds)
+        self._hotkeys[profile_id] = _Positions(profile.hotkeys)
+        triggers: dict[str, dict[str, Bind]] = {}
+        for bind in profile.binds:
+            triggers.setdefault(bind.trigger, {})[bind.id] = bind
+        self._triggers[profile_id] = triggers
+
+    def _unindex_profile(self, profile_id: str) -> None:
+        self._binds.pop(profile_id, None)
+        self._hotkeys.pop(profile_id, None)
+        self._triggers.pop(profile_id, None)
+
+    def _index_trigger(self, profile_id: str, bind: Bind) -> None:
+        self._triggers[profile_id].setdefault(bind.trigger, {})[bind.id] = bind
+
+    def _unindex_trigger(self, profile_id: str, bind: Bind) -> None:
+        triggers = self._triggers[profile_id]
+        trigger = bind.trigger
+        same = triggers.get(trigger)
+        if same is None:
+            return
+        same.pop(bind.id, None)
+        if not same:
+            del triggers[trigger]
+
+    def _put_profile(self, profile: Profile) -> None:
+        profiles = self.data["profiles"]
+        updated = self._profiles.replaced(profiles, profile)
+        self.data["profiles"] = updated if updated is not None else self._profiles.appended(profiles, profile)
+
+    def _touch(self, profile: Profile, **changes) -> Profile:
+        profile = profile.replace(updated_at=datetime.now(timezone.utc).isoformat(), **changes)
+        self._put_profile(profile)
+        self._ops.append(("profile_meta", profile.id, profile))
+        return profile
 
     def _default_data(self) -> dict:
         now = datetime.now(timezone.utc).isoformat()
@@ -29,10 +225,13 @@ class DataStore:
                         "binder_enabled": True,
                         "allow_no_prefix": False,
                         "auto_layout": True,
+                        "autocomplete": False,
+                        "autocomplete_limit": 5,
                         "hotkeys": {
                             "toggle": "Ctrl+Alt+B",
                             "open": "Ctrl+Alt+M",
                             "profile_switch": "",
+                            "macro_cancel": "",
                         },
                         "apps_filter": {
                             "only": "",
@@ -78,202 +277,599 @@ class DataStore:
         }
 
     def _load(self) -> dict:
-        if not self.path.exists():
-            DATA_DIR.mkdir(parents=True, exist_ok=True)
+        data = self._storage.load()
+        if data is None:
             data = self._default_data()
-            self._save(data)
-            return data
-        with self.path.open("r", encoding="utf-8") as handle:
-            return json.load(handle)
-
-    def _save(self, data: dict | None = None) -> None:
-        payload = data or self.data
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
-        with self.path.open("w", encoding="utf-8") as handle:
-            json.dump(payload, handle, ensure_ascii=False, indent=2)
-
-    def get_active_profile(self) -> dict:
-        profile_id = self.data.get("active_profile_id")
-        for profile in self.data.get("profiles", []):
-            if profile["id"] == profile_id:
-                return profile
-        return self.data.get("profiles", [self._default_data()["profiles"][0]])[0]
+            self._storage.write(data, full_ops(data))
+        return data
 
-    def list_profiles(self) -> list[dict]:
-        return deepcopy(self.data.get("profiles", []))
+    @contextmanager
+    def transaction(self) -> Iterator["DataStore"]:
+        """
+        Groups mutations: they are applied under the store lock, saved once at
+        the end, and rolled back together if the block raises.
+        """
+        with self._lock:
+            data, loaded = dict(self.data), set(self._binds)
+            op_count, event_count = len(self._ops), len(self._events)
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._rollback(data, loaded, op_count, event_count)
+                raise
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth and self._batch_dirty:
+                    self._batch_dirty = False
+                    self._save()
+        self._dispatch()
 
-    def list_binds(self, profile_id: str | None = None) -> list[dict]:
-        profile = self.get_profile(profile_id)
-        return deepcopy(profile.get("binds", []))
+    def _rollback(self, data: dict, loaded: set[str], op_count: int, event_count: int) -> None:
+        self.data = data
+        del self._ops[op_count:]
+        del self._events[event_count:]
+        self._reindex(loaded=False)
+        for profile in self.data["profiles"]:
+            if profile.id in loaded:
+                self._index_profile(profile)
+
+    def subscribe(self, listener: Callable[[list[Change]], None]) -> None:
+        """Registers a listener for change events (app/changes.py)."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[list[Change]], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _dispatch(self) -> None:
+        with self._lock:
+            if self._batch_depth or not self._events:
+                return
+            events, self._events = self._events, []
+        for listener in list(self._listeners):
+            listener(events)
+
+    def _save(self) -> None:
+        """
+        Marks the store dirty; the writer thread persists it shortly. A
+        journaled storage gets the ops right away (called with the store lock
+        held, so they land in order) and the writer only compacts.
+        """
+        if self._batch_depth:
+            self._batch_dirty = True
+            return
+        append = getattr(self._storage, "append", None)
+        if append is not None:
+            ops, self._ops = self._ops, []
+            try:
+                if not append(ops):
+                    return
+            except OSError:
+                # Kept for the writer; the next compaction saves them.
+                self._ops[:0] = ops
+        with self._save_cond:
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+            if self._writer is None and not self._closed:
+                self._writer = threading.Thread(target=self._writer_loop, name="binder-store-writer", daemon=True)
+                self._writer.start()
+            self._save_cond.notify()
+
+    def flush(self) -> None:
+        """Writes pending changes synchronously (e.g. on exit)."""
+        self._write_pending()
+
+    def close(self) -> None:
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        with self._save_cond:
+            self._closed = True
+            self._save_cond.notify()
+        self.flush()
+        self._storage.close()
+
+    def _writer_loop(self) -> None:
+        while True:
+            with self._save_cond:
+                while self._dirty_since is None and not self._closed:
+                    self._save_cond.wait()
+                if self._closed:
+                    return
+                remaining = self._dirty_since + self._save_delay - time.monotonic()
+                if remaining > 0:
+                    self._save_cond.wait(remaining)
+                    continue
+            try:
+                self._write_pending()
+            except OSError:
+                # Keep the data dirty; the next window retries.
+                with self._save_cond:
+                    if self._dirty_since is None:
+                        self._dirty_since = time.monotonic()
+
+    def _write_pending(self) -> None:
+        pulled = False
+        try:
+            with self._io_lock:
+                if self._dirty_since is None:
+                    return
+                # Another process may have replaced the file since we last
+                # read it; merge that first so this write does not clobber it.
+                try:
+                    pulled = self._pull_external()
+                except (ValueError, TypeError, AttributeError):
+                    # Unusable external content is overwritten by ours.
+                    pulled = False
+                with self._lock:
+                    if self._dirty_since is None:
+                        return
+                    # Records are immutable, so a shallow copy of the root is a
+                    # consistent snapshot and serialization can run unlocked.
+                    snapshot = dict(self.data)
+                    ops, self._ops = self._ops, []
+                    self._dirty_since = None
+                    mark = self._storage.mark() if hasattr(self._storage, "append") else None
+                try:
+                    if mark is None:
+                        self._storage.write(snapshot, ops)
+                    else:
+                        self._storage.compact(snapshot, mark)
+                except OSError:
+                    with self._lock:
+                        self._ops[:0] = ops
+                    raise
+                self._saved_profiles = snapshot["profiles"]
+        finally:
+            # Listeners run without the io lock held.
+            if pulled:
+                self._dispatch()
+
+    def watch(self) -> None:
+        """
+        Starts watching the storage file for changes made by other processes
+        (e.g. a deployment replacing profiles.json); they are merged by
+        reload_external() on the watcher thread. Only storages that can
+        read_external() (the json backend) are watched.
+        """
+        if self._watcher is None and hasattr(self._storage, "read_external"):
+            self._watcher = FileWatcher(self._storage.path, self.reload_external)
+            self._watcher.start()
+
+    def reload_external(self) -> bool:
+        """
+        Merges the storage file into the store if another process changed
+        it. The file becomes the base and the changes not yet written are
+        replayed on top, so unsaved local edits win per bind or hotkey. Only
+        profiles that differ are re-indexed, and the differences go out as
+        change events. Returns True if the file had changed.
+        """
+        # The io lock keeps our own writer from replacing the file between
+        # reading it and merging it.
+        with self._io_lock:
+            changed = self._pull_external()
+        if changed:
+            self._dispatch()
+        return changed
+
+    def _pull_external(self) -> bool:
+        # Called with the io lock held.
+        read_external = getattr(self._storage, "read_external", None)
+        data = read_external() if read_external is not None else None
+        if data is None:
+            return False
+        profiles = tuple(Profile.from_dict(item) for item in data["profiles"])
+        with self._lock:
+            self._merge_external(data, profiles)
+        self._saved_profiles = profiles
+        return True
+
+    def _merge_external(self, data: dict, external: tuple[Profile, ...]) -> None:
+        profiles = {profile.id: profile for profile in external}
+        saved = {profile.id: profile for profile in self._saved_profiles}
+        active_id = data.get("active_profile_id")
+        for op in self._ops:
+            kind, profile_id = op[0], op[1]
+            if kind == "active":
+                active_id = profile_id
+            elif kind == "profile":
+                profiles[profile_id] = op[2]
+            elif kind == "profile_removed":
+                profiles.pop(profile_id, None)
+            elif profile_id in profiles:
+                profiles[profile_id] = _replay_op(profiles[profile_id], op, saved.get(profile_id))
+        if not profiles:
+            return
+        if active_id not in profiles:
+            active_id = self.data.get("active_profile_id")
+            if active_id not in profiles:
+                active_id = next(iter(profiles))
 
-    def get_profile(self, profile_id: str | None = None) -> dict:
+        previous = {profile.id: profile for profile in self.data["profiles"]}
+        merged = []
+        for profile in profiles.values():
+            old = previous.pop(profile.id, None)
+            if old is None:
+                self._index_profile(profile)
+                self._events.append(ProfilesChanged(profile.id))
+            elif old == profile:
+                # Keep the stored record and its indexes.
+                profile = old
+            else:
+                self._index_profile(profile)
+                self._events.extend(_profile_changes(old, profile))
+            merged.append(profile)
+            if profile is not old and self._conflicts is not None:
+                self._conflicts.set_profile(profile)
+        for profile_id in previous:
+            self._unindex_profile(profile_id)
+            self._events.append(ProfilesChanged(profile_id))
+            if self._conflicts is not None:
+                self._conflicts.remove_profile(profile_id)
+
+        active_changed = active_id != self.data.get("active_profile_id")
+        self.data = {**data, "active_profile_id": active_id, "profiles": tuple(merged)}
+        self._profiles = _Positions(self.data["profiles"])
+        if active_changed:
+            self._events.append(ActiveProfileChanged(active_id))
+
+    def get_active_profile(self) -> Profile:
+        profile = self._lookup(self.data.get("active_profile_id"))
+        if profile is not None:
+            return profile
+        profiles = self.data["profiles"]
+        return self._lookup(profiles[0].id) if profiles else Profile.from_dict(self._default_data()["profiles"][0])
+
+    def list_profiles(self) -> tuple[Profile, ...]:
+        return self.data["profiles"]
+
+    def list_binds(self, profile_id: str | None = None) -> tuple[Bind, ...]:
+        return self.get_profile(profile_id).binds
+
+    def get_profile(self, profile_id: str | None = None) -> Profile:
         if profile_id is None:
             return self.get_active_profile()
-        for profile in self.data.get("profiles", []):
-            if profile["id"] == profile_id:
-                return profile
+        profile = self._lookup(profile_id)
+        if profile is not None:
+            return profile
         return self.get_active_profile()
 
+    @_locked
     def set_active_profile(self, profile_id: str) -> None:
         self.data["active_profile_id"] = profile_id
+        self._ops.append(("active", profile_id))
+        self._events.append(ActiveProfileChanged(profile_id))
         self._save()
 
-    def add_profile(self, name: str) -> dict:
+    @_locked
+    def add_profile(self, name: str) -> Profile:
         now = datetime.now(timezone.utc).isoformat()
-        profile_id = str(uuid4())
         template = self._default_data()["profiles"][0]
-        profile = deepcopy(template)
-        profile["id"] = profile_id
-        profile["name"] = name
-        profile["binds"] = []
-        profile["created_at"] = now
-        profile["updated_at"] = now
-        self.data.setdefault("profiles", []).append(profile)
+        profile = Profile.from_dict(
+            {
+                **template,
+                "id": str(uuid4()),
+                "name": name,
+                "binds": [],
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        self._put_profile(profile)
+        self._index_profile(profile)
+        self._ops.append(("profile", profile.id, profile))
+        self._events.append(ProfilesChanged(profile.id))
+        if self._conflicts is not None:
+            self._conflicts.set_profile(profile)
         self._save()
-        return deepcopy(profile)
+        return profile
 
+    @_locked
     def rename_profile(self, profile_id: str, new_name: str) -> bool:
-        for profile in self.data.get("profiles", []):
-            if profile["id"] == profile_id:
-                profile["name"] = new_name
-                profile["updated_at"] = datetime.now(timezone.utc).isoformat()
-                self._save()
-                return True
-        return False
+        profile = self._lookup(profile_id)
+        if profile is None:
+            return False
+        self._touch(profile, name=new_name)
+        self._events.append(ProfilesChanged(profile_id))
+        if self._conflicts is not None:
+            self._conflicts.rename_profile(profile_id, new_name)
+        self._save()
+        return True
 
+    @_locked
     def delete_profile(self, profile_id: str) -> bool:
-        profiles = self.data.get("profiles", [])
-        for idx, profile in enumerate(profiles):
-            if profile["id"] == profile_id:
-                profiles.pop(idx)
-                if self.data.get("active_profile_id") == profile_id:
-                    if profiles:
-                        self.data["active_profile_id"] = profiles[0]["id"]
-                    else:
-                        self.data = self._default_data()
-                self._save()
-                return True
-        return False
+        profiles = self._profiles.removed(self.data["profiles"], profile_id)
+        if profiles is None:
+            return False
+        self.data["profiles"] = profiles
+        self._unindex_profile(profile_id)
+        self._ops.append(("profile_removed", profile_id))
+        self._events.append(ProfilesChanged(profile_id))
+        if self._conflicts is not None:
+            self._conflicts.remove_profile(profile_id)
+        if self.data.get("active_profile_id") == profile_id:
+            if profiles:
+                self.data["active_profile_id"] = profiles[0].id
+                self._ops.append(("active", profiles[0].id))
+            else:
+                self.data = self._default_data()
+                self._ops.extend(full_ops(self.data))
+                self._reindex()
+            self._events.append(ActiveProfileChanged(self.data["active_profile_id"]))
+        self._save()
+        return True
 
+    @_locked
     def update_settings(self, profile_id: str, settings: dict) -> None:
-        profile = self.get_profile(profile_id)
-        profile["settings"] = deepcopy(settings)
-        profile["updated_at"] = datetime.now(timezone.utc).isoformat()
+        previous = self.get_profile(profile_id)
+        profile = self._touch(previous, settings=Settings.from_dict(settings))
+        self._events.append(SettingsChanged(profile.id, profile.settings, previous.settings))
+        if self._conflicts is not None:
+            self._conflicts.set_settings(profile.id, profile.settings)
         self._save()
 
+    @_locked
     def update_variables(self, profile_id: str, variables: dict) -> None:
-        profile = self.get_profile(profile_id)
-        profile["variables"] = deepcopy(variables)
-        profile["updated_at"] = datetime.now(timezone.utc).isoformat()
+        profile = self._touch(self.get_profile(profile_id), variables=freeze(dict(variables)))
+        self._events.append(VariablesChanged(profile.id, profile.variables))
         self._save()
 
     def export_profile(self, profile_id: str) -> dict:
-        return deepcopy(self.get_profile(profile_id))
+        return self.get_profile(profile_id).to_dict()
 
-    def import_profile(self, profile_data: dict, name_override: str | None = None) -> dict:
+    @_locked
+    def import_profile(self, profile_data: dict, name_override: str | None = None) -> Profile:
         now = datetime.now(timezone.utc).isoformat()
-        profile = deepcopy(profile_data)
-        profile["id"] = str(uuid4())
-        profile["name"] = name_override or profile.get("name", "imported")
-        profile["created_at"] = now
-        profile["updated_at"] = now
-        profile["binds"] = [
-            {**bind, "id": str(uuid4())} for bind in profile.get("binds", [])
-        ]
-        profile["hotkeys"] = [
-            {**hotkey, "id": str(uuid4())} for hotkey in profile.get("hotkeys", [])
-        ]
-        self.data.setdefault("profiles", []).append(profile)
+        profile = Profile.from_dict(
+            {
+                **profile_data,
+                "id": str(uuid4()),
+                "name": name_override or profile_data.get("name", "imported"),
+                "created_at": now,
+                "updated_at": now,
+                "binds": [{**bind, "id": str(uuid4())} for bind in profile_data.get("binds", [])],
+                "hotkeys": [{**hotkey, "id": str(uuid4())} for hotkey in profile_data.get("hotkeys", [])],
+            }
+        )
+        self._put_profile(profile)
+        self._index_profile(profile)
+        self._ops.append(("profile", profile.id, profile))
+        self._events.append(ProfilesChanged(profile.id))
+        if self._conflicts is not None:
+            self._conflicts.set_profile(profile)
+        self._save()
+        return profile
+
+    def get_bind(self, bind_id: str, profile_id: str | None = None) -> Bind | None:
+        profile = self.get_profile(profile_id)
+        return self._binds[profile.id].get(profile.binds, bind_id)
+
+    def find_binds_by_trigger(self, trigger: str, profile_id: str | None = None) -> list[Bind]:
+        profile = self.get_profile(profile_id)
+        return list(self._triggers[profile.id].get(trigger, {}).values())
+
+    @_locked
+    def add_bind(self, bind: dict, profile_id: str | None = None) -> Bind:
+        profile = self.get_profile(profile_id)
+        new_bind = Bind.from_dict({**bind, "id": str(uuid4())})
+        binds = self._binds[profile.id].appended(profile.binds, new_bind)
+        self._index_trigger(profile.id, new_bind)
+        self._touch(profile, binds=binds)
+        self._ops.append(("bind", profile.id, new_bind))
+        self._events.append(BindAdded(profile.id, new_bind))
+        if self._conflicts is not None:
+            self._conflicts.set_bind(profile.id, new_bind)
         self._save()
-        return deepcopy(profile)
+        return new_bind
 
-    def get_bind(self, bind_id: str, profile_id: str | None = None) -> dict | None:
+    @_locked
+    def add_binds(self, binds: Iterable[dict], profile_id: str | None = None) -> list[Bind]:
+        """Adds every bind under a new id with one profile update and one save."""
         profile = self.get_profile(profile_id)
-        for bind in profile.get("binds", []):
-            if bind["id"] == bind_id:
-                return deepcopy(bind)
-        return None
+        added = [Bind.from_dict({**bind, "id": str(uuid4())}) for bind in binds]
+        self._merge_binds(profile, added)
+        return added
 
-    def add_bind(self, bind: dict, profile_id: str | None = None) -> dict:
+    @_locked
+    def upsert_binds(self, binds: Iterable[dict], profile_id: str | None = None) -> list[Bind]:
+        """Like add_binds, but a bind whose id is already in the profile replaces it."""
         profile = self.get_profile(profile_id)
-        new_bind = deepcopy(bind)
-        new_bind["id"] = str(uuid4())
-        profile.setdefault("binds", []).append(new_bind)
-        profile["updated_at"] = datetime.now(timezone.utc).isoformat()
+        index = self._binds[profile.id]
+        stored = []
+        for bind in binds:
+            bind_id = bind.get("id")
+            if not bind_id or index.get(profile.binds, bind_id) is None:
+                bind_id = str(uuid4())
+            stored.append(Bind.from_dict({**bind, "id": bind_id}))
+        self._merge_binds(profile, stored)
+        return stored
+
+    def _merge_binds(self, profile: Profile, binds: list[Bind]) -> None:
+        if not binds:
+            return
+        binds_tuple, previous = self._binds[profile.id].merged(profile.binds, binds)
+        for bind, old in zip(binds, previous):
+            if old is not None:
+                self._unindex_trigger(profile.id, old)
+            self._index_trigger(profile.id, bind)
+            self._ops.append(("bind", profile.id, bind))
+            self._events.append(BindAdded(profile.id, bind) if old is None else BindUpdated(profile.id, bind, old))
+            if self._conflicts is not None:
+                self._conflicts.set_bind(profile.id, bind)
+        self._touch(profile, binds=binds_tuple)
         self._save()
-        return deepcopy(new_bind)
 
-    def update_bind(self, bind_id: str, bind: dict, profile_id: str | None = None) -> dict | None:
+    @_locked
+    def update_bind(self, bind_id: str, bind: dict, profile_id: str | None = None) -> Bind | None:
         profile = self.get_profile(profile_id)
-        for idx, item in enumerate(profile.get("binds", [])):
-            if item["id"] == bind_id:
-                updated = deepcopy(bind)
-                updated["id"] = bind_id
-                profile["binds"][idx] = updated
-                profile["updated_at"] = datetime.now(timezone.utc).isoformat()
-                self._save()
-                return deepcopy(updated)
-        return None
+        index = self._binds[profile.id]
+        previous = index.get(profile.binds, bind_id)
+        if previous is None:
+            return None
+        updated = Bind.from_dict({**bind, "id": bind_id})
+        binds = index.replaced(profile.binds, updated)
+        self._unindex_trigger(profile.id, previous)
+        self._index_trigger(profile.id, updated)
+        self._touch(profile, binds=binds)
+        self._ops.append(("bind", profile.id, updated))
+        self._events.append(BindUpdated(profile.id, updated, previous))
+        if self._conflicts is not None:
+            self._conflicts.set_bind(profile.id, updated)
+        self._save()
+        return updated
 
+    @_locked
     def delete_bind(self, bind_id: str, profile_id: str | None = None) -> bool:
         profile = self.get_profile(profile_id)
-        binds = profile.get("binds", [])
-        for idx, item in enumerate(binds):
-            if item["id"] == bind_id:
-                binds.pop(idx)
-                profile["updated_at"] = datetime.now(timezone.utc).isoformat()
-                self._save()
-                return True
-        return False
+        index = self._binds[profile.id]
+        removed = index.get(profile.binds, bind_id)
+        if removed is None:
+            return False
+        binds = index.removed(profile.binds, bind_id)
+        self._unindex_trigger(profile.id, removed)
+        self._touch(profile, binds=binds)
+        self._ops.append(("bind_removed", profile.id, bind_id))
+        self._events.append(BindDeleted(profile.id, removed))
+        if self._conflicts is not None:
+            self._conflicts.remove_bind(profile.id, bind_id)
+        self._save()
+        return True
+
+    def search_binds(self, query: str = "", category: str | None = None, profile_id: str | None = None) -> list[Bind]:
+        """Binds whose trigger/title/content contain ``query``, in list order."""
+        profile = self.get_profile(profile_id)
+        query = query.strip().lower()
+        search = getattr(self._storage, "search_binds", None)
+        # The database only answers when it holds every edit: no write is
+        # running or pending and no transaction is open. Nothing here waits
+        # on the io lock, so a caller inside a transaction cannot deadlock
+        # against the writer (which takes the io lock, then the store lock).
+        if search is not None and self._io_lock.acquire(blocking=False):
+            try:
+                with self._lock:
+                    if not self._batch_depth and self._dirty_since is None:
+                        profile = self.get_profile(profile.id)
+                        index = self._binds[profile.id]
+                        found = (index.get(profile.binds, bind_id) for bind_id in search(profile.id, query, category))
+                        return [bind for bind in found if bind is not None]
+            finally:
+                self._io_lock.release()
+        return [
+            bind
+            for bind in profile.binds
+            if (category is None or bind.category == category)
+            and (not query or query in " ".join([bind.trigger, bind.title, bind.content]).lower())
+        ]
 
     def trigger_set(self, profile_id: str | None = None, exclude_id: str | None = None) -> set[str]:
         profile = self.get_profile(profile_id)
-        triggers = set()
-        for item in profile.get("binds", []):
-            if exclude_id and item["id"] == exclude_id:
-                continue
-            triggers.add(item.get("trigger", ""))
-        return triggers
-
-    def list_hotkeys(self, profile_id: str | None = None) -> list[dict]:
-        profile = self.get_profile(profile_id)
-        return deepcopy(profile.get("hotkeys", []))
+        triggers = self._triggers[profile.id]
+        result = set(triggers)
+        excluded = self.get_bind(exclude_id, profile.id) if exclude_id else None
+        if excluded is not None:
+            trigger = excluded.trigger
+            if set(triggers.get(trigger, {})) == {exclude_id}:
+                result.discard(trigger)
+        return result
+
+    def list_hotkeys(self, profile_id: str | None = None) -> tuple[Hotkey, ...]:
+        return self.get_profile(profile_id).hotkeys
 
-    def get_hotkey(self, hotkey_id: str, profile_id: str | None = None) -> dict | None:
+    def get_hotkey(self, hotkey_id: str, profile_id: str | None = None) -> Hotkey | None:
         profile = self.get_profile(profile_id)
-        for hotkey in profile.get("hotkeys", []):
-            if hotkey.get("id") == hotkey_id:
-                return deepcopy(hotkey)
-        return None
+        return self._hotkeys[profile.id].get(profile.hotkeys, hotkey_id)
 
-    def add_hotkey(self, hotkey: dict, profile_id: str | None = None) -> dict:
+    @_locked
+    def add_hotkey(self, hotkey: dict, profile_id: str | None = None) -> Hotkey:
         profile = self.get_profile(profile_id)
-        new_hotkey = deepcopy(hotkey)
-        new_hotkey["id"] = str(uuid4())
-        profile.setdefault("hotkeys", []).append(new_hotkey)
-        profile["updated_at"] = datetime.now(timezone.utc).isoformat()
+        new_hotkey = Hotkey.from_dict({**hotkey, "id": str(uuid4())})
+        hotkeys = self._hotkeys[profile.id].appended(profile.hotkeys, new_hotkey)
+        self._touch(profile, hotkeys=hotkeys)
+        self._ops.append(("hotkey", profile.id, new_hotkey))
+        self._events.append(HotkeysChanged(profile.id, hotkeys))
+        if self._conflicts is not None:
+            self._conflicts.set_hotkey(profile.id, new_hotkey)
         self._save()
-        return deepcopy(new_hotkey)
+        return new_hotkey
 
-    def update_hotkey(self, hotkey_id: str, hotkey: dict, profile_id: str | None = None) -> dict | None:
+    @_locked
+    def update_hotkey(self, hotkey_id: str, hotkey: dict, profile_id: str | None = None) -> Hotkey | None:
         profile = self.get_profile(profile_id)
-        for idx, item in enumerate(profile.get("hotkeys", [])):
-            if item.get("id") == hotkey_id:
-                updated = deepcopy(hotkey)
-                updated["id"] = hotkey_id
-                profile["hotkeys"][idx] = updated
-                profile["updated_at"] = datetime.now(timezone.utc).isoformat()
-                self._save()
-                return deepcopy(updated)
-        return None
+        updated = Hotkey.from_dict({**hotkey, "id": hotkey_id})
+        hotkeys = self._hotkeys[profile.id].replaced(profile.hotkeys, updated)
+        if hotkeys is None:
+            return None
+        self._touch(profile, hotkeys=hotkeys)
+        self._ops.append(("hotkey", profile.id, updated))
+        self._events.append(HotkeysChanged(profile.id, hotkeys))
+        if self._conflicts is not None:
+            self._conflicts.set_hotkey(profile.id, updated)
+        self._save()
+        return updated
 
+    @_locked
     def delete_hotkey(self, hotkey_id: str, profile_id: str | None = None) -> bool:
         profile = self.get_profile(profile_id)
-        hotkeys = profile.get("hotkeys", [])
-        for idx, item in enumerate(hotkeys):
-            if item.get("id") == hotkey_id:
-                hotkeys.pop(idx)
-                profile["updated_at"] = datetime.now(timezone.utc).isoformat()
-                self._save()
-                return True
-        return False
+        hotkeys = self._hotkeys[profile.id].removed(profile.hotkeys, hotkey_id)
+        if hotkeys is None:
+            return False
+        self._touch(profile, hotkeys=hotkeys)
+        self._ops.append(("hotkey_removed", profile.id, hotkey_id))
+        self._events.append(HotkeysChanged(profile.id, hotkeys))
+        if self._conflicts is not None:
+            self._conflicts.remove_hotkey(profile.id, hotkey_id)
+        self._save()
+        return True
+
+
+# Profile fields a "profile_meta" op carries.
+_META_FIELDS = ("name", "created_at", "updated_at", "settings", "variables", "extra")
+
+
+def _replay_op(profile: Profile, op: tuple, saved: Profile | None) -> Profile:
+    # Applies one pending op (see app/storage.py) to a profile read from disk.
+    # The meta op holds every field, so only those that differ from the last
+    # saved state (``saved``) count as local edits.
+    kind = op[0]
+    if kind == "profile_meta":
+        source = op[2]
+        changes = {
+            name: getattr(source, name)
+            for name in _META_FIELDS
+            if saved is None or getattr(source, name) != getattr(saved, name)
+        }
+        return profile.replace(**changes) if changes else profile
+    if kind in ("bind", "hotkey"):
+        field, record = kind + "s", op[2]
+        items = getattr(profile, field)
+        for idx, item in enumerate(items):
+            if item.id == record.id:
+                return profile.replace(**{field: items[:idx] + (record,) + items[idx + 1 :]})
+        return profile.replace(**{field: items + (record,)})
+    if kind in ("bind_removed", "hotkey_removed"):
+        field = kind[: -len("_removed")] + "s"
+        return profile.replace(**{field: tuple(item for item in getattr(profile, field) if item.id != op[2])})
+    return profile
+
+
+def _profile_changes(old: Profile, new: Profile) -> list[Change]:
+    profile_id = new.id
+    changes: list[Change] = []
+    if old.name != new.name:
+        changes.append(ProfilesChanged(profile_id))
+    if old.settings != new.settings:
+        changes.append(SettingsChanged(profile_id, new.settings, old.settings))
+    if old.variables != new.variables:
+        changes.append(VariablesChanged(profile_id, new.variables))
+    if old.hotkeys != new.hotkeys:
+        changes.append(HotkeysChanged(profile_id, new.hotkeys))
+    remaining = {bind.id: bind for bind in old.binds}
+    for bind in new.binds:
+        before = remaining.pop(bind.id, None)
+        if before is None:
+            changes.append(BindAdded(profile_id, bind))
+        elif before != bind:
+            changes.append(BindUpdated(profile_id, bind, before))
+    changes.extend(BindDeleted(profile_id, bind) for bind in remaining.values())
+    return changes
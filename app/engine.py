@@ -2,12 +2,32 @@ import os
 import sys
 import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from ctypes import wintypes
 import ctypes
-from datetime import datetime
 from typing import Any
 
-from app.hotkeys import get_keyboard
+from app.chords import ChordDispatcher
+from app.hotkeys import get_keyboard, normalize_hotkey
+from app.layout import convert_layout
+from app.macro_compiler import MacroCompileError, Op, compile_macro
+from app.macro_runner import MacroExecutor, MacroJob
+from app.macro_timing import DeadlineScheduler, high_resolution_timer
+from app.models import Bind
+from app.templates import Template, TemplateError, compile_template, literal_template, preload_templates
+from app.trigger_index import PrefixCursor, PrefixIndex, Suggestion
+from app.usage_store import load_usage, save_usage
+
+# Arguments must follow the trigger (and each other) within this many seconds.
+CAPTURE_TIMEOUT = 15.0
+# Keys that do not end argument capture; any other non-character key does.
+_MODIFIER_KEYS = frozenset(
+    {
+        "shift", "left shift", "right shift", "ctrl", "left ctrl", "right ctrl",
+        "alt", "left alt", "right alt", "alt gr", "left windows", "right windows",
+        "caps lock",
+    }
+)
 
 
 class BinderEngine:
@@ -20,29 +40,70 @@ class BinderEngine:
         self._allow_no_prefix = False
         self._prefixes = ["."]
         self._commit_keys = {"space"}
-        self._binds: list[dict[str, Any]] = []
+        self._dispatch = self._build_dispatch()
+        self._binds: dict[str, Bind] = {}
+        self._templates: dict[str, Template] = {}
+        self._counters: dict[str, int] = {}
+        self._expansions: dict[str, int] = {}
+        self._capture: dict[str, Any] | None = None
+        # The hook thread owns the typed-input state (buffer, capture,
+        # suggestion cursor); expand_suggestion and config updates arrive
+        # from the GUI thread and take the same lock.
+        self._input_lock = threading.RLock()
+        self._trigger_index: dict[str, list[Bind]] = {}
+        self._generation = 0
+        self._speculation: tuple[str, str, int, Future] | None = None
+        self._render_pool: ThreadPoolExecutor | None = None
+        self._usage: dict[str, int] = load_usage()
+        self._prefix_set: set[str] = {"."}
+        self._prefix_index: PrefixIndex | None = None
+        self._autocomplete_limit: int | None = None
+        self._suggest_cursor: PrefixCursor | None = None
+        self._suggestions: list[Suggestion] = []
+        self._suggest_listener = None
         self._hotkeys: list[dict[str, Any]] = []
+        self._macro_ops: dict[str, tuple[Op, ...]] = {}
         self._apps_only: list[str] = []
         self._apps_exclude: list[str] = []
         self._variables: dict[str, str] = {}
         self._active_profile: dict[str, Any] = {}
-        self._hotkey_handles: list[int] = []
-        self._macro_running = False
+        # Chord callbacks resolve hotkeys by combo at fire time, so the table
+        # is only rebuilt when the set of combos changes.
+        self._hotkeys_by_combo: dict[str, list[dict[str, Any]]] = {}
+        self._app_hotkeys: dict[str, str] = {}
+        self._app_hotkey_listener = None
+        self._chord_combos: frozenset[str] | None = None
+        self._macro_listener = None
+        self._macros = MacroExecutor(self._run_macro, self._macro_state_changed)
         self.available = sys.platform == "win32" and get_keyboard() is not None
         self._kb = get_keyboard()
+        self._chords = ChordDispatcher(self._kb.parse_hotkey if self._kb is not None else _no_parse)
 
     def start(self) -> None:
         if not self.available or self._hook is not None:
             return
-        self._hook = self._kb.hook(self._on_event)
-        self._refresh_hotkeys()
+        # One hook serves typing and every macro/app hotkey chord. The keyboard
+        # library has no per-key filter, so key-ups still arrive here; all but
+        # those of chord keys return after one set lookup.
+        self._hook = self._kb.hook(self._on_key_event)
+        self._chords.reset()
 
     def stop(self) -> None:
         if self._hook is None or not self.available:
             return
         self._kb.unhook(self._hook)
         self._hook = None
-        self._clear_hotkeys()
+        self._chords.reset()
+        self._macros.cancel_all()
+        self._speculation = None
+        self._set_suggestions([])
+        try:
+            save_usage(self._usage)
+        except OSError:  # pragma: no cover - best effort
+            pass
+        if self._render_pool is not None:
+            self._render_pool.shutdown(wait=False, cancel_futures=True)
+            self._render_pool = None
 
     def update_config(
         self,
@@ -53,16 +114,79 @@ class BinderEngine:
         hotkeys: list[dict[str, Any]] | None = None,
     ) -> None:
         self._active_profile = profile
+        # Records from DataStore pass through; raw dicts are validated once here
+        # so the keystroke path can read attributes.
+        binds = tuple(Bind.from_dict(bind) for bind in binds)
+        self._binds = {bind.id: bind for bind in binds}
+        self._templates = self._compile_templates(binds)
+        self._trigger_index = self._build_trigger_index(binds)
+        self._hotkeys = hotkeys or []
+        self._macro_ops = self._compile_macros(self._hotkeys)
+        self.update_variables(variables)
+        self.update_settings(settings)
+
+    def preload_templates(self, templates: dict[str, tuple]) -> None:
+        # Parsed template IR from the snapshot cache; applies to later configs.
+        preload_templates(templates)
+
+    def update_settings(self, settings: dict[str, Any]) -> None:
         self._enabled = bool(settings.get("binder_enabled", True))
         self._auto_layout = bool(settings.get("auto_layout", True))
         self._allow_no_prefix = bool(settings.get("allow_no_prefix", False))
-        self._prefixes = settings.get("trigger_prefixes", ["."]) or ["."]
+        self._prefixes = list(settings.get("trigger_prefixes", ["."]) or ["."])
+        self._prefix_set = set(self._prefixes)
         self._commit_keys = set(settings.get("commit_keys", ["space"]))
-        self._binds = binds
-        self._hotkeys = hotkeys or []
+        self._dispatch = self._build_dispatch()
+        self._autocomplete_limit = None
+        if settings.get("autocomplete", False):
+            self._autocomplete_limit = int(settings.get("autocomplete_limit", 5) or 5)
         apps_filter = settings.get("apps_filter", {}) or {}
         self._apps_only = self._split_list(apps_filter.get("only", ""))
         self._apps_exclude = self._split_list(apps_filter.get("exclude", ""))
+        self._invalidate()
+        self._refresh_hotkeys()
+
+    def update_binds(self, changed: list[dict[str, Any]], removed: list[str] = ()) -> None:
+        """Applies added/edited binds and deletions without recompiling the rest."""
+        changed = [Bind.from_dict(bind) for bind in changed]
+        templates = self._compile_templates(tuple(changed))
+        with self._input_lock:
+            index = self._prefix_index
+            for bind_id in removed:
+                bind = self._binds.pop(bind_id, None)
+                if bind is not None:
+                    self._templates.pop(bind_id, None)
+                    self._unindex_trigger(bind)
+                    if index is not None:
+                        index.remove(bind_id)
+            for bind in changed:
+                previous = self._binds.get(bind.id)
+                if previous is not None and previous.trigger.lower() != bind.trigger.lower():
+                    self._unindex_trigger(previous)
+                    previous = None
+                self._binds[bind.id] = bind
+                # Groups are replaced, not mutated, so a keystroke mid-lookup still
+                # sees a consistent list.
+                key = bind.trigger.lower()
+                group = self._trigger_index.get(key, [])
+                if previous is None:
+                    self._trigger_index[key] = [*group, bind]
+                else:
+                    self._trigger_index[key] = [bind if item.id == bind.id else item for item in group]
+                if index is not None:
+                    index.put(bind)
+            self._templates.update(templates)
+            # Only state that can depend on the touched binds is dropped: any
+            # speculative render (it may have used an old template) and a
+            # capture waiting for arguments of one of them.
+            self._generation += 1
+            self._speculation = None
+            capture = self._capture
+            touched = {*removed, *(bind.id for bind in changed)}
+            if capture is not None and capture["bind"].id in touched:
+                self._capture = None
+
+    def update_variables(self, variables: dict[str, Any]) -> None:
         self._variables = {
             "discord_me": str(variables.get("discord_me", "")),
             "discord_zga": str(variables.get("discord_zga", "")),
@@ -70,28 +194,123 @@ class BinderEngine:
             "me_name": str(variables.get("me_name", "")),
             "gender": str(variables.get("gender", "male")),
         }
+        # Speculative renders already substituted the old values.
+        self._generation += 1
+        self._speculation = None
+
+    def update_hotkeys(self, hotkeys: list[dict[str, Any]]) -> None:
+        self._hotkeys = hotkeys or []
+        self._macro_ops = self._compile_macros(self._hotkeys)
         self._refresh_hotkeys()
 
-    def _on_event(self, event) -> None:
+    def _invalidate(self) -> None:
+        # Drops state derived from the old binds or settings: speculative
+        # renders, a half-captured bind and the autocomplete trie, which is
+        # cheap enough to rebuild whole.
+        prefix_index = None
+        if self._autocomplete_limit is not None:
+            prefix_index = PrefixIndex(self._binds.values(), self._usage, self._autocomplete_limit)
+        with self._input_lock:
+            self._generation += 1
+            self._speculation = None
+            self._capture = None
+            self._prefix_index = prefix_index
+            self._suggest_cursor = None
+            self._set_suggestions([])
+
+    def _compile_templates(self, binds: tuple[Bind, ...]) -> dict[str, Template]:
+        templates: dict[str, Template] = {}
+        for bind in binds:
+            try:
+                templates[bind.id] = compile_template(bind.content)
+            except TemplateError as exc:
+                templates[bind.id] = literal_template(bind.content)
+                self._debug(
+                    "template_error",
+                    {"bind_id": bind.id, "title": bind.title, "error": str(exc)},
+                )
+        return templates
+
+    def _compile_macros(self, hotkeys: list[dict[str, Any]]) -> dict[str, tuple[Op, ...]]:
+        compiled: dict[str, tuple[Op, ...]] = {}
+        for hotkey in hotkeys:
+            try:
+                compiled[hotkey.get("id", "")] = compile_macro(hotkey.get("steps", []) or [])
+            except MacroCompileError as exc:
+                self._debug(
+                    "macro_invalid",
+                    {"hotkey_id": hotkey.get("id"), "title": hotkey.get("title"), "error": str(exc)},
+                )
+        return compiled
+
+    def _build_trigger_index(self, binds: tuple[Bind, ...]) -> dict[str, list[Bind]]:
+        index: dict[str, list[Bind]] = {}
+        for bind in binds:
+            index.setdefault(bind.trigger.lower(), []).append(bind)
+        return index
+
+    def _unindex_trigger(self, bind: Bind) -> None:
+        key = bind.trigger.lower()
+        group = [item for item in self._trigger_index.get(key, ()) if item.id != bind.id]
+        if group:
+            self._trigger_index[key] = group
+        else:
+            self._trigger_index.pop(key, None)
+
+    def _build_dispatch(self) -> dict[str, Any]:
+        dispatch: dict[str, Any] = {"backspace": self._on_backspace}
+        for name in ("space", "enter", "tab"):
+            dispatch[name] = self._handle_commit if name in self._commit_keys else self._on_disabled_commit
+        return dispatch
+
+    def _on_key_event(self, event) -> None:
         if event.event_type != "down":
+            if event.scan_code in self._chords.codes:
+                self._chords.release(event.scan_code)
             return
-        name = event.name
-        if name in {"shift", "ctrl", "alt", "alt gr", "cmd"}:
-            return
-        if name == "backspace":
-            self._buffer = self._buffer[:-1]
+        self._chords.press(event.scan_code)
+        self._on_key_down(event)
+
+    def _on_key_down(self, event) -> None:
+        with self._input_lock:
+            self._handle_key_down(event.name)
+
+    def _handle_key_down(self, name: str | None) -> None:
+        handler = self._dispatch.get(name)
+        if handler is not None:
+            handler(name)
+        elif name is None:
             return
-        if name in {"space", "enter", "tab"}:
-            self._handle_commit(name)
-            return
-        if isinstance(name, str) and len(name) == 1:
-            self._buffer += name
+        elif len(name) == 1:
+            self._on_char(name)
+        elif self._capture is not None and name not in _MODIFIER_KEYS:
+            # Arrows, Escape, clicks-to-focus etc.: the user moved on.
+            self._capture = None
+
+    def _on_char(self, name: str) -> None:
+        self._buffer += name
+        if self._prefix_index is not None:
+            self._advance_suggestions(name)
+        self._speculate()
+
+    def _on_backspace(self, name: str) -> None:
+        if not self._buffer:
+            self._capture = None
+        self._buffer = self._buffer[:-1]
+        if self._suggest_cursor is not None:
+            if self._suggest_cursor.depth:
+                self._set_suggestions(self._suggest_cursor.back())
+            else:
+                self._suggest_cursor = None
+        self._speculate()
+
+    def _on_disabled_commit(self, key_name: str) -> None:
+        self._capture = None
+        self._debug("commit_key_disabled", {"key": key_name})
 
     def _handle_commit(self, key_name: str) -> None:
-        if key_name not in self._commit_keys:
-            self._debug("commit_key_disabled", {"key": key_name})
-            return
         if not self._is_app_allowed():
+            self._capture = None
             self._debug(
                 "app_not_allowed",
                 {
@@ -104,6 +323,11 @@ class BinderEngine:
             return
         token = self._buffer
         self._buffer = ""
+        self._suggest_cursor = None
+        self._set_suggestions([])
+        if self._capture_active():
+            self._continue_capture(token)
+            return
         if not token:
             return
         if not self._enabled:
@@ -123,23 +347,206 @@ class BinderEngine:
             )
             return
 
-        delete_trigger = bind.get("options", {}).get("delete_trigger", True)
+        erase = len(prefix + trigger) + 1
+        template = self._templates.get(bind.id)
+        if self._flush_speculation(token, bind, method, trigger):
+            return
+        if template is not None and template.arg_count:
+            self._start_capture(bind, method, trigger, erase, template.arg_count)
+            return
+        self._expand(bind, method, trigger, erase, ())
+
+    def _start_capture(self, bind: Bind, method: str, trigger: str, erase: int, needed: int) -> None:
+        self._capture = {
+            "bind": bind,
+            "method": method,
+            "trigger": trigger,
+            "erase": erase,
+            "args": [],
+            "needed": needed,
+            "expires": time.monotonic() + CAPTURE_TIMEOUT,
+        }
+
+    def _capture_active(self) -> bool:
+        capture = self._capture
+        if capture is None:
+            return False
+        if time.monotonic() > capture["expires"]:
+            self._capture = None
+            self._debug("capture_expired", {"bind_id": capture["bind"].id})
+            return False
+        return True
+
+    def _continue_capture(self, token: str) -> None:
+        capture = self._capture
+        capture["expires"] = time.monotonic() + CAPTURE_TIMEOUT
+        capture["erase"] += len(token) + 1
+        if token:
+            capture["args"].append(token)
+        if len(capture["args"]) < capture["needed"]:
+            return
+        self._capture = None
+        self._expand(
+            capture["bind"],
+            capture["method"],
+            capture["trigger"],
+            capture["erase"],
+            tuple(capture["args"]),
+        )
+
+    def _expand(
+        self,
+        bind: Bind,
+        method: str,
+        trigger: str,
+        erase: int,
+        args: tuple[str, ...],
+    ) -> None:
+        try:
+            text = self._render_bind(bind, args)
+        except TemplateError as exc:
+            self._debug("template_error", {"bind_id": bind.id, "error": str(exc)})
+            return
         try:
-            if delete_trigger:
-                self._erase_token(len(prefix + trigger) + 1)
-            self._emit_bind(bind)
+            self._emit_bind(bind, text, erase)
             self._debug(
                 "trigger_matched",
                 {
                     "trigger": trigger,
                     "method": method,
-                    "bind_id": bind.get("id"),
-                    "title": bind.get("title"),
+                    "bind_id": bind.id,
+                    "title": bind.title,
+                    "args": list(args),
                 },
             )
         except Exception as exc:  # pragma: no cover - runtime guard
             self._debug("input_error", {"error": str(exc)})
 
+    def set_suggestion_listener(self, listener) -> None:
+        self._suggest_listener = listener
+
+    def _advance_suggestions(self, ch: str) -> None:
+        cursor = self._suggest_cursor
+        if cursor is not None:
+            self._set_suggestions(cursor.advance(ch))
+        elif self._buffer in self._prefix_set:
+            self._suggest_cursor = self._prefix_index.cursor()
+
+    def _set_suggestions(self, suggestions: list[Suggestion]) -> None:
+        if suggestions is self._suggestions or (not suggestions and not self._suggestions):
+            return
+        self._suggestions = suggestions
+        if self._suggest_listener is not None:
+            self._suggest_listener(list(suggestions))
+
+    def expand_suggestion(self, bind_id: str) -> None:
+        with self._input_lock:
+            self._expand_suggestion(bind_id)
+
+    def _expand_suggestion(self, bind_id: str) -> None:
+        bind = self._binds.get(bind_id)
+        if bind is None or self._suggest_cursor is None:
+            return
+        typed = self._buffer
+        prefix, trigger = self._split_prefix(typed)
+        self._buffer = ""
+        self._suggest_cursor = None
+        self._set_suggestions([])
+        if prefix is None:
+            return
+        full_trigger = bind.trigger
+        template = self._templates.get(bind_id)
+        if template is not None and template.arg_count:
+            # Retype the whole trigger, since the typed part may be in the other
+            # layout, and wait for the arguments as if it was typed.
+            batch = [("write", full_trigger + " ")]
+            if trigger:
+                batch.insert(0, ("send", ", ".join(["backspace"] * len(trigger))))
+            self._flush_batch(batch)
+            self._start_capture(bind, "suggestion", full_trigger, len(prefix + full_trigger) + 1, template.arg_count)
+            return
+        self._expand(bind, "suggestion", full_trigger, len(typed), ())
+
+    def _count_expansion(self, bind_id: str, count: int) -> None:
+        self._expansions[bind_id] = count
+        if self._prefix_index is not None:
+            self._prefix_index.bump(bind_id)
+        else:
+            self._usage[bind_id] = self._usage.get(bind_id, 0) + 1
+
+    def _speculate(self) -> None:
+        # Pre-render the bind that the current buffer would expand to, so the
+        # commit key only has to flush a ready emission batch.
+        token = self._buffer
+        if not token or self._capture_active() or not self._enabled:
+            self._speculation = None
+            return
+        speculation = self._speculation
+        if speculation is not None and speculation[0] == token:
+            return
+        prefix, trigger = self._split_prefix(token)
+        bind = None
+        if prefix is not None and self._may_match(trigger):
+            bind, _ = self._find_bind(trigger, prefixed=bool(prefix))
+        template = self._templates.get(bind.id) if bind else None
+        if template is None or template.arg_count or template.stateful:
+            self._speculation = None
+            return
+        if self._render_pool is None:
+            self._render_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="binder-render")
+        erase = len(token) + 1
+        future = self._render_pool.submit(self._prepare_batch, bind, template, erase)
+        self._speculation = (token, bind.id, self._generation, future)
+
+    def _prepare_batch(
+        self, bind: Bind, template: Template, erase: int
+    ) -> tuple[list[tuple[str, str]], int, int]:
+        count = self._expansions.get(bind.id, 0) + 1
+        minute = int(time.time() // 60)
+        text = template.render(self._variables, (), self._counters, count)
+        return self._build_batch(bind, text, erase), count, minute
+
+    def _flush_speculation(
+        self, token: str, bind: Bind, method: str, trigger: str
+    ) -> bool:
+        speculation = self._speculation
+        self._speculation = None
+        if speculation is None:
+            return False
+        spec_token, bind_id, generation, future = speculation
+        if spec_token != token or bind_id != bind.id or generation != self._generation:
+            future.cancel()
+            return False
+        if not future.done():
+            # The hook thread never waits on the pool; render synchronously instead.
+            future.cancel()
+            return False
+        try:
+            batch, count, minute = future.result()
+        except Exception:
+            return False
+        template = self._templates.get(bind_id)
+        if count != self._expansions.get(bind_id, 0) + 1:
+            return False
+        if template is not None and template.uses_clock and minute != int(time.time() // 60):
+            return False
+        self._count_expansion(bind_id, count)
+        try:
+            self._flush_batch(batch)
+            self._debug(
+                "trigger_matched",
+                {
+                    "trigger": trigger,
+                    "method": method,
+                    "bind_id": bind_id,
+                    "title": bind.title,
+                    "speculative": True,
+                },
+            )
+        except Exception as exc:  # pragma: no cover - runtime guard
+            self._debug("input_error", {"error": str(exc)})
+        return True
+
     def _split_prefix(self, token: str) -> tuple[str | None, str]:
         for prefix in self._prefixes:
             if token.startswith(prefix):
@@ -148,7 +555,13 @@ class BinderEngine:
             return "", token
         return None, token
 
-    def _find_bind(self, trigger: str, prefixed: bool) -> tuple[dict | None, str]:
+    def _may_match(self, trigger: str) -> bool:
+        # Index lookup only; most keystrokes do not spell a whole trigger.
+        key = trigger.lower()
+        index = self._trigger_index
+        return key in index or (self._auto_layout and convert_layout(key) in index)
+
+    def _find_bind(self, trigger: str, prefixed: bool) -> tuple[Bind | None, str]:
         bind = self._find_bind_exact(trigger, prefixed)
         if bind:
             return bind, "exact"
@@ -159,45 +572,52 @@ class BinderEngine:
                 return bind, "layout"
         return None, "none"
 
-    def _find_bind_exact(self, trigger: str, prefixed: bool) -> dict | None:
-        for bind in self._binds:
-            bind_trigger = str(bind.get("trigger", ""))
-            options = bind.get("options", {}) or {}
-            only_prefix = options.get("only_prefix", True)
-            case_sensitive = options.get("case_sensitive", False)
-            if not prefixed and only_prefix:
+    def _find_bind_exact(self, trigger: str, prefixed: bool) -> Bind | None:
+        for bind in self._trigger_index.get(trigger.lower(), ()):
+            options = bind.options
+            if not prefixed and options.only_prefix:
                 continue
-            if case_sensitive:
-                if bind_trigger == trigger:
-                    return bind
-            else:
-                if bind_trigger.lower() == trigger.lower():
-                    return bind
+            if options.case_sensitive and bind.trigger != trigger:
+                continue
+            return bind
         return None
 
-    def _emit_bind(self, bind: dict) -> None:
-        bind_type = bind.get("type", "Text")
-        content = bind.get("content", "") or ""
-        cursor_back = bind.get("cursor_back", 0) or 0
-        if bind_type == "Multi":
-            lines = [line for line in content.splitlines() if line.strip()]
+    def _render_bind(self, bind: Bind, args: tuple[str, ...] = ()) -> str:
+        bind_id = bind.id
+        template = self._templates.get(bind_id)
+        if template is None:
+            template = literal_template(bind.content)
+        count = self._expansions.get(bind_id, 0) + 1
+        self._count_expansion(bind_id, count)
+        return template.render(self._variables, args, self._counters, count)
+
+    def _emit_bind(self, bind: Bind, text: str, erase: int = 0) -> None:
+        self._flush_batch(self._build_batch(bind, text, erase))
+
+    def _build_batch(self, bind: Bind, text: str, erase: int = 0) -> list[tuple[str, str]]:
+        batch: list[tuple[str, str]] = []
+        if erase and bind.options.delete_trigger:
+            batch.append(("send", ", ".join(["backspace"] * erase)))
+        if bind.type == "Multi":
+            lines = [line for line in text.splitlines() if line.strip()]
             for index, line in enumerate(lines):
-                self._kb.write(apply_variables(line, self._variables))
+                batch.append(("write", line))
                 if index < len(lines) - 1:
-                    self._kb.send("enter")
-            self._move_cursor_back(cursor_back)
+                    batch.append(("send", "enter"))
         else:
-            self._kb.write(apply_variables(content, self._variables))
-            self._move_cursor_back(cursor_back)
-
-    def _erase_token(self, count: int) -> None:
-        for _ in range(max(0, count)):
-            self._kb.send("backspace")
-
-    def _move_cursor_back(self, count: int) -> None:
-        steps = max(0, int(count or 0))
-        for _ in range(steps):
-            self._kb.send("left")
+            batch.append(("write", text))
+        cursor_back = max(0, bind.cursor_back)
+        if cursor_back:
+            batch.append(("send", ", ".join(["left"] * cursor_back)))
+        return batch
+
+    def _flush_batch(self, batch: list[tuple[str, str]]) -> None:
+        kb = self._kb
+        for action, value in batch:
+            if action == "write":
+                kb.write(value)
+            else:
+                kb.send(value)
 
     def _debug(self, reason: str, meta: dict[str, Any]) -> None:
         self._log(
@@ -231,58 +651,97 @@ class BinderEngine:
         return get_active_process_name()
 
     def _refresh_hotkeys(self) -> None:
-        if not self.available or self._kb is None:
-            return
-        self._clear_hotkeys()
+        by_combo: dict[str, list[dict[str, Any]]] = {}
         for hotkey in self._hotkeys:
-            combo = str(hotkey.get("hotkey", "")).strip()
-            if not combo:
-                continue
-            handle = self._kb.add_hotkey(combo, lambda hk=hotkey: self._on_hotkey(hk))
-            self._hotkey_handles.append(handle)
-
-    def _clear_hotkeys(self) -> None:
-        if not self.available or self._kb is None:
+            combo = normalize_hotkey(str(hotkey.get("hotkey", "")))
+            if combo:
+                by_combo.setdefault(combo, []).append(hotkey)
+        self._hotkeys_by_combo = by_combo
+        combos = frozenset(by_combo) | frozenset(self._app_hotkeys.values())
+        if not self.available or combos == self._chord_combos:
             return
-        for handle in self._hotkey_handles:
-            try:
-                self._kb.remove_hotkey(handle)
-            except Exception:  # pragma: no cover - safety
-                continue
-        self._hotkey_handles = []
+        self._chord_combos = combos
+        bindings = {combo: (lambda combo=combo: self._on_hotkey_combo(combo)) for combo in combos}
+        for combo in self._chords.set_bindings(bindings):
+            self._debug("hotkey_invalid", {"hotkey": combo})
+
+    def set_app_hotkeys(self, hotkeys: dict[str, str]) -> None:
+        """Registers application hotkeys (action -> combo) on the chord dispatcher."""
+        self._app_hotkeys = {
+            action: combo
+            for action, combo in ((action, normalize_hotkey(str(value))) for action, value in hotkeys.items())
+            if combo
+        }
+        self._refresh_hotkeys()
+
+    def set_app_hotkey_listener(self, listener) -> None:
+        self._app_hotkey_listener = listener
+
+    def _on_hotkey_combo(self, combo: str) -> None:
+        listener = self._app_hotkey_listener
+        if listener is not None:
+            for action, action_combo in self._app_hotkeys.items():
+                if action_combo == combo:
+                    listener(action)
+        for hotkey in self._hotkeys_by_combo.get(combo, ()):
+            self._on_hotkey(hotkey)
 
     def _on_hotkey(self, hotkey: dict[str, Any]) -> None:
         if not self._enabled:
             return
-        if self._macro_running:
-            return
-        steps = hotkey.get("steps", []) or []
-        if not steps:
+        ops = self._macro_ops.get(hotkey.get("id", ""))
+        if not ops:
             return
-        self._macro_running = True
-        thread = threading.Thread(
-            target=self._run_macro,
-            args=(hotkey, steps),
-            daemon=True,
-        )
-        thread.start()
+        self._macros.submit(hotkey, ops, str(hotkey.get("policy", "drop")))
 
     def run_macro_steps(self, steps: list[dict[str, Any]], title: str = "") -> None:
-        if not self._enabled or self._macro_running or not steps:
+        if not self._enabled or not steps:
             return
         hotkey = {"id": "manual", "hotkey": "", "title": title}
-        self._macro_running = True
-        thread = threading.Thread(
-            target=self._run_macro,
-            args=(hotkey, steps),
-            daemon=True,
-        )
-        thread.start()
-
-    def _run_macro(self, hotkey: dict[str, Any], steps: list[dict[str, Any]]) -> None:
+        try:
+            ops = compile_macro(steps)
+        except MacroCompileError as exc:
+            self._debug("macro_invalid", {"title": title, "error": str(exc)})
+            return
+        if ops:
+            self._macros.submit(hotkey, ops, "drop")
+
+    def cancel_macros(self) -> None:
+        self._macros.cancel_all()
+
+    def set_macro_listener(self, listener) -> None:
+        self._macro_listener = listener
+
+    def _macro_state_changed(self, jobs: list[dict[str, Any]]) -> None:
+        if self._macro_listener is not None:
+            self._macro_listener(jobs)
+
+    def _execute_ops(self, kb, ops: tuple[Op, ...], scheduler: DeadlineScheduler, job: MacroJob) -> bool:
+        """Runs compiled ops; returns True once the job is cancelled."""
+        for op in ops:
+            if job.cancelled:
+                return True
+            action = op[0]
+            if action == "send":
+                kb.send(op[1])
+            elif action == "write":
+                kb.write(op[1])
+            elif action == "sleep":
+                if scheduler.wait(op[1]):
+                    return True
+            elif action == "loop":
+                body, count = op[1], op[2]
+                iteration = 0
+                while count == 0 or iteration < count:
+                    if self._execute_ops(kb, body, scheduler, job):
+                        return True
+                    iteration += 1
+        return job.cancelled
+
+    def _run_macro(self, job: MacroJob) -> None:
         if not self.available or self._kb is None:
-            self._macro_running = False
             return
+        hotkey = job.hotkey
         self._log(
             {
                 "type": "macro_run",
@@ -296,26 +755,11 @@ class BinderEngine:
                 },
             }
         )
+        kb = self._kb
+        scheduler = DeadlineScheduler(job.cancel_event)
         try:
-            for step in steps:
-                step_type = step.get("type")
-                value = str(step.get("value", ""))
-                delay = float(step.get("delay", 0) or 0)
-
-                if step_type == "press_key":
-                    if value:
-                        self._kb.send(value)
-                elif step_type == "type_text":
-                    self._kb.write(value)
-                    if step.get("enter"):
-                        self._kb.send("enter")
-                elif step_type == "press_enter":
-                    self._kb.send("enter")
-                elif step_type == "delay":
-                    pass
-
-                if delay > 0:
-                    time.sleep(delay)
+            with high_resolution_timer():
+                self._execute_ops(kb, job.ops, scheduler, job)
         except Exception as exc:  # pragma: no cover - runtime guard
             self._log(
                 {
@@ -330,8 +774,27 @@ class BinderEngine:
                     },
                 }
             )
-        finally:
-            self._macro_running = False
+        timing = scheduler.stats()
+        if timing["waits"]:
+            self._log(
+                {
+                    "type": "macro_timing",
+                    "entity": "hotkey",
+                    "profile_id": self._active_profile.get("id"),
+                    "profile_name": self._active_profile.get("name"),
+                    "meta": {"hotkey_id": hotkey.get("id"), **timing},
+                }
+            )
+        if job.cancelled:
+            self._log(
+                {
+                    "type": "macro_cancelled",
+                    "entity": "hotkey",
+                    "profile_id": self._active_profile.get("id"),
+                    "profile_name": self._active_profile.get("name"),
+                    "meta": {"hotkey_id": hotkey.get("id"), "title": hotkey.get("title", "")},
+                }
+            )
 
 
 def get_active_process_name() -> str:
@@ -363,75 +826,12 @@ def get_active_process_name() -> str:
     return ""
 
 
-def apply_variables(text: str, variables: dict[str, str]) -> str:
-    value = text
-    replacements = {
-        "{discord_me}": variables.get("discord_me", ""),
-        "{discord_zga}": variables.get("discord_zga", ""),
-        "{discord_ga}": variables.get("discord_ga", ""),
-        "{me_name}": variables.get("me_name", ""),
-    }
-    for key, replacement in replacements.items():
-        value = value.replace(key, replacement)
-
-    now = datetime.now()
-    value = value.replace("{date}", now.strftime("%d.%m.%Y"))
-    value = value.replace("{time}", now.strftime("%H:%M"))
-
-    while True:
-        start = value.find("{g:")
-        if start == -1:
-            break
-        end = value.find("}", start)
-        if end == -1:
-            break
-        block = value[start + 3 : end]
-        if "|" in block:
-            male, female = block.split("|", 1)
-            replacement = male if variables.get("gender") != "female" else female
-            value = value[:start] + replacement + value[end + 1 :]
-        else:
-            break
-    return value
-
-
-def convert_layout(text: str) -> str:
-    mapping = {
-        "ф": "a",
-        "и": "b",
-        "с": "c",
-        "в": "d",
-        "у": "e",
-        "а": "f",
-        "п": "g",
-        "р": "h",
-        "ш": "i",
-        "о": "j",
-        "л": "k",
-        "д": "l",
-        "ь": "m",
-        "т": "n",
-        "щ": "o",
-        "з": "p",
-        "й": "q",
-        "к": "r",
-        "ы": "s",
-        "е": "t",
-        "г": "u",
-        "м": "v",
-        "ц": "w",
-        "ч": "x",
-        "н": "y",
-        "я": "z",
-    }
-    reverse = {v: k for k, v in mapping.items()}
-    converted = []
-    for ch in text:
-        lower = ch.lower()
-        if lower in mapping:
-            converted.append(mapping[lower])
-        elif lower in reverse:
-            converted.append(reverse[lower])
-        else:
-            converted.append(ch)
-    return "".join(converted)
+def apply_variables(text: str, variables: dict[str, str], args: tuple[str, ...] = ()) -> str:
+    try:
+        return compile_template(text).render(variables, args)
+    except TemplateError:
+        return text
+
+
+def _no_parse(combo: str) -> Any:
+    raise ValueError(combo)
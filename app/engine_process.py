@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from typing import Any
+
+from app.hotkeys import keyboard_available
+
+
+class EngineProcess:
+    """
+    Runs BinderEngine in a separate process so GUI work never competes with
+    the keyboard hook for the GIL. Mirrors the BinderEngine public API:
+    config snapshots and deltas go down the pipe, log events and suggestions
+    come back.
+    """
+
+    def __init__(self, log_func) -> None:
+        self._log = log_func
+        self._suggest_listener = None
+        self._macro_listener = None
+        self._app_hotkey_listener = None
+        self._app_hotkeys: dict[str, str] = {}
+        self._context = multiprocessing.get_context("spawn")
+        self._conn = None
+        self._process = None
+        self._reader: threading.Thread | None = None
+        self._send_lock = threading.Lock()
+        # Latest full config, kept current by the delta updates so a restarted
+        # engine process starts from it.
+        self._config: dict[str, Any] | None = None
+        self._templates: dict[str, tuple] = {}
+        self.available = keyboard_available()
+
+    def start(self) -> None:
+        if not self.available or self._process is not None:
+            return
+        self._conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_engine_main, args=(child_conn,), name="binder-engine", daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._reader = threading.Thread(target=self._read_loop, name="binder-engine-reader", daemon=True)
+        self._reader.start()
+        if self._templates:
+            self._send(("templates", self._templates))
+        if self._config is not None:
+            self._send(("config", *self._config_args()))
+        self._send(("app_hotkeys", self._app_hotkeys))
+        self._send(("start",))
+
+    def stop(self) -> None:
+        if self._process is None:
+            return
+        self._send(("stop",))
+        self._process.join(timeout=2)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def update_config(
+        self,
+        profile: dict[str, Any],
+        settings: dict[str, Any],
+        binds: list[dict[str, Any]],
+        variables: dict[str, Any],
+        hotkeys: list[dict[str, Any]] | None = None,
+    ) -> None:
+        # The engine only needs the profile identity for its log records.
+        identity = {"id": profile.get("id"), "name": profile.get("name")}
+        self._config = {
+            "profile": identity,
+            "settings": settings,
+            "binds": {bind.get("id"): bind for bind in binds},
+            "variables": variables,
+            "hotkeys": hotkeys or [],
+        }
+        self._send(("config", *self._config_args()))
+
+    def preload_templates(self, templates: dict[str, tuple]) -> None:
+        self._templates = templates
+        self._send(("templates", templates))
+
+    def update_settings(self, settings: dict[str, Any]) -> None:
+        if self._config is not None:
+            self._config["settings"] = settings
+        self._send(("settings", settings))
+
+    def update_binds(self, changed: list[dict[str, Any]], removed: list[str] = ()) -> None:
+        if self._config is not None:
+            binds = self._config["binds"]
+            for bind_id in removed:
+                binds.pop(bind_id, None)
+            for bind in changed:
+                binds[bind.get("id")] = bind
+        self._send(("binds", list(changed), list(removed)))
+
+    def update_variables(self, variables: dict[str, Any]) -> None:
+        if self._config is not None:
+            self._config["variables"] = variables
+        self._send(("variables", variables))
+
+    def update_hotkeys(self, hotkeys: list[dict[str, Any]]) -> None:
+        if self._config is not None:
+            self._config["hotkeys"] = hotkeys
+        self._send(("hotkeys", hotkeys))
+
+    def _config_args(self) -> tuple:
+        config = self._config
+        return (
+            config["profile"],
+            config["settings"],
+            list(config["binds"].values()),
+            config["variables"],
+            config["hotkeys"],
+        )
+
+    def run_macro_steps(self, steps: list[dict[str, Any]], title: str = "") -> None:
+        self._send(("macro", steps, title))
+
+    def cancel_macros(self) -> None:
+        self._send(("cancel",))
+
+    def set_macro_listener(self, listener) -> None:
+        self._macro_listener = listener
+
+    def set_app_hotkeys(self, hotkeys: dict[str, str]) -> None:
+        self._app_hotkeys = dict(hotkeys)
+        self._send(("app_hotkeys", self._app_hotkeys))
+
+    def set_app_hotkey_listener(self, listener) -> None:
+        self._app_hotkey_listener = listener
+
+    def set_suggestion_listener(self, listener) -> None:
+        self._suggest_listener = listener
+
+    def expand_suggestion(self, bind_id: str) -> None:
+        self._send(("expand", bind_id))
+
+    def _send(self, message: tuple) -> None:
+        if self._conn is None:
+            return
+        with self._send_lock:
+            try:
+                self._conn.send(message)
+            except (BrokenPipeError, EOFError, OSError):
+                return
+
+    def _read_loop(self) -> None:
+        conn = self._conn
+        while conn is not None:
+            try:
+                kind, payload = conn.recv()
+            except (EOFError, OSError):
+                break
+            if kind == "log":
+                self._log(payload)
+            elif kind == "suggest" and self._suggest_listener is not None:
+                self._suggest_listener(payload)
+            elif kind == "macros" and self._macro_listener is not None:
+                self._macro_listener(payload)
+            elif kind == "app_hotkey" and self._app_hotkey_listener is not None:
+                self._app_hotkey_listener(payload)
+
+
+def _engine_main(conn) -> None:
+    from app.engine import BinderEngine
+
+    lock = threading.Lock()
+
+    def post(kind: str, payload: Any) -> None:
+        with lock:
+            try:
+                conn.send((kind, payload))
+            except (BrokenPipeError, EOFError, OSError):
+                pass
+
+    engine = BinderEngine(lambda event: post("log", event))
+    engine.set_suggestion_listener(lambda items: post("suggest", items))
+    engine.set_macro_listener(lambda jobs: post("macros", jobs))
+    engine.set_app_hotkey_listener(lambda action: post("app_hotkey", action))
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        kind = message[0]
+        if kind == "config":
+            engine.update_config(*message[1:])
+        elif kind == "templates":
+            engine.preload_templates(message[1])
+        elif kind == "settings":
+            engine.update_settings(message[1])
+        elif kind == "binds":
+            engine.update_binds(message[1], message[2])
+        elif kind == "variables":
+            engine.update_variables(message[1])
+        elif kind == "hotkeys":
+            engine.update_hotkeys(message[1])
+        elif kind == "app_hotkeys":
+            engine.set_app_hotkeys(message[1])
+        elif kind == "start":
+            engine.start()
+        elif kind == "macro":
+            engine.run_macro_steps(message[1], title=message[2])
+        elif kind == "expand":
+            engine.expand_suggestion(message[1])
+        elif kind == "cancel":
+            engine.cancel_macros()
+        elif kind == "stop":
+            break
+    engine.stop()
+    conn.close()
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import Callable
+
+from app.log_store import append_event
+
+try:
+    from watchdog.observers import Observer as _Observer  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    _Observer = None
+
+POLL_INTERVAL = 1.0
+# With notifications the poll is only a safety net (network drives, missed events).
+NOTIFY_POLL_INTERVAL = 10.0
+# Lets a burst of events (temp write + rename) settle before the file is stat'ed.
+SETTLE_DELAY = 0.2
+
+
+class _Handler:
+    # watchdog calls dispatch() for every event in the watched directory.
+    def __init__(self, name: str, wake: threading.Event) -> None:
+        self._name = name
+        self._wake = wake
+
+    def dispatch(self, event) -> None:
+        for path in (getattr(event, "src_path", ""), getattr(event, "dest_path", "")):
+            if path and os.path.basename(os.fsdecode(path)) == self._name:
+                self._wake.set()
+                return
+
+
+def _log_error(path: Path, exc: Exception) -> None:
+    try:
+        append_event(
+            {
+                "type": "file_watch_error",
+                "entity": "storage",
+                "meta": {"path": str(path), "error": f"{type(exc).__name__}: {exc}"},
+            }
+        )
+    except OSError:
+        pass
+
+
+class FileWatcher:
+    """
+    Calls ``on_change`` on a background thread when ``path`` changes size or
+    mtime. Uses watchdog notifications when it is installed and polls
+    otherwise; ``on_change`` decides whether the change matters (e.g. it was
+    the app's own write).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        on_change: Callable[[], object],
+        interval: float = POLL_INTERVAL,
+        on_error: Callable[[Path, Exception], object] = _log_error,
+    ) -> None:
+        self.path = path
+        self._on_change = on_change
+        self._on_error = on_error
+        self._interval = interval
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._observer = None
+        self._thread: threading.Thread | None = None
+        self._signature = self._stat()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        if _Observer is not None:
+            try:
+                observer = _Observer()
+                observer.schedule(_Handler(self.path.name, self._wake), str(self.path.parent), recursive=False)
+                observer.start()
+            except OSError:
+                observer = None
+            if observer is not None:
+                self._observer = observer
+                self._interval = max(self._interval, NOTIFY_POLL_INTERVAL)
+        self._thread = threading.Thread(target=self._run, name="binder-file-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=1)
+            self._observer = None
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._thread = None
+
+    def _stat(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            if self._wake.wait(self._interval):
+                self._stopped.wait(SETTLE_DELAY)
+                self._wake.clear()
+            if self._stopped.is_set():
+                return
+            signature = self._stat()
+            if signature is None or signature == self._signature:
+                continue
+            self._signature = signature
+            try:
+                self._on_change()
+            except Exception as exc:
+                # Unreadable or invalid content must not end the thread; the
+                # file is read again once it changes.
+                self._on_error(self.path, exc)
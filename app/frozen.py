@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import Any
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict for records shared between DataStore and its readers.
+    Stays a real dict, so json, ``.get`` and ``{**record}`` keep working;
+    changes are made by building a new record with ``replace``.
+    """
+
+    __slots__ = ()
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("record is read-only; use replace() or thaw()")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def replace(self, **changes: Any) -> FrozenDict:
+        return FrozenDict({**self, **{key: freeze(value) for key, value in changes.items()}})
+
+    def __hash__(self) -> int:
+        return hash(frozenset(self.items()))
+
+    def __copy__(self) -> FrozenDict:
+        return self
+
+    def __deepcopy__(self, memo: dict) -> FrozenDict:
+        return self
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Recursively converts JSON-shaped data into FrozenDicts and tuples."""
+    if isinstance(value, FrozenDict):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Returns a mutable deep copy of frozen data (dicts and lists)."""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
@@ -27,6 +27,13 @@ DISPLAY_MAP = {
     "escape": "Esc",
 }
 
+SETTINGS_HOTKEY_LABELS = {
+    "toggle": "Вкл/выкл binder",
+    "open": "Открыть окно",
+    "profile_switch": "Переключить профиль",
+    "macro_cancel": "Остановить макросы",
+}
+
 
 def keyboard_available() -> bool:
     return sys.platform == "win32" and _keyboard is not None
@@ -0,0 +1,43 @@
+"""
+Russian <-> Latin keyboard layout conversion ("руддщ" <-> "hello"), shared
+by the engine, the conflict index and the macro recorder.
+"""
+
+_LAYOUT_MAP = {
+    "ф": "a",
+    "и": "b",
+    "с": "c",
+    "в": "d",
+    "у": "e",
+    "а": "f",
+    "п": "g",
+    "р": "h",
+    "ш": "i",
+    "о": "j",
+    "л": "k",
+    "д": "l",
+    "ь": "m",
+    "т": "n",
+    "щ": "o",
+    "з": "p",
+    "й": "q",
+    "к": "r",
+    "ы": "s",
+    "е": "t",
+    "г": "u",
+    "м": "v",
+    "ц": "w",
+    "ч": "x",
+    "н": "y",
+    "я": "z",
+}
+# Built once: convert_layout runs on every keystroke during speculation.
+_LAYOUT_TABLE = {
+    ord(char): target
+    for source, target in (*_LAYOUT_MAP.items(), *((en, ru) for ru, en in _LAYOUT_MAP.items()))
+    for char in (source, source.upper())
+}
+
+
+def convert_layout(text: str) -> str:
+    return text.translate(_LAYOUT_TABLE)
@@ -3,6 +3,7 @@ from datetime import datetime, timezone
 from typing import Any
 
 from app.config import LOG_DIR, LOG_FILE
+from app.models import json_default
 
 
 def append_event(event: dict[str, Any]) -> None:
@@ -12,7 +13,7 @@ def append_event(event: dict[str, Any]) -> None:
         **event,
     }
     with LOG_FILE.open("a", encoding="utf-8") as handle:
-        handle.write(json.dumps(payload, ensure_ascii=False) + "\n")
+        handle.write(json.dumps(payload, ensure_ascii=False, default=json_default) + "\n")
 
 
 def read_events(limit: int | None = None) -> list[dict[str, Any]]:
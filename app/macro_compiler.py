@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from typing import Any
+
+from app.hotkeys import is_hotkey_valid, normalize_hotkey
+
+# Compiled ops: ("send", "ctrl+a, t"), ("write", "text"), ("sleep", seconds),
+# ("loop", (body ops...), count) where count 0 repeats until cancelled.
+Op = tuple[Any, ...]
+
+MAX_REPEAT = 10000
+
+
+class MacroCompileError(ValueError):
+    def __init__(self, index: int, value: str, message: str) -> None:
+        super().__init__(f"step {index + 1}: {message}")
+        self.index = index
+        self.value = value
+
+
+def compile_macro(steps: list[dict[str, Any]]) -> tuple[Op, ...]:
+    """
+    Turns editor steps into an op list: key names are validated once,
+    consecutive zero-delay keys and texts are batched into one injection
+    and no-op delays disappear.
+
+    A ``repeat`` step wraps the ``span`` steps before it into a loop op that
+    runs ``count`` times (0 means until cancelled), so repeated actions stay
+    one step on disk and are never re-parsed per iteration.
+    """
+    # One op list per top-level step, so repeat spans can be cut by step.
+    units: list[list[Op]] = []
+    for index, step in enumerate(steps):
+        unit: list[Op] = []
+        step_type = step.get("type")
+        value = str(step.get("value", "") or "")
+        try:
+            delay = float(step.get("delay", 0) or 0)
+        except (TypeError, ValueError) as exc:
+            raise MacroCompileError(index, str(step.get("delay")), "invalid delay") from exc
+
+        if step_type == "press_key":
+            if value:
+                key = normalize_hotkey(value)
+                if not is_hotkey_valid(key):
+                    raise MacroCompileError(index, value, f"unknown key {value!r}")
+                _append(unit, "send", key)
+        elif step_type == "type_text":
+            if value:
+                _append(unit, "write", value)
+            if step.get("enter"):
+                _append(unit, "send", "enter")
+        elif step_type == "press_enter":
+            _append(unit, "send", "enter")
+        elif step_type == "repeat":
+            unit = _compile_repeat(index, step, units)
+        elif step_type != "delay":
+            raise MacroCompileError(index, str(step_type), f"unknown step type {step_type!r}")
+
+        if delay > 0:
+            _append(unit, "sleep", delay)
+        units.append(unit)
+
+    ops: list[Op] = []
+    for unit in units:
+        for op in unit:
+            _append(ops, *op)
+    return tuple(ops)
+
+
+def _compile_repeat(index: int, step: dict[str, Any], units: list[list[Op]]) -> list[Op]:
+    try:
+        count = int(step.get("count", 0) or 0)
+        span = int(step.get("span", 1) or 1)
+    except (TypeError, ValueError) as exc:
+        raise MacroCompileError(index, str(step.get("count")), "invalid repeat") from exc
+    if count < 0 or count > MAX_REPEAT:
+        raise MacroCompileError(index, str(count), f"repeat count must be 0..{MAX_REPEAT}")
+    if span < 1 or span > len(units):
+        raise MacroCompileError(index, str(span), "repeat covers missing steps")
+
+    body: list[Op] = []
+    for unit in units[-span:]:
+        for op in unit:
+            _append(body, *op)
+    del units[-span:]
+    if not body:
+        return []
+    if count == 0 and not _has_sleep(body):
+        # An endless loop without a pause would flood the game with input.
+        raise MacroCompileError(index, "0", "endless repeat needs a delay")
+    if count == 1:
+        return body
+    return [("loop", tuple(body), count)]
+
+
+def _has_sleep(ops: list[Op] | tuple[Op, ...]) -> bool:
+    return any(op[0] == "sleep" or (op[0] == "loop" and _has_sleep(op[1])) for op in ops)
+
+
+def _has_comma_key(keys: str) -> bool:
+    # Merged sends never contain a comma key, so any "," left is one.
+    return "," in keys.replace(", ", "")
+
+
+def _append(ops: list[Op], action: str, value: Any, *extra: Any) -> None:
+    if action == "loop":
+        ops.append((action, value, *extra))
+        return
+    if ops and ops[-1][0] == action:
+        previous = ops[-1][1]
+        if action == "send" and (_has_comma_key(previous) or _has_comma_key(value)):
+            # ", " separates the keys of a merged send, so a comma key keeps its own op.
+            ops.append((action, value))
+            return
+        if action == "send":
+            ops[-1] = ("send", f"{previous}, {value}")
+        elif action == "write":
+            ops[-1] = ("write", previous + value)
+        else:
+            ops[-1] = ("sleep", previous + value)
+        return
+    ops.append((action, value))
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from app.layout import convert_layout
+
+# Gaps shorter than this are typing cadence, not intentional pauses.
+MERGE_GAP = 0.35
+# Longer gaps are rounded to this step (seconds).
+DELAY_QUANTUM = 0.05
+
+MODIFIERS = {
+    "ctrl": "ctrl",
+    "left ctrl": "ctrl",
+    "right ctrl": "ctrl",
+    "alt": "alt",
+    "left alt": "alt",
+    "right alt": "alt",
+    "alt gr": "alt",
+    "shift": "shift",
+    "left shift": "shift",
+    "right shift": "shift",
+    "windows": "windows",
+    "left windows": "windows",
+    "right windows": "windows",
+    "cmd": "windows",
+}
+MODIFIER_ORDER = ("ctrl", "alt", "shift", "windows")
+
+
+def _fields(event: Any) -> tuple[str, str, float]:
+    if isinstance(event, (tuple, list)):
+        event_type, name, timestamp = event[:3]
+    else:
+        event_type, name, timestamp = event.event_type, event.name, event.time
+    name = str(name or "")
+    # Single characters keep their case (shift is already applied to them).
+    if len(name) > 1:
+        name = name.lower()
+    return str(event_type), name, float(timestamp)
+
+
+def compress_recording(
+    events: Iterable[Any],
+    stop_key: str | None = "esc",
+    merge_gap: float = MERGE_GAP,
+    quantum: float = DELAY_QUANTUM,
+) -> list[dict[str, Any]]:
+    """
+    Converts raw key events (keyboard.KeyboardEvent or (event_type, name, time)
+    tuples) into the fewest editor steps: printable runs become one
+    ``type_text``, Enter folds into the preceding text, backspaces edit the
+    run, modifier-only presses disappear and pauses are quantized.
+    """
+    steps: list[dict[str, Any]] = []
+    held: set[str] = set()
+    text_run: dict[str, Any] | None = None
+    last_time: float | None = None
+
+    for event in events:
+        event_type, name, timestamp = _fields(event)
+        modifier = MODIFIERS.get(name)
+        if modifier is not None:
+            if event_type == "down":
+                held.add(modifier)
+            else:
+                held.discard(modifier)
+            continue
+        if event_type != "down" or not name or name == stop_key:
+            continue
+
+        gap = 0.0 if last_time is None else timestamp - last_time
+        last_time = timestamp
+        delay = 0.0 if gap < merge_gap else round(round(gap / quantum) * quantum, 2)
+        if delay and steps:
+            steps[-1]["delay"] = delay
+            text_run = None
+
+        combo_mods = [mod for mod in MODIFIER_ORDER if mod in held]
+        plain = not any(mod != "shift" for mod in combo_mods)
+        char = " " if name == "space" else name
+        if plain and len(char) == 1:
+            if text_run is None or text_run["enter"]:
+                text_run = {"type": "type_text", "value": "", "enter": False, "delay": 0.0}
+                steps.append(text_run)
+            text_run["value"] += char
+            continue
+        if plain and name == "enter":
+            if text_run is not None and not text_run["enter"]:
+                text_run["enter"] = True
+            else:
+                steps.append({"type": "press_enter", "delay": 0.0})
+                text_run = None
+            continue
+        if plain and name == "backspace" and text_run is not None and text_run["value"]:
+            text_run["value"] = text_run["value"][:-1]
+            if not text_run["value"] and not text_run["enter"]:
+                steps.remove(text_run)
+                text_run = None
+            continue
+
+        key = name.lower()
+        if len(key) == 1 and not key.isascii():
+            # Hotkeys are stored by their Latin key whatever layout was active.
+            key = convert_layout(key)
+        steps.append({"type": "press_key", "value": "+".join([*combo_mods, key]), "delay": 0.0})
+        text_run = None
+    return steps
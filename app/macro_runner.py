@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Callable
+
+POLICIES = ("drop", "queue", "restart")
+
+
+class MacroJob:
+    __slots__ = ("hotkey", "ops", "cancel_event", "state")
+
+    def __init__(self, hotkey: dict[str, Any], ops: tuple[tuple[Any, ...], ...]) -> None:
+        self.hotkey = hotkey
+        self.ops = ops
+        self.cancel_event = threading.Event()
+        self.state = "queued"
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+
+class MacroExecutor:
+    """
+    Persistent macro workers fed from a job queue.
+
+    Policies decide what happens when a macro is triggered while another one
+    is queued or running: ``drop`` ignores it, ``queue`` runs it afterwards,
+    ``restart`` cancels the running and queued jobs and starts it next.
+    """
+
+    def __init__(
+        self,
+        run_job: Callable[[MacroJob], None],
+        on_change: Callable[[list[dict[str, Any]]], None] | None = None,
+        workers: int = 1,
+    ) -> None:
+        self._run_job = run_job
+        self._on_change = on_change
+        self._worker_count = max(1, workers)
+        self._cond = threading.Condition()
+        self._queue: deque[MacroJob] = deque()
+        self._running: list[MacroJob] = []
+        self._threads: list[threading.Thread] = []
+        self._closed = False
+
+    def submit(self, hotkey: dict[str, Any], ops: tuple[tuple[Any, ...], ...], policy: str = "drop") -> bool:
+        job = MacroJob(hotkey, ops)
+        with self._cond:
+            if self._closed:
+                return False
+            busy = bool(self._queue or self._running)
+            if policy == "restart":
+                self._cancel_locked()
+            elif busy and policy != "queue":
+                return False
+            self._queue.append(job)
+            self._ensure_workers_locked()
+            self._cond.notify()
+        self._notify()
+        return True
+
+    def cancel_all(self) -> None:
+        with self._cond:
+            self._cancel_locked()
+        self._notify()
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cancel_locked()
+            self._cond.notify_all()
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        with self._cond:
+            jobs = [*self._running, *self._queue]
+        return [
+            {
+                "id": job.hotkey.get("id"),
+                "title": job.hotkey.get("title", ""),
+                "state": job.state,
+            }
+            for job in jobs
+        ]
+
+    def _cancel_locked(self) -> None:
+        for job in self._running:
+            job.cancel_event.set()
+        for job in self._queue:
+            job.state = "cancelled"
+        self._queue.clear()
+
+    def _ensure_workers_locked(self) -> None:
+        while len(self._threads) < self._worker_count:
+            thread = threading.Thread(
+                target=self._work,
+                name=f"binder-macro-{len(self._threads) + 1}",
+                daemon=True,
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                job = self._queue.popleft()
+                job.state = "running"
+                self._running.append(job)
+            self._notify()
+            try:
+                self._run_job(job)
+            finally:
+                with self._cond:
+                    self._running.remove(job)
+                    job.state = "cancelled" if job.cancelled else "done"
+                self._notify()
+
+    def _notify(self) -> None:
+        if self._on_change is not None:
+            self._on_change(self.snapshot())
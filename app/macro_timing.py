@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import ctypes
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+# Below this much remaining time the scheduler stops sleeping and spins.
+SPIN_THRESHOLD = 0.002
+
+
+class DeadlineScheduler:
+    """
+    Waits against absolute deadlines measured from the start of the macro,
+    so injection time and sleep overshoot never accumulate into drift.
+    """
+
+    def __init__(self, cancel_event: threading.Event) -> None:
+        self._cancel = cancel_event
+        self._start = time.perf_counter()
+        self._deadline = self._start
+        # Running aggregates: endless loops must not grow memory per wait.
+        self._waits = 0
+        self._late_total = 0.0
+        self._late_max = 0.0
+
+    def wait(self, seconds: float) -> bool:
+        """Waits until the next deadline; returns True if cancelled meanwhile."""
+        self._deadline += seconds
+        deadline = self._deadline
+        remaining = deadline - time.perf_counter()
+        if remaining > SPIN_THRESHOLD and self._cancel.wait(remaining - SPIN_THRESHOLD):
+            return True
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if self._cancel.is_set():
+                return True
+            time.sleep(0)  # yield the GIL to the hook thread while spinning
+        late = now - deadline
+        self._waits += 1
+        self._late_total += late
+        if late > self._late_max:
+            self._late_max = late
+        return False
+
+    def stats(self) -> dict[str, float | int]:
+        if not self._waits:
+            return {"waits": 0}
+        return {
+            "waits": self._waits,
+            "jitter_mean_ms": round(self._late_total / self._waits * 1000, 3),
+            "jitter_max_ms": round(self._late_max * 1000, 3),
+            "elapsed_ms": round((time.perf_counter() - self._start) * 1000, 3),
+            "scheduled_ms": round((self._deadline - self._start) * 1000, 3),
+        }
+
+
+@contextmanager
+def high_resolution_timer() -> Iterator[None]:
+    """Raises the Windows timer resolution to 1 ms for the duration of a macro."""
+    if sys.platform != "win32":
+        yield
+        return
+    try:
+        winmm = ctypes.WinDLL("winmm")
+        winmm.timeBeginPeriod(1)
+    except Exception:  # pragma: no cover - best effort
+        yield
+        return
+    try:
+        yield
+    finally:
+        winmm.timeEndPeriod(1)
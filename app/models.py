@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import sys
+from collections.abc import Mapping
+from dataclasses import dataclass, fields, replace
+from operator import attrgetter
+from typing import Any, ClassVar
+
+from app.frozen import FrozenDict, freeze
+
+
+class ModelError(ValueError):
+    pass
+
+
+class Record(Mapping):
+    """
+    Base for the slotted domain records. Records are immutable and still
+    behave as read-only mappings of the JSON shape, so code written against
+    ``bind.get("trigger")`` keeps working next to ``bind.trigger``. Keys the
+    model does not know are kept in ``extra`` and written back unchanged.
+    """
+
+    __slots__ = ()
+
+    _KEYS: ClassVar[tuple[str, ...]] = ()
+    _FIELDS: ClassVar[tuple[str, ...]] = ()
+    # attrgetter over _FIELDS: the record's values as a tuple.
+    _values: ClassVar[Any] = None
+    _KEY_SET: ClassVar[frozenset[str]] = frozenset()
+    # Fields left out of to_dict() while they hold their default value.
+    _OPTIONAL: ClassVar[dict[str, Any]] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._KEY_SET:
+            return getattr(self, key)
+        return self.extra[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._KEY_SET:
+            return getattr(self, key)
+        return self.extra.get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._KEY_SET or key in self.extra
+
+    def __iter__(self):
+        yield from self._KEYS
+        yield from self.extra
+
+    def __len__(self) -> int:
+        return len(self._KEYS) + len(self.extra)
+
+    def __hash__(self) -> int:
+        return hash((type(self), *(getattr(self, key) for key in self._KEYS), self.extra))
+
+    def __eq__(self, other: object) -> bool:
+        # Field by field for records of one type; Mapping.__eq__ would build
+        # a dict of every item on both sides.
+        if other is self:
+            return True
+        if type(other) is type(self):
+            return self._values(self) == self._values(other)
+        return Mapping.__eq__(self, other)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def __copy__(self) -> Record:
+        return self
+
+    def __deepcopy__(self, memo: dict) -> Record:
+        return self
+
+    def __reduce__(self):
+        # Rebuild positionally; the dataclass __setstate__ is several times
+        # slower to unpickle (see app/snapshot_cache.py).
+        return (type(self), self._values(self))
+
+    def replace(self, **changes: Any) -> Record:
+        return replace(self, **changes)
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {}
+        optional = self._OPTIONAL
+        for key in self._KEYS:
+            value = getattr(self, key)
+            if key in optional and value == optional[key]:
+                continue
+            data[key] = to_plain(value)
+        for key, value in self.extra.items():
+            data[key] = to_plain(value)
+        return data
+
+
+def _record(cls):
+    cls = dataclass(frozen=True, slots=True, eq=False)(cls)
+    cls._FIELDS = tuple(field.name for field in fields(cls))
+    cls._KEYS = tuple(name for name in cls._FIELDS if name != "extra")
+    cls._values = staticmethod(attrgetter(*cls._FIELDS))
+    cls._KEY_SET = frozenset(cls._KEYS)
+    return cls
+
+
+def to_plain(value: Any) -> Any:
+    """Converts records, FrozenDicts and tuples back to JSON-ready data."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [to_plain(item) for item in value]
+    return value
+
+
+def json_default(value: Any) -> Any:
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _mapping(data: Any, model: str) -> Mapping:
+    if data is None:
+        return {}
+    if not isinstance(data, Mapping):
+        raise ModelError(f"{model}: expected an object, got {type(data).__name__}")
+    return data
+
+
+def _sequence(data: Any, model: str) -> tuple:
+    if data is None:
+        return ()
+    if isinstance(data, (str, bytes)) or not isinstance(data, (list, tuple)):
+        raise ModelError(f"{model}: expected a list, got {type(data).__name__}")
+    return tuple(data)
+
+
+def _str(value: Any, default: str = "") -> str:
+    return default if value is None else str(value)
+
+
+def _int(value: Any, default: int, model: str) -> int:
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError) as exc:
+        raise ModelError(f"{model}: invalid integer {value!r}") from exc
+
+
+def _float(value: Any, default: float, model: str) -> float:
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError) as exc:
+        raise ModelError(f"{model}: invalid number {value!r}") from exc
+
+
+def _extra(data: Mapping, known: frozenset[str]) -> FrozenDict:
+    if all(key in known for key in data):
+        return _NO_EXTRA
+    return freeze({key: value for key, value in data.items() if key not in known})
+
+
+_NO_EXTRA = FrozenDict()
+
+
+@_record
+class BindOptions(Record):
+    delete_trigger: bool = True
+    case_sensitive: bool = False
+    only_prefix: bool = True
+    extra: FrozenDict = _NO_EXTRA
+
+    @classmethod
+    def from_dict(cls, data: Any) -> BindOptions:
+        if isinstance(data, BindOptions):
+            return data
+        data = _mapping(data, "options")
+        if not data:
+            return DEFAULT_BIND_OPTIONS
+        return cls(
+            delete_trigger=bool(data.get("delete_trigger", True)),
+            case_sensitive=bool(data.get("case_sensitive", False)),
+            only_prefix=bool(data.get("only_prefix", True)),
+            extra=_extra(data, cls._KEY_SET),
+        )
+
+
+DEFAULT_BIND_OPTIONS = BindOptions()
+
+
+@_record
+class Bind(Record):
+    id: str = ""
+    title: str = ""
+    category: str = ""
+    trigger: str = ""
+    type: str = "Text"
+    content: str = ""
+    help_section: str = ""
+    cursor_back: int = 0
+    options: BindOptions = DEFAULT_BIND_OPTIONS
+    extra: FrozenDict = _NO_EXTRA
+
+    @classmethod
+    def from_dict(cls, data: Any) -> Bind:
+        if isinstance(data, Bind):
+            return data
+        data = _mapping(data, "bind")
+        return cls(
+            id=_str(data.get("id")),
+            title=_str(data.get("title")),
+            # Few distinct values shared by thousands of binds.
+            category=sys.intern(_str(data.get("category"))),
+            trigger=_str(data.get("trigger")),
+            type=sys.intern(_str(data.get("type"), "Text") or "Text"),
+            content=_str(data.get("content")),
+            help_section=sys.intern(_str(data.get("help_section"))),
+            cursor_back=_int(data.get("cursor_back"), 0, "bind"),
+            options=BindOptions.from_dict(data.get("options")),
+            extra=_extra(data, cls._KEY_SET),
+        )
+
+
+@_record
+class MacroStep(Record):
+    type: str
+    value: str = ""
+    enter: bool = False
+    delay: float = 0.0
+    count: int = 0
+    span: int = 1
+    extra: FrozenDict = _NO_EXTRA
+
+    # JSON keys each step type carries besides "type" and "delay".
+    _TYPE_KEYS: ClassVar[dict[str, tuple[str, ...]]] = {
+        "press_key": ("value",),
+        "type_text": ("value", "enter"),
+        "repeat": ("count", "span"),
+    }
+
+    @classmethod
+    def from_dict(cls, data: Any) -> MacroStep:
+        if isinstance(data, MacroStep):
+            return data
+        data = _mapping(data, "step")
+        step_type = data.get("type")
+        if not step_type:
+            raise ModelError("step: missing type")
+        return cls(
+            type=sys.intern(str(step_type)),
+            value=_str(data.get("value")),
+            enter=bool(data.get("enter", False)),
+            delay=_float(data.get("delay"), 0.0, "step"),
+            count=_int(data.get("count"), 0, "step"),
+            span=_int(data.get("span"), 1, "step"),
+            extra=_extra(data, cls._KEY_SET),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {"type": self.type}
+        for key in self._TYPE_KEYS.get(self.type, ()):
+            data[key] = getattr(self, key)
+        data["delay"] = self.delay
+        data.update(to_plain(self.extra))
+        return data
+
+
+@_record
+class Hotkey(Record):
+    id: str = ""
+    title: str = ""
+    hotkey: str = ""
+    policy: str = "drop"
+    steps: tuple[MacroStep, ...] = ()
+    extra: FrozenDict = _NO_EXTRA
+
+    @classmethod
+    def from_dict(cls, data: Any) -> Hotkey:
+        if isinstance(data, Hotkey):
+            return data
+        data = _mapping(data, "hotkey")
+        return cls(
+            id=_str(data.get("id")),
+            title=_str(data.get("title")),
+            hotkey=_str(data.get("hotkey")),
+            policy=sys.intern(_str(data.get("policy"), "drop") or "drop"),
+            steps=tuple(MacroStep.from_dict(step) for step in _sequence(data.get("steps"), "hotkey.steps")),
+            extra=_extra(data, cls._KEY_SET),
+        )
+
+
+@_record
+class Settings(Record):
+    trigger_prefixes: tuple[str, ...] = (".",)
+    commit_keys: tuple[str, ...] = ("space",)
+    binder_enabled: bool = True
+    allow_no_prefix: bool = False
+    auto_layout: bool = True
+    autocomplete: bool = False
+    autocomplete_limit: int = 5
+    hotkeys: FrozenDict = _NO_EXTRA
+    apps_filter: FrozenDict = _NO_EXTRA
+    extra: FrozenDict = _NO_EXTRA
+
+    @classmethod
+    def from_dict(cls, data: Any) -> Settings:
+        if isinstance(data, Settings):
+            return data
+        data = _mapping(data, "settings")
+        return cls(
+            trigger_prefixes=tuple(
+                sys.intern(str(p)) for p in _sequence(data.get("trigger_prefixes", (".",)), "trigger_prefixes")
+            ),
+            commit_keys=tuple(sys.intern(str(k)) for k in _sequence(data.get("commit_keys", ("space",)), "commit_keys")),
+            binder_enabled=bool(data.get("binder_enabled", True)),
+            allow_no_prefix=bool(data.get("allow_no_prefix", False)),
+            auto_layout=bool(data.get("auto_layout", True)),
+            autocomplete=bool(data.get("autocomplete", False)),
+            autocomplete_limit=_int(data.get("autocomplete_limit"), 5, "settings"),
+            hotkeys=freeze(_mapping(data.get("hotkeys"), "settings.hotkeys")),
+            apps_filter=freeze(_mapping(data.get("apps_filter"), "settings.apps_filter")),
+            extra=_extra(data, cls._KEY_SET),
+        )
+
+
+@_record
+class Profile(Record):
+    id: str = ""
+    name: str = ""
+    created_at: str = ""
+    updated_at: str = ""
+    settings: Settings = Settings()
+    variables: FrozenDict = _NO_EXTRA
+    hotkeys: tuple[Hotkey, ...] = ()
+    binds: tuple[Bind, ...] = ()
+    extra: FrozenDict = _NO_EXTRA
+
+    @classmethod
+    def from_dict(cls, data: Any) -> Profile:
+        if isinstance(data, Profile):
+            return data
+        data = _mapping(data, "profile")
+        return cls(
+            id=_str(data.get("id")),
+            name=_str(data.get("name")),
+            created_at=_str(data.get("created_at")),
+            updated_at=_str(data.get("updated_at")),
+            settings=Settings.from_dict(data.get("settings")),
+            variables=freeze(_mapping(data.get("variables"), "variables")),
+            hotkeys=tuple(Hotkey.from_dict(item) for item in _sequence(data.get("hotkeys"), "profile.hotkeys")),
+            binds=tuple(Bind.from_dict(item) for item in _sequence(data.get("binds"), "profile.binds")),
+            extra=_extra(data, cls._KEY_SET),
+        )
+
+
+Bind._OPTIONAL = {"help_section": "", "cursor_back": 0}
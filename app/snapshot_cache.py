@@ -0,0 +1,119 @@
+"""
+Binary cache next to a JSON snapshot (profiles.json -> profiles.cache).
+
+Holds the parsed model records plus the template IR of every bind, pickled,
+so a start with an unchanged profiles.json skips the JSON parse, the model
+validation and the template parser. The cache is only trusted when the
+source's size, mtime and BLAKE2 digest all match the ones it was built
+from; a missing, stale or unreadable cache falls back to the JSON file.
+
+Rebuilds run on a background thread after every load from JSON and every
+write, so neither startup nor the store's writer waits for them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import Any
+
+from app.models import Profile
+from app.templates import IR, TemplateError, parse_template
+
+# Bumped whenever the pickled layout (or the record classes) change.
+CACHE_VERSION = 1
+
+
+def _digest(payload: bytes) -> str:
+    return hashlib.blake2b(payload, digest_size=20).hexdigest()
+
+
+class SnapshotCache:
+    def __init__(self, source: Path) -> None:
+        self.source = source
+        self.path = source.with_suffix(".cache")
+        self._cond = threading.Condition()
+        self._job: tuple | None = None
+        self._busy = False
+        self._closed = False
+        self._thread: threading.Thread | None = None
+
+    def load(self) -> tuple[dict[str, Any], dict[str, tuple[IR, ...]]] | None:
+        """Returns (data, template IR by bind content) or None if stale."""
+        try:
+            stat = self.source.stat()
+            with self.path.open("rb") as handle:
+                header = pickle.load(handle)
+                if (
+                    header.get("version") != CACHE_VERSION
+                    or header.get("size") != stat.st_size
+                    or header.get("mtime_ns") != stat.st_mtime_ns
+                    or header.get("digest") != _digest(self.source.read_bytes())
+                ):
+                    return None
+                data, templates = pickle.load(handle)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError, ValueError):
+            return None
+        return data, templates
+
+    def schedule(self, data: dict[str, Any], payload: bytes, stat: os.stat_result) -> None:
+        """Queues a rebuild for ``data``, whose JSON form ``payload`` has ``stat``."""
+        with self._cond:
+            if self._closed:
+                return
+            # Only the newest snapshot is worth caching.
+            self._job = (data, payload, stat.st_size, stat.st_mtime_ns)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="binder-snapshot-cache", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        """Finishes a queued rebuild and stops the thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            while self._thread is not None and (self._job is not None or self._busy):
+                self._cond.wait()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._job is None and not self._closed:
+                    self._cond.wait()
+                if self._job is None:
+                    self._thread = None
+                    self._cond.notify_all()
+                    return
+                job, self._job = self._job, None
+                self._busy = True
+            try:
+                self._build(*job)
+            except (OSError, ValueError, pickle.PicklingError, RecursionError):
+                # The cache is optional; the next load reads the JSON.
+                pass
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _build(self, data: dict[str, Any], payload: bytes, size: int, mtime_ns: int) -> None:
+        profiles = tuple(Profile.from_dict(profile) for profile in data.get("profiles", ()))
+        templates: dict[str, tuple[IR, ...]] = {}
+        for profile in profiles:
+            for bind in profile.binds:
+                if bind.content in templates:
+                    continue
+                try:
+                    templates[bind.content] = parse_template(bind.content)
+                except TemplateError:
+                    continue
+        header = {"version": CACHE_VERSION, "size": size, "mtime_ns": mtime_ns, "digest": _digest(payload)}
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with tmp_path.open("wb") as handle:
+            pickle.dump(header, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(({**data, "profiles": profiles}, templates), handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
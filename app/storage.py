@@ -0,0 +1,707 @@
+"""
+Persistence backends for DataStore.
+
+A storage gets the whole (immutable) data snapshot plus the ops recorded
+since the previous write, in order:
+
+    ("profile", profile_id, profile)        added or replaced as a whole
+    ("profile_meta", profile_id, profile)   name/timestamps/settings/variables
+    ("profile_removed", profile_id)
+    ("bind", profile_id, bind)              added or replaced
+    ("bind_removed", profile_id, bind_id)
+    ("hotkey", profile_id, hotkey)
+    ("hotkey_removed", profile_id, hotkey_id)
+    ("active", profile_id)
+
+so each backend can write as little as its layout allows.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Iterable
+
+from app.config import SNAPSHOT_CACHE, STORAGE_BACKEND
+from app.models import Bind, Hotkey, Profile, json_default
+from app.snapshot_cache import SnapshotCache
+
+# Profile fields kept in the sharded index, enough to list and switch profiles.
+HEADER_KEYS = ("id", "name", "created_at", "updated_at")
+
+# Journal size that triggers folding it into a new profiles.json snapshot.
+JOURNAL_COMPACT_BYTES = 1024 * 1024
+
+_SAFE_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def write_atomic(path: Path, payload: str | bytes) -> None:
+    # Write to a sibling temp file and swap it in, so a crash mid-write
+    # leaves the previous file intact.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    if isinstance(payload, bytes):
+        handle = tmp_path.open("wb")
+    else:
+        handle = tmp_path.open("w", encoding="utf-8")
+    with handle:
+        handle.write(payload)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+
+
+def dumps(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, indent=2, default=json_default)
+
+
+def _json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=json_default)
+
+
+def _read_json(path: Path) -> Any:
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def profile_header(profile: Any) -> dict[str, Any]:
+    return {key: profile.get(key, "") for key in HEADER_KEYS}
+
+
+def profile_claims(profile: Any) -> dict[str, Any]:
+    """What app/conflicts.py indexes of a profile: triggers, hotkeys and settings keys."""
+    settings = profile.get("settings") or {}
+    return {
+        "id": profile.get("id", ""),
+        "name": profile.get("name", ""),
+        "binds": [
+            {"id": bind.get("id", ""), "title": bind.get("title", ""), "trigger": bind.get("trigger", "")}
+            for bind in profile.get("binds") or ()
+        ],
+        "hotkeys": [
+            {"id": hotkey.get("id", ""), "title": hotkey.get("title", ""), "hotkey": hotkey.get("hotkey", "")}
+            for hotkey in profile.get("hotkeys") or ()
+        ],
+        "settings": {
+            "hotkeys": dict(settings.get("hotkeys") or {}),
+            "commit_keys": list(settings.get("commit_keys") or ()),
+        },
+    }
+
+
+def full_ops(data: dict[str, Any]) -> list[tuple]:
+    ops: list[tuple] = [("profile", profile.get("id"), profile) for profile in data.get("profiles", ())]
+    ops.append(("active", data.get("active_profile_id")))
+    return ops
+
+
+class JsonFileStorage:
+    """
+    Every profile in one profiles.json; each write rewrites the file. With
+    ``cache`` the parsed records and template IR are also kept in a binary
+    profiles.cache (app/snapshot_cache.py) that later starts load instead.
+    """
+
+    lazy = False
+
+    def __init__(self, path: Path, cache: bool = False) -> None:
+        self.path = path
+        self.cache = SnapshotCache(path) if cache else None
+        # Template IR by bind content, filled when the cache was used.
+        self.template_ir: dict[str, tuple] = {}
+        # (size, mtime_ns) of the file as last read or written here, to tell
+        # other processes' changes from our own writes.
+        self._signature: tuple[int, int] | None = None
+
+    def load(self) -> dict[str, Any] | None:
+        if not self.path.exists():
+            return None
+        stat = self.path.stat()
+        self._signature = (stat.st_size, stat.st_mtime_ns)
+        if self.cache is None:
+            return _read_json(self.path)
+        cached = self.cache.load()
+        if cached is not None:
+            data, self.template_ir = cached
+            return data
+        payload = self.path.read_bytes()
+        data = json.loads(payload)
+        self.cache.schedule(data, payload, stat)
+        return data
+
+    def read_external(self) -> dict[str, Any] | None:
+        """Returns the file's data if something else changed it since our last read or write."""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        if (stat.st_size, stat.st_mtime_ns) == self._signature:
+            return None
+        payload = self.path.read_bytes()
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            # Caught mid-write by a non-atomic writer; the next change retries.
+            return None
+        profiles = data.get("profiles") if isinstance(data, dict) else None
+        if not isinstance(profiles, list) or not all(isinstance(profile, dict) for profile in profiles):
+            # Not a profiles file; ignored like a partial write (our next write replaces it).
+            return None
+        self._signature = (stat.st_size, stat.st_mtime_ns)
+        if self.cache is not None:
+            self.cache.schedule(data, payload, stat)
+        return data
+
+    def write(self, data: dict[str, Any], ops: Iterable[tuple]) -> None:
+        if self.cache is None:
+            write_atomic(self.path, dumps(data))
+        else:
+            # Written as bytes so the cache digest matches the file exactly.
+            payload = dumps(data).encode("utf-8")
+            write_atomic(self.path, payload)
+        stat = self.path.stat()
+        self._signature = (stat.st_size, stat.st_mtime_ns)
+        if self.cache is not None:
+            self.cache.schedule(data, payload, stat)
+
+    def close(self) -> None:
+        if self.cache is not None:
+            self.cache.close()
+
+
+class JournalStorage:
+    """
+    profiles.json as a snapshot plus ``profiles.journal``, one JSON line per
+    op. DataStore appends (and fsyncs) the ops of every mutation before the
+    call returns, so a crash loses at most the record being written; its
+    cost follows the change, not the data. Once the journal passes
+    JOURNAL_COMPACT_BYTES, the store's writer thread saves a snapshot and
+    drops the journal lines it covers. Ops are idempotent, so replaying a
+    journal that the snapshot already contains (crash between the two steps)
+    is harmless; a torn last line is dropped.
+    """
+
+    lazy = False
+
+    def __init__(self, path: Path, compact_bytes: int = JOURNAL_COMPACT_BYTES) -> None:
+        self.path = path
+        self.journal_path = path.with_suffix(".journal")
+        self.compact_bytes = compact_bytes
+        # Guards the journal file between appends and compaction.
+        self._lock = threading.Lock()
+
+    def load(self) -> dict[str, Any] | None:
+        if not self.path.exists() and not self.journal_path.exists():
+            return None
+        data = _read_json(self.path) if self.path.exists() else {"profiles": []}
+        if self.journal_path.exists():
+            replay(data, self._read_journal())
+        return data
+
+    def _read_journal(self) -> Iterable[list]:
+        with self.journal_path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    return
+
+    def append(self, ops: Iterable[tuple]) -> bool:
+        """Appends ops durably; returns True once a compaction is due."""
+        lines = "".join(_json(_journal_op(op)) + "\n" for op in ops).encode("utf-8")
+        with self._lock:
+            if lines:
+                with self.journal_path.open("ab") as handle:
+                    handle.write(lines)
+                    handle.flush()
+                    os.fsync(handle.fileno())
+            return self._journal_size() > self.compact_bytes or not self.path.exists()
+
+    def mark(self) -> int:
+        """Journal position; taken together with the snapshot it is saved with."""
+        with self._lock:
+            return self._journal_size()
+
+    def compact(self, data: dict[str, Any], mark: int) -> None:
+        """
+        Saves ``data`` as the snapshot and drops the journal up to ``mark``;
+        lines appended after it (not in ``data``) are kept.
+        """
+        write_atomic(self.path, dumps(data))
+        with self._lock:
+            tail = b""
+            if self.journal_path.exists():
+                with self.journal_path.open("rb") as handle:
+                    handle.seek(mark)
+                    tail = handle.read()
+            write_atomic(self.journal_path, tail)
+
+    def write(self, data: dict[str, Any], ops: Iterable[tuple]) -> None:
+        if self.append(ops):
+            self.compact(data, self.mark())
+
+    def _journal_size(self) -> int:
+        try:
+            return self.journal_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def close(self) -> None:
+        pass
+
+
+def _journal_op(op: tuple) -> tuple:
+    if op[0] == "profile_meta":
+        # The meta op carries the whole profile record; journal only the meta.
+        profile = Profile.from_dict(op[2]).replace(binds=(), hotkeys=()).to_dict()
+        del profile["binds"], profile["hotkeys"]
+        return (op[0], op[1], profile)
+    return op
+
+
+def replay(data: dict[str, Any], ops: Iterable[tuple | list]) -> None:
+    """Applies journaled ops to plain JSON data in place."""
+    profiles: list[dict[str, Any]] = data.setdefault("profiles", [])
+    # (profile id, "binds" | "hotkeys") -> item id -> index, built on demand.
+    positions: dict[tuple[str, str], dict[str, int]] = {}
+
+    def item_positions(profile: dict[str, Any], key: str) -> dict[str, int]:
+        cache_key = (profile.get("id"), key)
+        if cache_key not in positions:
+            positions[cache_key] = {item.get("id"): idx for idx, item in enumerate(profile.get(key, []))}
+        return positions[cache_key]
+
+    for op in ops:
+        kind, profile_id = op[0], op[1]
+        if kind == "active":
+            data["active_profile_id"] = profile_id
+            continue
+        position = next((idx for idx, item in enumerate(profiles) if item.get("id") == profile_id), None)
+        if kind in ("profile", "profile_removed"):
+            positions.pop((profile_id, "binds"), None)
+            positions.pop((profile_id, "hotkeys"), None)
+            if kind == "profile_removed":
+                if position is not None:
+                    del profiles[position]
+            elif position is None:
+                profiles.append(dict(op[2]))
+            else:
+                profiles[position] = dict(op[2])
+            continue
+        if position is None:
+            continue
+        profile = profiles[position]
+        if kind == "profile_meta":
+            for key in list(profile):
+                if key not in ("binds", "hotkeys"):
+                    del profile[key]
+            profile.update(op[2])
+            continue
+        key = "binds" if kind.startswith("bind") else "hotkeys"
+        items = profile.setdefault(key, [])
+        index = item_positions(profile, key)
+        if kind.endswith("_removed"):
+            idx = index.pop(op[2], None)
+            if idx is not None:
+                del items[idx]
+                for later in range(idx, len(items)):
+                    index[items[later].get("id")] = later
+        else:
+            idx = index.get(op[2].get("id"))
+            if idx is None:
+                index[op[2].get("id")] = len(items)
+                items.append(op[2])
+            else:
+                items[idx] = op[2]
+
+
+class ShardedStorage:
+    """
+    ``index.json`` with the profile order, the active profile and a header per
+    profile, plus one ``<id>.json`` per profile. ``load`` returns headers only
+    and DataStore pulls a shard in with ``load_profile`` on first access; a
+    write touches the changed shards and the index.
+
+    An existing single-file ``profiles.json`` is split into shards on first
+    load and kept as ``profiles.json.migrated``.
+    """
+
+    lazy = True
+
+    def __init__(self, root: Path, legacy_file: Path | None = None) -> None:
+        self.root = root
+        self.index_path = root / "index.json"
+        self.legacy_file = legacy_file
+
+    def shard_path(self, profile_id: str) -> Path:
+        if _SAFE_ID.match(profile_id):
+            return self.root / f"{profile_id}.json"
+        digest = hashlib.sha1(profile_id.encode("utf-8")).hexdigest()[:16]
+        return self.root / f"p-{digest}.json"
+
+    def load(self) -> dict[str, Any] | None:
+        if not self.index_path.exists():
+            if self.legacy_file is None or not self.legacy_file.exists():
+                return None
+            self._migrate()
+        index = _read_json(self.index_path)
+        return {
+            "active_profile_id": index.get("active_profile_id"),
+            "profiles": index.get("profiles", []),
+        }
+
+    def load_profile(self, profile_id: str, header: dict[str, Any]) -> dict[str, Any]:
+        path = self.shard_path(profile_id)
+        if not path.exists():
+            # A lost shard leaves an empty profile rather than a broken store.
+            return dict(header)
+        return _read_json(path)
+
+    def claims_path(self, profile_id: str) -> Path:
+        return self.shard_path(profile_id).with_suffix(".claims.json")
+
+    def load_claims(self, profile_id: str, header: dict[str, Any]) -> dict[str, Any]:
+        """The conflict claims of a profile, without loading its shard."""
+        try:
+            return {**_read_json(self.claims_path(profile_id)), **header}
+        except (OSError, ValueError):
+            # Written by an older version or lost; the shard has everything.
+            return {**profile_claims(self.load_profile(profile_id, header)), **header}
+
+    def write(self, data: dict[str, Any], ops: Iterable[tuple]) -> None:
+        changed: set[str] = set()
+        removed: set[str] = set()
+        for op in ops:
+            if op[0] == "profile_removed":
+                removed.add(op[1])
+                changed.discard(op[1])
+            elif op[0] != "active":
+                changed.add(op[1])
+        for profile in data.get("profiles", ()):
+            if profile.get("id") in changed:
+                write_atomic(self.shard_path(profile["id"]), dumps(profile))
+                write_atomic(self.claims_path(profile["id"]), _json(profile_claims(profile)))
+        index = {
+            "version": 1,
+            "active_profile_id": data.get("active_profile_id"),
+            "profiles": [profile_header(profile) for profile in data.get("profiles", ())],
+        }
+        # The index goes last: a crash before it leaves the old index, which
+        # still points at valid shards.
+        write_atomic(self.index_path, dumps(index))
+        for profile_id in removed:
+            self.shard_path(profile_id).unlink(missing_ok=True)
+            self.claims_path(profile_id).unlink(missing_ok=True)
+
+    def close(self) -> None:
+        pass
+
+    def _migrate(self) -> None:
+        data = _read_json(self.legacy_file)
+        self.write(data, full_ops(data))
+        os.replace(self.legacy_file, self.legacy_file.with_name(self.legacy_file.name + ".migrated"))
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL DEFAULT '',
+    updated_at TEXT NOT NULL DEFAULT '',
+    settings TEXT NOT NULL DEFAULT '{}',
+    variables TEXT NOT NULL DEFAULT '{}',
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS binds (
+    profile_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    category TEXT NOT NULL DEFAULT '',
+    trigger TEXT NOT NULL DEFAULT '',
+    type TEXT NOT NULL DEFAULT 'Text',
+    content TEXT NOT NULL DEFAULT '',
+    help_section TEXT NOT NULL DEFAULT '',
+    cursor_back INTEGER NOT NULL DEFAULT 0,
+    options TEXT NOT NULL DEFAULT '{}',
+    extra TEXT NOT NULL DEFAULT '{}',
+    -- lowercased "trigger title content"; SQLite's lower() is ASCII-only
+    haystack TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (profile_id, id)
+);
+CREATE INDEX IF NOT EXISTS binds_trigger ON binds (profile_id, trigger);
+CREATE INDEX IF NOT EXISTS binds_category ON binds (profile_id, category);
+CREATE INDEX IF NOT EXISTS binds_position ON binds (profile_id, position);
+CREATE TABLE IF NOT EXISTS hotkeys (
+    profile_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (profile_id, id)
+);
+"""
+
+_BIND_COLUMNS = "title, category, trigger, type, content, help_section, cursor_back, options, extra, haystack"
+_BIND_UPDATE = ", ".join(f"{column} = excluded.{column}" for column in _BIND_COLUMNS.split(", "))
+
+
+def _bind_row(bind: Any) -> tuple:
+    bind = Bind.from_dict(bind)
+    haystack = " ".join([bind.trigger, bind.title, bind.content]).lower()
+    return (
+        bind.title,
+        bind.category,
+        bind.trigger,
+        bind.type,
+        bind.content,
+        bind.help_section,
+        bind.cursor_back,
+        _json(bind.options),
+        _json(bind.extra),
+        haystack,
+    )
+
+
+class SqliteStorage:
+    """
+    Profiles, binds and hotkeys as rows of ``profiles.db`` (WAL mode). Every
+    write applies its ops in one transaction, touching only the changed rows;
+    profiles are loaded on first access and bind search runs as a query.
+
+    An existing ``profiles.json`` is imported on first load and kept as
+    ``profiles.json.migrated``.
+    """
+
+    lazy = True
+
+    def __init__(self, path: Path, legacy_file: Path | None = None) -> None:
+        self.path = path
+        self.legacy_file = legacy_file
+        # One connection shared by the GUI (loads, search) and writer threads.
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def load(self) -> dict[str, Any] | None:
+        with self._lock:
+            empty = self._connect().execute("SELECT 1 FROM profiles LIMIT 1").fetchone() is None
+        if empty:
+            if self.legacy_file is None or not self.legacy_file.exists():
+                return None
+            data = _read_json(self.legacy_file)
+            self.write(data, full_ops(data))
+            os.replace(self.legacy_file, self.legacy_file.with_name(self.legacy_file.name + ".migrated"))
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute("SELECT id, name, created_at, updated_at FROM profiles ORDER BY position").fetchall()
+            active = conn.execute("SELECT value FROM meta WHERE key = 'active_profile_id'").fetchone()
+        return {
+            "active_profile_id": active[0] if active else None,
+            "profiles": [dict(zip(HEADER_KEYS, row)) for row in rows],
+        }
+
+    def load_profile(self, profile_id: str, header: dict[str, Any]) -> dict[str, Any]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT name, created_at, updated_at, settings, variables, extra FROM profiles WHERE id = ?",
+                (profile_id,),
+            ).fetchone()
+            if row is None:
+                return dict(header)
+            binds = conn.execute(
+                "SELECT id, title, category, trigger, type, content, help_section, cursor_back, options, extra "
+                "FROM binds WHERE profile_id = ? ORDER BY position",
+                (profile_id,),
+            ).fetchall()
+            hotkeys = conn.execute(
+                "SELECT data FROM hotkeys WHERE profile_id = ? ORDER BY position", (profile_id,)
+            ).fetchall()
+        name, created_at, updated_at, settings, variables, extra = row
+        return {
+            **json.loads(extra),
+            "id": profile_id,
+            "name": name,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "settings": json.loads(settings),
+            "variables": json.loads(variables),
+            "hotkeys": [json.loads(data) for (data,) in hotkeys],
+            "binds": [
+                {
+                    **json.loads(bind_extra),
+                    "id": bind_id,
+                    "title": title,
+                    "category": category,
+                    "trigger": trigger,
+                    "type": bind_type,
+                    "content": content,
+                    "help_section": help_section,
+                    "cursor_back": cursor_back,
+                    "options": json.loads(options),
+                }
+                for (
+                    bind_id,
+                    title,
+                    category,
+                    trigger,
+                    bind_type,
+                    content,
+                    help_section,
+                    cursor_back,
+                    options,
+                    bind_extra,
+                ) in binds
+            ],
+        }
+
+    def load_claims(self, profile_id: str, header: dict[str, Any]) -> dict[str, Any]:
+        """The conflict claims of a profile; skips bind content and the record build."""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT settings FROM profiles WHERE id = ?", (profile_id,)).fetchone()
+            binds = conn.execute(
+                "SELECT id, title, trigger FROM binds WHERE profile_id = ? ORDER BY position", (profile_id,)
+            ).fetchall()
+            hotkeys = conn.execute(
+                "SELECT data FROM hotkeys WHERE profile_id = ? ORDER BY position", (profile_id,)
+            ).fetchall()
+        claims = profile_claims(
+            {
+                "settings": json.loads(row[0]) if row else {},
+                "binds": [{"id": bind_id, "title": title, "trigger": trigger} for bind_id, title, trigger in binds],
+                "hotkeys": [json.loads(data) for (data,) in hotkeys],
+            }
+        )
+        return {**claims, **header}
+
+    def search_binds(self, profile_id: str, query: str, category: str | None) -> list[str]:
+        sql = "SELECT id FROM binds WHERE profile_id = ?"
+        params: list[Any] = [profile_id]
+        if category is not None:
+            sql += " AND category = ?"
+            params.append(category)
+        if query:
+            sql += " AND instr(haystack, ?) > 0"
+            params.append(query.lower())
+        sql += " ORDER BY position"
+        with self._lock:
+            return [bind_id for (bind_id,) in self._connect().execute(sql, params)]
+
+    def write(self, data: dict[str, Any], ops: Iterable[tuple]) -> None:
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    for op in ops:
+                        getattr(self, "_apply_" + op[0])(conn, *op[1:])
+            except sqlite3.Error as exc:
+                # DataStore keeps the ops and retries on OSError.
+                raise OSError(f"profiles.db write failed: {exc}") from exc
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _apply_profile(self, conn: sqlite3.Connection, profile_id: str, profile: Any) -> None:
+        profile = Profile.from_dict(profile)
+        conn.execute(
+            "INSERT INTO profiles (id, position) "
+            "VALUES (?, (SELECT COALESCE(MAX(position), -1) + 1 FROM profiles)) "
+            "ON CONFLICT (id) DO NOTHING",
+            (profile_id,),
+        )
+        self._apply_profile_meta(conn, profile_id, profile)
+        conn.execute("DELETE FROM binds WHERE profile_id = ?", (profile_id,))
+        conn.execute("DELETE FROM hotkeys WHERE profile_id = ?", (profile_id,))
+        conn.executemany(
+            f"INSERT INTO binds (profile_id, id, position, {_BIND_COLUMNS}) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(profile_id, bind.id, position, *_bind_row(bind)) for position, bind in enumerate(profile.binds)],
+        )
+        conn.executemany(
+            "INSERT INTO hotkeys (profile_id, id, position, data) VALUES (?, ?, ?, ?)",
+            [(profile_id, hotkey.id, position, _json(hotkey)) for position, hotkey in enumerate(profile.hotkeys)],
+        )
+
+    def _apply_profile_meta(self, conn: sqlite3.Connection, profile_id: str, profile: Any) -> None:
+        profile = Profile.from_dict(profile)
+        conn.execute(
+            "UPDATE profiles SET name = ?, created_at = ?, updated_at = ?, settings = ?, variables = ?, extra = ? "
+            "WHERE id = ?",
+            (
+                profile.name,
+                profile.created_at,
+                profile.updated_at,
+                _json(profile.settings),
+                _json(profile.variables),
+                _json(profile.extra),
+                profile_id,
+            ),
+        )
+
+    def _apply_profile_removed(self, conn: sqlite3.Connection, profile_id: str) -> None:
+        conn.execute("DELETE FROM binds WHERE profile_id = ?", (profile_id,))
+        conn.execute("DELETE FROM hotkeys WHERE profile_id = ?", (profile_id,))
+        conn.execute("DELETE FROM profiles WHERE id = ?", (profile_id,))
+
+    def _apply_bind(self, conn: sqlite3.Connection, profile_id: str, bind: Any) -> None:
+        conn.execute(
+            f"INSERT INTO binds (profile_id, id, position, {_BIND_COLUMNS}) "
+            "VALUES (?, ?, (SELECT COALESCE(MAX(position), -1) + 1 FROM binds WHERE profile_id = ?), "
+            "?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            f"ON CONFLICT (profile_id, id) DO UPDATE SET {_BIND_UPDATE}",
+            (profile_id, bind.get("id"), profile_id, *_bind_row(bind)),
+        )
+
+    def _apply_bind_removed(self, conn: sqlite3.Connection, profile_id: str, bind_id: str) -> None:
+        conn.execute("DELETE FROM binds WHERE profile_id = ? AND id = ?", (profile_id, bind_id))
+
+    def _apply_hotkey(self, conn: sqlite3.Connection, profile_id: str, hotkey: Any) -> None:
+        conn.execute(
+            "INSERT INTO hotkeys (profile_id, id, position, data) "
+            "VALUES (?, ?, (SELECT COALESCE(MAX(position), -1) + 1 FROM hotkeys WHERE profile_id = ?), ?) "
+            "ON CONFLICT (profile_id, id) DO UPDATE SET data = excluded.data",
+            (profile_id, hotkey.get("id"), profile_id, _json(Hotkey.from_dict(hotkey))),
+        )
+
+    def _apply_hotkey_removed(self, conn: sqlite3.Connection, profile_id: str, hotkey_id: str) -> None:
+        conn.execute("DELETE FROM hotkeys WHERE profile_id = ? AND id = ?", (profile_id, hotkey_id))
+
+    def _apply_active(self, conn: sqlite3.Connection, profile_id: str | None) -> None:
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('active_profile_id', ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (profile_id,),
+        )
+
+
+def open_storage(path: Path) -> JsonFileStorage | JournalStorage | ShardedStorage | SqliteStorage:
+    if STORAGE_BACKEND == "journal":
+        return JournalStorage(path)
+    if STORAGE_BACKEND == "sharded":
+        return ShardedStorage(path.with_suffix(""), legacy_file=path)
+    if STORAGE_BACKEND == "sqlite":
+        return SqliteStorage(path.with_suffix(".db"), legacy_file=path)
+    return JsonFileStorage(path, cache=SNAPSHOT_CACHE)
@@ -0,0 +1,610 @@
+"""
+Bind template compiler.
+
+Templates are parsed once into a tuple-based IR (plain data, safe to cache)
+and linked into closures. Rendering only calls the closures, so nothing is
+re-parsed per expansion.
+
+Supported placeholders:
+    {discord_me} {discord_zga} {discord_ga} {me_name} {date} {time}
+    {g:male|female}      gender switch from personalization
+    {1} .. {9}           arguments typed after the trigger: .ajail 123 30
+    {args}               all arguments joined with spaces
+    {= expr}             sandboxed expression: {= "мог" if n < 2 else "смог"}
+"""
+from __future__ import annotations
+
+import ast
+import operator
+import random
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Sequence
+
+
+MAX_TEMPLATE_LENGTH = 4000
+MAX_EXPRESSIONS = 32
+MAX_EXPRESSION_NODES = 64
+MAX_OUTPUT_LENGTH = 4000
+MAX_INT = 10**12
+MAX_ARGS = 9
+# Characters of intermediate values an expression render may build. Counted
+# rather than timed, so a busy CPU or a GIL handoff never aborts a render.
+RENDER_WORK = 64 * MAX_OUTPUT_LENGTH
+
+TEXT_VARIABLES = ("discord_me", "discord_zga", "discord_ga", "me_name")
+CLOCK_NAMES = frozenset({"date", "time", "hour", "minute"})
+EXPRESSION_NAMES = frozenset(
+    {*TEXT_VARIABLES, *CLOCK_NAMES, "gender", "female", "args", "n"}
+)
+
+
+class TemplateError(ValueError):
+    pass
+
+
+class _Overflow(Exception):
+    pass
+
+
+class _BudgetExceeded(Exception):
+    # Not a runtime error: it aborts the whole render instead of one expression.
+    pass
+
+
+IR = tuple
+
+
+# ----------------------------
+# Parsing (text -> IR)
+# ----------------------------
+
+def parse_template(text: str) -> tuple[IR, ...]:
+    if len(text) > MAX_TEMPLATE_LENGTH:
+        raise TemplateError(f"template longer than {MAX_TEMPLATE_LENGTH} characters")
+    segments: list[IR] = []
+    literal: list[str] = []
+    expressions = 0
+    pos = 0
+    while pos < len(text):
+        start = text.find("{", pos)
+        if start == -1:
+            literal.append(text[pos:])
+            break
+        literal.append(text[pos:start])
+        if text.startswith("{=", start):
+            end = _find_expression_end(text, start + 2)
+            if end == -1:
+                raise TemplateError("unterminated {= ...} expression")
+            expressions += 1
+            if expressions > MAX_EXPRESSIONS:
+                raise TemplateError(f"more than {MAX_EXPRESSIONS} expressions")
+            _flush_literal(literal, segments)
+            segments.append(("expr", parse_expression(text[start + 2 : end])))
+            pos = end + 1
+            continue
+        end = text.find("}", start)
+        if end == -1:
+            literal.append(text[start:])
+            break
+        segment = _placeholder(text[start + 1 : end])
+        if segment is None:
+            literal.append(text[start : end + 1])
+        else:
+            _flush_literal(literal, segments)
+            segments.append(segment)
+        pos = end + 1
+    _flush_literal(literal, segments)
+    return tuple(segments)
+
+
+def _flush_literal(literal: list[str], segments: list[IR]) -> None:
+    text = "".join(literal)
+    literal.clear()
+    if text:
+        segments.append(("text", text))
+
+
+def _placeholder(body: str) -> IR | None:
+    if body in TEXT_VARIABLES or body in ("date", "time", "args"):
+        return ("var", body)
+    if body.isdigit() and 1 <= int(body) <= MAX_ARGS:
+        return ("arg", int(body))
+    if body.startswith("g:") and "|" in body:
+        male, female = body[2:].split("|", 1)
+        return ("gender", male, female)
+    return None
+
+
+def _find_expression_end(text: str, pos: int) -> int:
+    quote = None
+    while pos < len(text):
+        ch = text[pos]
+        if quote:
+            if ch == "\\":
+                pos += 2
+                continue
+            if ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif ch == "}":
+            return pos
+        pos += 1
+    return -1
+
+
+_BIN_OPS = {
+    ast.Add: "add",
+    ast.Sub: "sub",
+    ast.Mult: "mul",
+    ast.Div: "div",
+    ast.FloorDiv: "floordiv",
+    ast.Mod: "mod",
+    ast.Pow: "pow",
+}
+_UNARY_OPS = {ast.USub: "neg", ast.UAdd: "pos", ast.Not: "not"}
+_CMP_OPS = {
+    ast.Eq: "eq",
+    ast.NotEq: "ne",
+    ast.Lt: "lt",
+    ast.LtE: "le",
+    ast.Gt: "gt",
+    ast.GtE: "ge",
+    ast.In: "in",
+    ast.NotIn: "not_in",
+}
+
+
+def parse_expression(source: str) -> IR:
+    source = source.strip()
+    if not source:
+        raise TemplateError("empty {= } expression")
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError as exc:
+        raise TemplateError(f"syntax error in {{= {source} }}") from exc
+    return _convert(tree.body, [0])
+
+
+def _convert(node: ast.AST, count: list[int]) -> IR:
+    count[0] += 1
+    if count[0] > MAX_EXPRESSION_NODES:
+        raise TemplateError(f"expression has more than {MAX_EXPRESSION_NODES} nodes")
+    if isinstance(node, ast.Constant):
+        value = node.value
+        if value is not None and not isinstance(value, (str, int, float, bool)):
+            raise TemplateError(f"unsupported constant: {value!r}")
+        _check_value(value, TemplateError)
+        return ("const", value)
+    if isinstance(node, ast.Name):
+        if node.id not in EXPRESSION_NAMES:
+            raise TemplateError(f"unknown name: {node.id}")
+        return ("name", node.id)
+    if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+        return ("bin", _BIN_OPS[type(node.op)], _convert(node.left, count), _convert(node.right, count))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        return ("unary", _UNARY_OPS[type(node.op)], _convert(node.operand, count))
+    if isinstance(node, ast.BoolOp):
+        kind = "and" if isinstance(node.op, ast.And) else "or"
+        return ("bool", kind, tuple(_convert(value, count) for value in node.values))
+    if isinstance(node, ast.Compare):
+        ops = []
+        for op in node.ops:
+            if type(op) not in _CMP_OPS:
+                raise TemplateError(f"unsupported comparison: {type(op).__name__}")
+            ops.append(_CMP_OPS[type(op)])
+        operands = (node.left, *node.comparators)
+        return ("cmp", tuple(ops), tuple(_convert(item, count) for item in operands))
+    if isinstance(node, ast.IfExp):
+        return (
+            "if",
+            _convert(node.test, count),
+            _convert(node.body, count),
+            _convert(node.orelse, count),
+        )
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            raise TemplateError(f"unknown function: {ast.unparse(node.func)}")
+        if node.keywords or any(isinstance(arg, ast.Starred) for arg in node.args):
+            raise TemplateError("only positional arguments are allowed")
+        return ("call", node.func.id, tuple(_convert(arg, count) for arg in node.args))
+    if isinstance(node, ast.Subscript):
+        if isinstance(node.slice, ast.Slice):
+            if node.slice.step is not None:
+                raise TemplateError("slice step is not supported")
+            lower = _convert(node.slice.lower, count) if node.slice.lower else ("const", None)
+            upper = _convert(node.slice.upper, count) if node.slice.upper else ("const", None)
+            return ("slice", _convert(node.value, count), lower, upper)
+        return ("index", _convert(node.value, count), _convert(node.slice, count))
+    if isinstance(node, (ast.Tuple, ast.List)):
+        return ("tuple", tuple(_convert(item, count) for item in node.elts))
+    raise TemplateError(f"unsupported syntax: {type(node).__name__}")
+
+
+# ----------------------------
+# Sandboxed runtime
+# ----------------------------
+
+def _size(value: Any) -> int:
+    """Upper bound for len(str(value)); tuples count their nested items."""
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, tuple):
+        # Two characters per item for the separator and quotes.
+        return sum(_size(item) + 2 for item in value)
+    return 24
+
+
+def _check_value(value: Any, error: type[Exception] = _Overflow) -> Any:
+    if isinstance(value, (str, tuple)) and _size(value) > MAX_OUTPUT_LENGTH:
+        raise error("value too long")
+    if isinstance(value, int) and not isinstance(value, bool) and abs(value) > MAX_INT:
+        raise error("number too large")
+    return value
+
+
+def _mul(left: Any, right: Any) -> Any:
+    # Checked before multiplying so an oversized result is never built.
+    for seq, times in ((left, right), (right, left)):
+        if isinstance(seq, (str, tuple)) and isinstance(times, int):
+            if _size(seq) * max(times, 0) > MAX_OUTPUT_LENGTH:
+                raise _Overflow("value too long")
+    return left * right
+
+
+def _mod(left: Any, right: Any) -> Any:
+    # "%999999999d" % 1 would allocate the padding before any check.
+    if isinstance(left, str):
+        raise TypeError("string formatting is not supported")
+    return left % right
+
+
+def _pow(left: Any, right: Any) -> Any:
+    if not isinstance(right, (int, float)) or abs(right) > 64:
+        raise _Overflow("exponent too large")
+    return left**right
+
+
+_BIN_FUNCS: dict[str, Callable[[Any, Any], Any]] = {
+    "add": operator.add,
+    "sub": operator.sub,
+    "mul": _mul,
+    "div": operator.truediv,
+    "floordiv": operator.floordiv,
+    "mod": _mod,
+    "pow": _pow,
+}
+_UNARY_FUNCS: dict[str, Callable[[Any], Any]] = {
+    "neg": operator.neg,
+    "pos": operator.pos,
+    "not": operator.not_,
+}
+_CMP_FUNCS: dict[str, Callable[[Any, Any], bool]] = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "lt": operator.lt,
+    "le": operator.le,
+    "gt": operator.gt,
+    "ge": operator.ge,
+    "in": lambda left, right: left in right,
+    "not_in": lambda left, right: left not in right,
+}
+
+_FORMAT_SPEC = re.compile(r"^(.?[<>^=])?[+\- ]?0?\d{0,3}(\.\d{1,2})?[dfsxX%]?$")
+
+
+def _fn_int(value: Any, default: Any = 0) -> Any:
+    try:
+        return int(float(value)) if isinstance(value, str) and "." in value else int(value)
+    except (TypeError, ValueError, OverflowError):
+        return default
+
+
+def _fn_fmt(value: Any, spec: str = "") -> str:
+    if not isinstance(spec, str) or not _FORMAT_SPEC.match(spec):
+        raise ValueError("unsupported format spec")
+    return format(value, spec)
+
+
+def _fn_plural(count: Any, one: str, few: str, many: str) -> str:
+    number = abs(_fn_int(count))
+    if number % 10 == 1 and number % 100 != 11:
+        return one
+    if 2 <= number % 10 <= 4 and not 12 <= number % 100 <= 14:
+        return few
+    return many
+
+
+def _fn_join(items: Any, sep: str = " ") -> str:
+    sep = str(sep)
+    if isinstance(items, (str, tuple)) and len(sep) * max(len(items) - 1, 0) + _size(items) > MAX_OUTPUT_LENGTH:
+        raise _Overflow("value too long")
+    return sep.join(str(item) for item in items)
+
+
+def _fn_arg(scope: dict[str, Any], index: Any, default: Any = "") -> Any:
+    args = scope["args"]
+    position = _fn_int(index, -1) - 1
+    return args[position] if 0 <= position < len(args) else default
+
+
+def _fn_counter(scope: dict[str, Any], name: Any = "", step: Any = 1) -> int:
+    counters = scope["__counters__"]
+    key = str(name)
+    counters[key] = _check_value(counters.get(key, 0) + _fn_int(step, 1))
+    return counters[key]
+
+
+# name -> (callable, receives scope)
+FUNCTIONS: dict[str, tuple[Callable[..., Any], bool]] = {
+    "abs": (abs, False),
+    "arg": (_fn_arg, True),
+    "capitalize": (lambda value: str(value).capitalize(), False),
+    "choice": (lambda *items: random.choice(items) if items else "", False),
+    "counter": (_fn_counter, True),
+    "fmt": (_fn_fmt, False),
+    "int": (_fn_int, False),
+    "join": (_fn_join, False),
+    "len": (len, False),
+    "lower": (lambda value: str(value).lower(), False),
+    "max": (max, False),
+    "min": (min, False),
+    "plural": (_fn_plural, False),
+    "round": (round, False),
+    "str": (str, False),
+    "strip": (lambda value: str(value).strip(), False),
+    "upper": (lambda value: str(value).upper(), False),
+}
+STATEFUL_FUNCTIONS = frozenset({"counter"})
+RANDOM_FUNCTIONS = frozenset({"choice"})
+
+_RUNTIME_ERRORS = (ArithmeticError, TypeError, ValueError, IndexError, KeyError, _Overflow)
+
+Evaluator = Callable[[dict[str, Any]], Any]
+
+
+def _charge(scope: dict[str, Any], value: Any) -> Any:
+    # Every value is size-checked before it is built, so charging it after
+    # bounds the total work of a render.
+    value = _check_value(value)
+    cost = 1 + _size(value) if isinstance(value, (str, tuple)) else 1
+    scope["__work__"] -= cost
+    if scope["__work__"] < 0:
+        raise _BudgetExceeded
+    return value
+
+
+def _link(ir: IR) -> Evaluator:
+    kind = ir[0]
+    if kind == "const":
+        value = ir[1]
+        return lambda scope: value
+    if kind == "name":
+        name = ir[1]
+        return lambda scope: scope[name]
+    if kind == "bin":
+        func = _BIN_FUNCS[ir[1]]
+        left, right = _link(ir[2]), _link(ir[3])
+
+        def _binary(scope: dict[str, Any]) -> Any:
+            return _charge(scope, func(left(scope), right(scope)))
+        return _binary
+    if kind == "unary":
+        func = _UNARY_FUNCS[ir[1]]
+        operand = _link(ir[2])
+        return lambda scope: func(operand(scope))
+    if kind == "bool":
+        values = tuple(_link(item) for item in ir[2])
+        if ir[1] == "and":
+            def _and(scope: dict[str, Any]) -> Any:
+                result = True
+                for value in values:
+                    result = value(scope)
+                    if not result:
+                        return result
+                return result
+            return _and
+
+        def _or(scope: dict[str, Any]) -> Any:
+            result = False
+            for value in values:
+                result = value(scope)
+                if result:
+                    return result
+            return result
+        return _or
+    if kind == "cmp":
+        ops = tuple(_CMP_FUNCS[name] for name in ir[1])
+        operands = tuple(_link(item) for item in ir[2])
+
+        def _compare(scope: dict[str, Any]) -> bool:
+            left = operands[0](scope)
+            for op, operand in zip(ops, operands[1:]):
+                right = operand(scope)
+                if not op(left, right):
+                    return False
+                left = right
+            return True
+        return _compare
+    if kind == "if":
+        test, body, orelse = _link(ir[1]), _link(ir[2]), _link(ir[3])
+        return lambda scope: body(scope) if test(scope) else orelse(scope)
+    if kind == "call":
+        func, wants_scope = FUNCTIONS[ir[1]]
+        args = tuple(_link(item) for item in ir[2])
+
+        def _call(scope: dict[str, Any]) -> Any:
+            values = [arg(scope) for arg in args]
+            if wants_scope:
+                return _charge(scope, func(scope, *values))
+            return _charge(scope, func(*values))
+        return _call
+    if kind == "index":
+        value, index = _link(ir[1]), _link(ir[2])
+        return lambda scope: value(scope)[index(scope)]
+    if kind == "slice":
+        value, lower, upper = _link(ir[1]), _link(ir[2]), _link(ir[3])
+        return lambda scope: value(scope)[lower(scope) : upper(scope)]
+    if kind == "tuple":
+        items = tuple(_link(item) for item in ir[1])
+
+        def _tuple(scope: dict[str, Any]) -> tuple:
+            return _charge(scope, tuple(item(scope) for item in items))
+        return _tuple
+    raise TemplateError(f"unknown IR node: {kind}")
+
+
+def _link_segment(segment: IR) -> str | Evaluator:
+    kind = segment[0]
+    if kind == "text":
+        return segment[1]
+    if kind == "var":
+        name = segment[1]
+        if name == "args":
+            return lambda scope: " ".join(scope["args"])
+        return lambda scope: scope[name]
+    if kind == "arg":
+        position = segment[1] - 1
+        return lambda scope: scope["args"][position] if position < len(scope["args"]) else ""
+    if kind == "gender":
+        male, female = segment[1], segment[2]
+        return lambda scope: female if scope["female"] else male
+    if kind == "expr":
+        evaluate = _link(segment[1])
+
+        def _expression(scope: dict[str, Any]) -> str:
+            try:
+                value = evaluate(scope)
+            except _RUNTIME_ERRORS:
+                return ""
+            if value is None or value is False:
+                return ""
+            return str(value)
+        return _expression
+    raise TemplateError(f"unknown segment: {kind}")
+
+
+def _walk(ir: IR, names: set[str], functions: set[str], arg_indexes: set[int]) -> None:
+    kind = ir[0]
+    if kind == "name":
+        names.add(ir[1])
+    elif kind == "call":
+        functions.add(ir[1])
+        if ir[1] == "arg":
+            index = ir[2][0] if ir[2] else ("call",)
+            # A computed index needs at least one argument.
+            constant = index[0] == "const" and isinstance(index[1], int) and not isinstance(index[1], bool)
+            arg_indexes.add(min(max(index[1], 1), MAX_ARGS) if constant else 1)
+    for item in ir[1:]:
+        if isinstance(item, tuple) and item and isinstance(item[0], str):
+            _walk(item, names, functions, arg_indexes)
+        elif isinstance(item, tuple):
+            for child in item:
+                if isinstance(child, tuple):
+                    _walk(child, names, functions, arg_indexes)
+
+
+# ----------------------------
+# Compiled template
+# ----------------------------
+
+class Template:
+    __slots__ = ("source", "segments", "arg_count", "uses_clock", "uses_random", "stateful", "_parts")
+
+    def __init__(self, source: str, segments: tuple[IR, ...]) -> None:
+        self.source = source
+        self.segments = segments
+        names: set[str] = set()
+        functions: set[str] = set()
+        arg_indexes: set[int] = set()
+        arg_count = 0
+        for segment in segments:
+            if segment[0] == "var":
+                names.add(segment[1])
+            elif segment[0] == "arg":
+                arg_count = max(arg_count, segment[1])
+            elif segment[0] == "expr":
+                _walk(segment[1], names, functions, arg_indexes)
+        # arg(n) is 1-based like {n}: arg(2) waits for two arguments.
+        arg_count = max(arg_count, *arg_indexes, 0)
+        if arg_count == 0 and "args" in names:
+            arg_count = 1
+        self.arg_count = arg_count
+        self.uses_clock = bool(names & CLOCK_NAMES)
+        self.uses_random = bool(functions & RANDOM_FUNCTIONS)
+        self.stateful = bool(functions & STATEFUL_FUNCTIONS)
+        self._parts = tuple(_link_segment(segment) for segment in segments)
+
+    def render(
+        self,
+        variables: dict[str, Any],
+        args: Sequence[str] = (),
+        counters: dict[str, int] | None = None,
+        n: int = 0,
+    ) -> str:
+        parts = self._parts
+        if len(parts) == 1 and parts[0].__class__ is str:
+            return parts[0]
+        scope = self._scope(variables, args, counters, n)
+        scope["__work__"] = RENDER_WORK
+        out: list[str] = []
+        size = 0
+        for part in parts:
+            try:
+                value = part if part.__class__ is str else part(scope)
+            except _BudgetExceeded:
+                raise TemplateError("render budget exceeded") from None
+            size += len(value)
+            if size > MAX_OUTPUT_LENGTH:
+                raise TemplateError(f"output longer than {MAX_OUTPUT_LENGTH} characters")
+            out.append(value)
+        return "".join(out)
+
+    def _scope(
+        self,
+        variables: dict[str, Any],
+        args: Sequence[str],
+        counters: dict[str, int] | None,
+        n: int,
+    ) -> dict[str, Any]:
+        gender = str(variables.get("gender", "male"))
+        scope: dict[str, Any] = {name: str(variables.get(name, "")) for name in TEXT_VARIABLES}
+        scope["gender"] = gender
+        scope["female"] = gender == "female"
+        scope["args"] = tuple(args)
+        scope["n"] = n
+        scope["__counters__"] = counters if counters is not None else {}
+        if self.uses_clock:
+            now = datetime.now()
+            scope["date"] = now.strftime("%d.%m.%Y")
+            scope["time"] = now.strftime("%H:%M")
+            scope["hour"] = now.hour
+            scope["minute"] = now.minute
+        return scope
+
+
+def link_template(source: str, segments: tuple[IR, ...]) -> Template:
+    return Template(source, segments)
+
+
+# IR restored from the snapshot cache (app/snapshot_cache.py), by source.
+_preloaded: dict[str, tuple[IR, ...]] = {}
+
+
+def preload_templates(templates: dict[str, tuple[IR, ...]]) -> None:
+    """Registers already parsed IR so compile_template only links it."""
+    _preloaded.update(templates)
+
+
+@lru_cache(maxsize=2048)
+def compile_template(text: str) -> Template:
+    segments = _preloaded.get(text)
+    if segments is None:
+        segments = parse_template(text)
+    return link_template(text, segments)
+
+
+def literal_template(text: str) -> Template:
+    return Template(text, (("text", text),) if text else ())
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+Suggestion = tuple[str, str, str]  # (bind_id, trigger, title)
+
+
+class _Node:
+    __slots__ = ("children", "top", "ends")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        self.top: list[Suggestion] = []
+        # Suggestions whose trigger ends at this node.
+        self.ends: list[Suggestion] = []
+
+
+class PrefixIndex:
+    """
+    Trie over lowercased triggers. Every node keeps its best ``limit``
+    suggestions ranked by usage, so a lookup is one dict step per keystroke.
+    ``put``/``remove`` update one trigger's path; a node's best list is
+    rebuilt from its own triggers and its children's best lists.
+    """
+
+    def __init__(self, binds: Iterable[dict[str, Any]], usage: dict[str, int], limit: int = 5) -> None:
+        self.limit = max(1, limit)
+        self._usage = usage
+        self._root = _Node()
+        self._items: dict[str, Suggestion] = {}
+        entries = []
+        for bind in binds:
+            trigger = str(bind.get("trigger", ""))
+            bind_id = bind.get("id", "")
+            if not trigger or not bind_id:
+                continue
+            item = (bind_id, trigger, str(bind.get("title", "") or ""))
+            self._items[bind_id] = item
+            entries.append(item)
+        entries.sort(key=self._rank)
+        for item in entries:
+            node = self._root
+            for ch in item[1].lower():
+                node = node.children.setdefault(ch, _Node())
+                if len(node.top) < self.limit:
+                    node.top.append(item)
+            node.ends.append(item)
+
+    def _rank(self, item: Suggestion) -> tuple[int, int, str]:
+        return (-self._usage.get(item[0], 0), len(item[1]), item[1])
+
+    def put(self, bind: dict[str, Any]) -> None:
+        """Adds a bind or re-indexes an edited one."""
+        bind_id = bind.get("id", "")
+        self.remove(bind_id)
+        trigger = str(bind.get("trigger", ""))
+        if not trigger or not bind_id:
+            return
+        item = (bind_id, trigger, str(bind.get("title", "") or ""))
+        self._items[bind_id] = item
+        node = self._root
+        for ch in trigger.lower():
+            node = node.children.setdefault(ch, _Node())
+            top = node.top
+            if len(top) < self.limit or self._rank(item) < self._rank(top[-1]):
+                top.append(item)
+                top.sort(key=self._rank)
+                del top[self.limit :]
+        node.ends.append(item)
+
+    def remove(self, bind_id: str) -> None:
+        item = self._items.pop(bind_id, None)
+        if item is None:
+            return
+        path = [(None, "", self._root)]
+        for ch in item[1].lower():
+            node = path[-1][2].children.get(ch)
+            if node is None:
+                return
+            path.append((path[-1][2], ch, node))
+        path[-1][2].ends.remove(item)
+        # Bottom-up, so each node refills from already updated children.
+        for parent, ch, node in reversed(path[1:]):
+            if not node.ends and not node.children:
+                del parent.children[ch]
+            elif item in node.top:
+                candidates = [*node.ends, *(top for child in node.children.values() for top in child.top)]
+                candidates.sort(key=self._rank)
+                node.top = candidates[: self.limit]
+
+    def cursor(self) -> PrefixCursor:
+        return PrefixCursor(self._root)
+
+    def bump(self, bind_id: str) -> None:
+        item = self._items.get(bind_id)
+        if item is None:
+            return
+        self._usage[bind_id] = self._usage.get(bind_id, 0) + 1
+        node = self._root
+        for ch in item[1].lower():
+            node = node.children.get(ch)
+            if node is None:
+                return
+            top = node.top
+            if item in top:
+                top.sort(key=self._rank)
+            elif len(top) < self.limit or self._rank(item) < self._rank(top[-1]):
+                top.append(item)
+                top.sort(key=self._rank)
+                del top[self.limit :]
+
+
+class PrefixCursor:
+    __slots__ = ("_stack", "_misses")
+
+    def __init__(self, root: _Node) -> None:
+        self._stack = [root]
+        self._misses = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._stack) - 1 + self._misses
+
+    def advance(self, ch: str) -> list[Suggestion]:
+        if not self._misses:
+            node = self._stack[-1].children.get(ch.lower())
+            if node is not None:
+                self._stack.append(node)
+                return node.top
+        self._misses += 1
+        return []
+
+    def back(self) -> list[Suggestion]:
+        if self._misses:
+            self._misses -= 1
+        elif len(self._stack) > 1:
+            self._stack.pop()
+        return self.suggestions()
+
+    def suggestions(self) -> list[Suggestion]:
+        if self._misses or len(self._stack) == 1:
+            return []
+        return self._stack[-1].top
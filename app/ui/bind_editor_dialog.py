@@ -18,6 +18,7 @@ from PySide6.QtWidgets import (
 )
 
 from app.engine import apply_variables
+from app.templates import TemplateError, compile_template
 from app.ui.pages.common import card_container, card_layout
 from app.ui.widgets.switch import ToggleSwitch
 
@@ -415,14 +416,28 @@ class BindEditorDialog(QDialog):
                 ("{g:обратился|обратилась}", "Пример: обратился/обратилась"),
             ]
         )
-        gender_row.setVisible(False)
-        gender_hint.setVisible(False)
-        extras_btn.toggled.connect(gender_row.setVisible)
-        extras_btn.toggled.connect(gender_hint.setVisible)
+        script_hint = QLabel(
+            "{1}, {2} — аргументы после триггера (.ajail 123 30). "
+            "{= ...} — выражение: условия, счётчики, choice(), plural(), fmt()."
+        )
+        script_hint.setObjectName("HintText")
+        script_hint.setWordWrap(True)
+        script_row = self._templates_row(
+            [
+                ("{1}", "Первый аргумент после триггера"),
+                ("{= n}", "Сколько раз бинд сработал за сессию"),
+                ('{= choice("Привет", "Здравствуйте")}', "Случайный вариант"),
+            ]
+        )
+        for widget in (gender_row, gender_hint, script_row, script_hint):
+            widget.setVisible(False)
+            extras_btn.toggled.connect(widget.setVisible)
 
         templates.addWidget(extras_btn)
         templates.addWidget(gender_row)
         templates.addWidget(gender_hint)
+        templates.addWidget(script_row)
+        templates.addWidget(script_hint)
 
         # Test card
         test_card = card_container()
@@ -587,6 +602,12 @@ class BindEditorDialog(QDialog):
             QMessageBox.warning(self, "Ошибка", "Триггер не может быть пустым.")
             return
 
+        try:
+            compile_template(self.content_input.toPlainText())
+        except TemplateError as exc:
+            QMessageBox.warning(self, "Ошибка шаблона", f"Шаблон не распознан: {exc}")
+            return
+
         # Нормализуем category
         if not self.category_input.currentText().strip():
             self.category_input.setCurrentText("Без категории")
@@ -645,6 +666,7 @@ class BindEditorDialog(QDialog):
             self.result_output.setText("Выход: -")
             return
 
+        raw, *args = raw.split()
         raw_trigger = raw
         used_prefix = ""
         for prefix in self._prefixes():
@@ -671,7 +693,7 @@ class BindEditorDialog(QDialog):
 
         output = ""
         if found:
-            output = apply_variables(self.content_input.toPlainText().strip(), self.variables)
+            output = apply_variables(self.content_input.toPlainText().strip(), self.variables, tuple(args))
 
         self.result_found.setText(f"Найдено: {'да' if found else 'нет'}")
         self.result_method.setText(f"Метод: {method}")
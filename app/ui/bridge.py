@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from PySide6.QtCore import QObject, Qt, QTimer, Signal
+
+# Presses closer together than this are handled as one burst.
+COALESCE_MS = 150
+
+
+class HookBridge(QObject):
+    """
+    Moves events raised on the keyboard hook thread (or the engine process
+    reader) into the Qt event loop. ``post`` is safe from any thread; the
+    handler runs on the GUI thread once per action per burst, with the
+    number of presses that were coalesced.
+    """
+
+    _posted = Signal(str)
+
+    def __init__(self, handler: Callable[[str, int], None], parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._handler = handler
+        self._pending: dict[str, int] = {}
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(COALESCE_MS)
+        self._timer.timeout.connect(self._flush)
+        self._posted.connect(self._collect, Qt.QueuedConnection)
+
+    def post(self, action: str) -> None:
+        self._posted.emit(action)
+
+    def _collect(self, action: str) -> None:
+        self._pending[action] = self._pending.get(action, 0) + 1
+        self._timer.start()
+
+    def _flush(self) -> None:
+        pending, self._pending = self._pending, {}
+        for action, count in pending.items():
+            self._handler(action, count)
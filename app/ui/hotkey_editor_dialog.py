@@ -13,6 +13,7 @@ from PySide6.QtWidgets import (
     QLineEdit,
     QMessageBox,
     QPushButton,
+    QSpinBox,
     QTableWidget,
     QTableWidgetItem,
     QToolButton,
@@ -20,7 +21,10 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from app.conflicts import ConflictIndex
 from app.hotkeys import format_hotkey, get_keyboard, keyboard_available, normalize_hotkey
+from app.macro_compiler import MAX_REPEAT, MacroCompileError, compile_macro
+from app.macro_recorder import compress_recording
 from app.ui.pages.common import card_container, card_layout
 
 
@@ -38,18 +42,37 @@ class HotkeyRecorderWorker(QThread):
         self.recorded.emit(hotkey)
 
 
+class MacroRecorderWorker(QThread):
+    recorded = Signal(list)
+
+    def run(self) -> None:
+        kb = get_keyboard()
+        if kb is None:
+            return
+        try:
+            events = kb.record(until="esc")
+        except Exception:
+            return
+        self.recorded.emit(compress_recording(events, stop_key="esc"))
+
+
 class HotkeyEditorDialog(QDialog):
     saved = Signal(dict)
     test_requested = Signal(list)
 
+    POLICY_LABELS = {
+        "drop": "Пропустить нажатие",
+        "queue": "Поставить в очередь",
+        "restart": "Перезапустить",
+    }
+
     def __init__(
         self,
         parent=None,
         mode: str = "create",
         hotkey_data: dict | None = None,
-        commit_keys: set[str] | None = None,
-        triggers: set[str] | None = None,
-        settings_hotkeys: dict | None = None,
+        conflicts: ConflictIndex | None = None,
+        profile_id: str = "",
     ) -> None:
         super().__init__(parent)
         self.setWindowTitle("Редактор макроса")
@@ -62,9 +85,8 @@ class HotkeyEditorDialog(QDialog):
         self._hotkey_value = str(self.hotkey_data.get("hotkey", "")).strip()
         self._steps: list[dict] = list(self.hotkey_data.get("steps", []) or [])
         self._edit_index: int | None = None
-        self._commit_keys = commit_keys or set()
-        self._triggers = triggers or set()
-        self._settings_hotkeys = settings_hotkeys or {}
+        self._conflicts = conflicts
+        self._profile_id = profile_id
 
         root = QVBoxLayout(self)
         root.setContentsMargins(16, 16, 16, 16)
@@ -105,8 +127,15 @@ class HotkeyEditorDialog(QDialog):
         record_layout.addWidget(self.record_btn)
         record_layout.addWidget(self.clear_btn)
 
+        self.policy_input = QComboBox()
+        for policy, label in self.POLICY_LABELS.items():
+            self.policy_input.addItem(label, policy)
+        policy_index = self.policy_input.findData(self.hotkey_data.get("policy", "drop"))
+        self.policy_input.setCurrentIndex(policy_index if policy_index != -1 else 0)
+
         form.addRow("Название:", self.title_input)
         form.addRow("Хоткей:", record_row)
+        form.addRow("Если уже выполняется:", self.policy_input)
 
         main_layout.addLayout(form)
 
@@ -116,9 +145,22 @@ class HotkeyEditorDialog(QDialog):
         self.conflict_hint.setVisible(False)
         main_layout.addWidget(self.conflict_hint)
 
+        steps_header = QWidget()
+        steps_header_layout = QHBoxLayout(steps_header)
+        steps_header_layout.setContentsMargins(0, 0, 0, 0)
+        steps_header_layout.setSpacing(8)
+
         steps_label = QLabel("Шаги макроса")
         steps_label.setStyleSheet("color: #ffffff; font-size: 14px; font-weight: 600;")
-        main_layout.addWidget(steps_label)
+
+        self.record_steps_btn = QPushButton("Записать шаги")
+        self.record_steps_btn.setToolTip("Нажимайте клавиши как обычно, Esc — остановить запись.")
+        self.record_steps_btn.clicked.connect(self.start_macro_recording)
+
+        steps_header_layout.addWidget(steps_label)
+        steps_header_layout.addStretch(1)
+        steps_header_layout.addWidget(self.record_steps_btn)
+        main_layout.addWidget(steps_header)
 
         self.steps_table = QTableWidget(0, 5)
         self.steps_table.setHorizontalHeaderLabels(["#", "Тип", "Значение", "Задержка (с)", "Действия"])
@@ -146,7 +188,7 @@ class HotkeyEditorDialog(QDialog):
         controls_layout.setSpacing(8)
 
         self.step_type = QComboBox()
-        self.step_type.addItems(["Press key", "Type text", "Press Enter", "Delay"])
+        self.step_type.addItems(["Press key", "Type text", "Press Enter", "Delay", "Repeat"])
         self.step_type.currentIndexChanged.connect(self._update_step_controls)
 
         self.step_value = QLineEdit()
@@ -155,6 +197,18 @@ class HotkeyEditorDialog(QDialog):
         self.step_enter = QCheckBox("Enter")
         self.step_enter.setChecked(True)
 
+        self.step_count = QSpinBox()
+        self.step_count.setRange(0, MAX_REPEAT)
+        self.step_count.setValue(2)
+        self.step_count.setPrefix("× ")
+        self.step_count.setSpecialValueText("до отмены")
+        self.step_count.setToolTip("Сколько раз выполнить шаги (0 — пока не остановят).")
+
+        self.step_span = QSpinBox()
+        self.step_span.setRange(1, 99)
+        self.step_span.setSuffix(" шаг.")
+        self.step_span.setToolTip("Сколько предыдущих шагов повторять.")
+
         self.step_delay = QDoubleSpinBox()
         self.step_delay.setRange(0, 60)
         self.step_delay.setDecimals(2)
@@ -168,6 +222,8 @@ class HotkeyEditorDialog(QDialog):
         controls_layout.addWidget(self.step_type)
         controls_layout.addWidget(self.step_value, 1)
         controls_layout.addWidget(self.step_enter)
+        controls_layout.addWidget(self.step_count)
+        controls_layout.addWidget(self.step_span)
         controls_layout.addWidget(self.step_delay)
         controls_layout.addWidget(self.add_step_btn)
 
@@ -229,6 +285,27 @@ class HotkeyEditorDialog(QDialog):
         self.record_btn.setEnabled(True)
         self.record_btn.setText("Записать хоткей")
 
+    def start_macro_recording(self) -> None:
+        if not keyboard_available():
+            QMessageBox.information(self, "Запись макроса", "Доступно только на Windows.")
+            return
+        self.record_steps_btn.setEnabled(False)
+        self.record_steps_btn.setText("Запись... (Esc — стоп)")
+        self._macro_recorder = MacroRecorderWorker()
+        self._macro_recorder.recorded.connect(self._append_recorded_steps)
+        self._macro_recorder.finished.connect(self._macro_recording_finished)
+        self._macro_recorder.start()
+
+    def _append_recorded_steps(self, steps: list) -> None:
+        if not steps:
+            return
+        self._steps.extend(steps)
+        self._refresh_steps()
+
+    def _macro_recording_finished(self) -> None:
+        self.record_steps_btn.setEnabled(True)
+        self.record_steps_btn.setText("Записать шаги")
+
     def clear_hotkey(self) -> None:
         self._hotkey_value = ""
         self.hotkey_display.clear()
@@ -238,8 +315,12 @@ class HotkeyEditorDialog(QDialog):
         step_type = self.step_type.currentText()
         needs_value = step_type in {"Press key", "Type text"}
         needs_enter = step_type == "Type text"
+        needs_repeat = step_type == "Repeat"
         self.step_value.setEnabled(needs_value)
         self.step_enter.setEnabled(needs_enter)
+        self.step_value.setVisible(not needs_repeat)
+        self.step_count.setVisible(needs_repeat)
+        self.step_span.setVisible(needs_repeat)
         if not needs_value:
             self.step_value.clear()
         if not needs_enter:
@@ -256,6 +337,11 @@ class HotkeyEditorDialog(QDialog):
 
         payload: dict = {"delay": delay}
         if step_type == "Press key":
+            try:
+                compile_macro([{"type": "press_key", "value": value}])
+            except MacroCompileError:
+                QMessageBox.warning(self, "Шаг макроса", f"Неизвестная клавиша: {value}")
+                return
             payload.update({"type": "press_key", "value": value})
         elif step_type == "Type text":
             payload.update({"type": "type_text", "value": value, "enter": self.step_enter.isChecked()})
@@ -263,9 +349,21 @@ class HotkeyEditorDialog(QDialog):
             payload.update({"type": "press_enter"})
         elif step_type == "Delay":
             payload.update({"type": "delay"})
+        elif step_type == "Repeat":
+            payload.update({"type": "repeat", "count": self.step_count.value(), "span": self.step_span.value()})
         else:
             return
 
+        if step_type == "Repeat":
+            position = len(self._steps) if self._edit_index is None else self._edit_index
+            trial = [*self._steps[:position], payload]
+            try:
+                compile_macro(trial)
+            except MacroCompileError as exc:
+                if exc.index == position:
+                    QMessageBox.warning(self, "Шаг макроса", self._repeat_error(exc))
+                    return
+
         if self._edit_index is None:
             self._steps.append(payload)
         else:
@@ -288,6 +386,10 @@ class HotkeyEditorDialog(QDialog):
             delay = step.get("delay", 0)
             if step.get("enter"):
                 value = f"{value} (Enter)"
+            if type_label == "repeat":
+                count = int(step.get("count", 0) or 0)
+                times = f"× {count}" if count else "до отмены"
+                value = f"{times}, предыдущих шагов: {step.get('span', 1)}"
 
             self.steps_table.setItem(row, 0, QTableWidgetItem(str(row + 1)))
             self.steps_table.setItem(row, 1, QTableWidgetItem(self._label_type(type_label)))
@@ -354,6 +456,10 @@ class HotkeyEditorDialog(QDialog):
             self.step_type.setCurrentText("Press Enter")
         elif step_type == "delay":
             self.step_type.setCurrentText("Delay")
+        elif step_type == "repeat":
+            self.step_type.setCurrentText("Repeat")
+            self.step_count.setValue(int(step.get("count", 0) or 0))
+            self.step_span.setValue(int(step.get("span", 1) or 1))
         self.step_delay.setValue(float(step.get("delay", 0)))
         self._edit_index = row
         self.add_step_btn.setText("Сохранить шаг")
@@ -364,9 +470,15 @@ class HotkeyEditorDialog(QDialog):
             "type_text": "Type text",
             "press_enter": "Press Enter",
             "delay": "Delay",
+            "repeat": "Repeat",
         }
         return mapping.get(key, key)
 
+    def _repeat_error(self, exc: MacroCompileError) -> str:
+        if exc.value == "0":
+            return "бесконечный повтор должен содержать задержку."
+        return "повтор захватывает больше шагов, чем есть выше."
+
     def _emit_test(self) -> None:
         self.test_requested.emit(list(self._steps))
 
@@ -377,11 +489,20 @@ class HotkeyEditorDialog(QDialog):
         if not self._steps:
             QMessageBox.warning(self, "Макрос", "Добавьте хотя бы один шаг.")
             return
+        try:
+            compile_macro(self._steps)
+        except MacroCompileError as exc:
+            if self._steps[exc.index].get("type") == "repeat":
+                QMessageBox.warning(self, "Макрос", f"Шаг {exc.index + 1}: {self._repeat_error(exc)}")
+            else:
+                QMessageBox.warning(self, "Макрос", f"Шаг {exc.index + 1}: некорректное значение «{exc.value}».")
+            return
 
         payload = {
             "id": self.hotkey_id,
             "title": self.title_input.text().strip() or "Без названия",
             "hotkey": self._hotkey_value,
+            "policy": self.policy_input.currentData(),
             "steps": list(self._steps),
         }
         self.saved.emit(payload)
@@ -394,15 +515,27 @@ class HotkeyEditorDialog(QDialog):
         parts = [p for p in self._hotkey_value.split("+") if p]
         warnings: list[str] = []
         if len(parts) == 1:
-            key = parts[0]
             warnings.append("Одиночная клавиша может конфликтовать с вводом текста.")
-            if key in self._commit_keys:
+        claims = []
+        if self._conflicts is not None:
+            claims = self._conflicts.hotkey_conflicts(
+                self._hotkey_value, exclude=(self._profile_id, "hotkey", self.hotkey_id)
+            )
+        other_profiles: set[str] = set()
+        for claim in claims:
+            if claim.profile_id != self._profile_id:
+                if claim.kind == "hotkey":
+                    other_profiles.add(self._conflicts.profile_name(claim.profile_id))
+            elif claim.kind == "commit":
                 warnings.append("Конфликт с commit-клавишами биндов.")
-            if key in self._triggers:
-                warnings.append("Совпадает с триггером бинда.")
-        for setting_name, value in self._settings_hotkeys.items():
-            if normalize_hotkey(str(value)) == self._hotkey_value:
-                warnings.append(f"Совпадает с хоткеем настроек: {setting_name}.")
+            elif claim.kind == "trigger":
+                warnings.append(f"Совпадает с триггером бинда «{claim.label}».")
+            elif claim.kind == "settings":
+                warnings.append(f"Совпадает с хоткеем настроек: {claim.label}.")
+            elif claim.kind == "hotkey":
+                warnings.append(f"Уже назначен макросу «{claim.label}».")
+        if other_profiles:
+            warnings.append("Также используется в профилях: " + ", ".join(sorted(other_profiles)) + ".")
         if warnings:
             self.conflict_hint.setText("Внимание: " + " ".join(warnings))
             self.conflict_hint.setVisible(True)
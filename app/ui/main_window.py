@@ -2,7 +2,7 @@ from pathlib import Path
 
 import json
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QPixmap
 from PySide6.QtWidgets import (
     QButtonGroup,
@@ -20,26 +20,54 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from app.changes import (
+    ActiveProfileChanged,
+    BindAdded,
+    BindDeleted,
+    BindUpdated,
+    HotkeysChanged,
+    ProfilesChanged,
+    SettingsChanged,
+    VariablesChanged,
+)
+from app.config import ENGINE_PROCESS
 from app.data_store import DataStore
 from app.engine import BinderEngine
-from app.hotkeys import get_keyboard, is_hotkey_valid, normalize_hotkey
+from app.engine_process import EngineProcess
+from app.hotkeys import SETTINGS_HOTKEY_LABELS, is_hotkey_valid, normalize_hotkey
 from app.log_store import append_event
 from .bind_editor_dialog import BindEditorDialog
+from .bridge import HookBridge
 from .hotkey_editor_dialog import HotkeyEditorDialog
 from .logs_window import LogsWindow
+from .suggestion_popup import SuggestionPopup
 from .update_dialog import UpdateDialog
 from .pages import binds, help as help_page, hotkeys, import_export, personalization, profiles, settings
 
 
 class MainWindow(QMainWindow):
+    suggestions_ready = Signal(list)
+    macro_states_ready = Signal(list)
+    # Store change events; emitted from the file watcher thread for external edits.
+    store_changed = Signal(list)
+
     def __init__(self) -> None:
         super().__init__()
         self.setWindowTitle("Binder")
         self.setMinimumSize(1100, 720)
         self.logs_window: LogsWindow | None = None
-        self._settings_hotkey_handles: list[int] = []
+        # help section -> bind id -> item, so bind edits touch one section.
+        self._help_items: dict[str, dict[str, dict]] = {}
         self.store = DataStore()
-        self.engine = BinderEngine(append_event)
+        self.engine = EngineProcess(append_event) if ENGINE_PROCESS else BinderEngine(append_event)
+        self.suggestion_popup = SuggestionPopup()
+        self.suggestion_popup.selected.connect(self.engine.expand_suggestion)
+        self.suggestions_ready.connect(self.suggestion_popup.set_items)
+        self.engine.set_suggestion_listener(self.suggestions_ready.emit)
+        self.engine.set_macro_listener(self.macro_states_ready.emit)
+        self.hook_bridge = HookBridge(self._apply_settings_hotkey, self)
+        self.engine.set_app_hotkey_listener(self._on_settings_hotkey)
+        self.engine.preload_templates(self.store.template_ir)
         self.engine.start()
 
         root = QWidget()
@@ -53,6 +81,9 @@ class MainWindow(QMainWindow):
         root_layout.addWidget(sidebar)
         root_layout.addWidget(self.stack, 1)
         self.setCentralWidget(root)
+        self.store_changed.connect(self._on_store_changes)
+        self.store.subscribe(self.store_changed.emit)
+        self.store.watch()
 
     def _build_sidebar(self) -> QFrame:
         sidebar = QFrame()
@@ -133,6 +164,7 @@ class MainWindow(QMainWindow):
         self.binds_page.copy_requested.connect(self.handle_bind_copy)
         self.binds_page.import_requested.connect(self.handle_binds_import)
         self.binds_page.binder_toggled.connect(self.handle_binder_toggle)
+        self.binds_page.set_search(self.store.search_binds)
         stack.addWidget(self.binds_page)
 
         self.hotkeys_page = hotkeys.HotkeysPage()
@@ -140,6 +172,8 @@ class MainWindow(QMainWindow):
         self.hotkeys_page.edit_requested.connect(self.open_hotkey_editor_edit)
         self.hotkeys_page.delete_requested.connect(self.handle_hotkey_delete_clicked)
         self.hotkeys_page.test_requested.connect(self.handle_hotkey_test)
+        self.hotkeys_page.cancel_requested.connect(self.engine.cancel_macros)
+        self.macro_states_ready.connect(self.hotkeys_page.set_macro_states)
         stack.addWidget(self.hotkeys_page)
 
         self.personalization_page = personalization.PersonalizationPage()
@@ -224,7 +258,6 @@ class MainWindow(QMainWindow):
                 "meta": {"name": profile.get("name")},
             }
         )
-        self.refresh_all()
 
     def handle_profile_activate(self, profile_id: str) -> None:
         if not profile_id:
@@ -240,7 +273,6 @@ class MainWindow(QMainWindow):
                 "meta": {"name": profile.get("name")},
             }
         )
-        self.refresh_all()
 
     def handle_profile_rename(self, profile_id: str) -> None:
         profile = self.store.get_profile(profile_id)
@@ -259,7 +291,6 @@ class MainWindow(QMainWindow):
                     "meta": {"name": name.strip()},
                 }
             )
-            self.refresh_all()
 
     def handle_profile_delete(self, profile_id: str) -> None:
         if len(self.store.list_profiles()) <= 1:
@@ -284,7 +315,6 @@ class MainWindow(QMainWindow):
                     "meta": {"name": profile.get("name", "")},
                 }
             )
-            self.refresh_all()
 
     def handle_bind_saved(self, payload: dict) -> None:
         active_profile = self.store.get_active_profile()
@@ -325,17 +355,14 @@ class MainWindow(QMainWindow):
                 "meta": meta,
             }
         )
-        self.refresh_binds()
 
     def open_hotkey_editor_create(self) -> None:
         profile = self.store.get_active_profile()
-        settings = profile.get("settings", {})
         dialog = HotkeyEditorDialog(
             self,
             mode="create",
-            commit_keys=set(settings.get("commit_keys", [])),
-            triggers=self.store.trigger_set(profile.get("id")),
-            settings_hotkeys=settings.get("hotkeys", {}),
+            conflicts=self.store.conflicts,
+            profile_id=profile.get("id", ""),
         )
         dialog.saved.connect(self.handle_hotkey_saved)
         dialog.test_requested.connect(self.handle_hotkey_test_steps)
@@ -346,14 +373,12 @@ class MainWindow(QMainWindow):
         if not hotkey_data:
             return
         profile = self.store.get_active_profile()
-        settings = profile.get("settings", {})
         dialog = HotkeyEditorDialog(
             self,
             mode="edit",
             hotkey_data=hotkey_data,
-            commit_keys=set(settings.get("commit_keys", [])),
-            triggers=self.store.trigger_set(profile.get("id")),
-            settings_hotkeys=settings.get("hotkeys", {}),
+            conflicts=self.store.conflicts,
+            profile_id=profile.get("id", ""),
         )
         dialog.saved.connect(self.handle_hotkey_saved)
         dialog.test_requested.connect(self.handle_hotkey_test_steps)
@@ -381,7 +406,6 @@ class MainWindow(QMainWindow):
                 "meta": meta,
             }
         )
-        self.refresh_hotkeys()
 
     def handle_hotkey_delete_clicked(self, hotkey_id: str) -> None:
         result = QMessageBox.question(
@@ -409,7 +433,6 @@ class MainWindow(QMainWindow):
                     },
                 }
             )
-            self.refresh_hotkeys()
 
     def handle_hotkey_test(self, hotkey_id: str) -> None:
         hotkey = self.store.get_hotkey(hotkey_id)
@@ -444,7 +467,6 @@ class MainWindow(QMainWindow):
                     },
                 }
             )
-            self.refresh_binds()
 
     def handle_bind_delete_clicked(self, bind_id: str) -> None:
         result = QMessageBox.question(
@@ -471,7 +493,7 @@ class MainWindow(QMainWindow):
         new_bind.pop("id", None)
         new_bind["trigger"] = new_trigger
         new_bind["title"] = f"{bind_data.get('title', '')} (копия)".strip()
-        created = self.store.add_bind(new_bind)
+        created = self.store.add_binds([new_bind])[0]
         QApplication.clipboard().setText(created.get("content", ""))
         append_event(
             {
@@ -482,15 +504,13 @@ class MainWindow(QMainWindow):
                 "meta": {"trigger": created.get("trigger"), "title": created.get("title"), "copied_from": bind_id},
             }
         )
-        self.refresh_binds()
 
     def handle_binds_import(self) -> None:
         self.handle_import_into_profile(self.store.get_active_profile().get("id"))
 
     def handle_binder_toggle(self, enabled: bool) -> None:
         profile = self.store.get_active_profile()
-        settings_data = profile.get("settings", {})
-        settings_data["binder_enabled"] = enabled
+        settings_data = {**profile.get("settings", {}), "binder_enabled": enabled}
         self.store.update_settings(profile.get("id"), settings_data)
         append_event(
             {
@@ -501,24 +521,6 @@ class MainWindow(QMainWindow):
                 "meta": {"binder_enabled": enabled},
             }
         )
-        self.update_engine_config()
-
-    def refresh_binds(self) -> None:
-        if isinstance(self.binds_page, binds.BindsPage):
-            profile = self.store.get_active_profile()
-            settings_data = profile.get("settings", {})
-            prefix = (settings_data.get("trigger_prefixes") or ["."])[0]
-            self.binds_page.set_prefix(prefix)
-            self.binds_page.set_binds(self.store.list_binds(profile.get("id")))
-            self.binds_page.set_binder_enabled(settings_data.get("binder_enabled", True))
-            self.binds_page.set_engine_available(self.engine.available)
-        self.update_engine_config()
-
-    def refresh_hotkeys(self) -> None:
-        if isinstance(self.hotkeys_page, hotkeys.HotkeysPage):
-            profile = self.store.get_active_profile()
-            self.hotkeys_page.set_hotkeys(self.store.list_hotkeys(profile.get("id")))
-        self.update_engine_config()
 
     def handle_personalization_changed(self, payload: dict) -> None:
         profile = self.store.get_active_profile()
@@ -532,7 +534,6 @@ class MainWindow(QMainWindow):
                 "meta": payload,
             }
         )
-        self.update_engine_config()
 
     def handle_settings_changed(self, payload: dict) -> None:
         profile = self.store.get_active_profile()
@@ -548,8 +549,6 @@ class MainWindow(QMainWindow):
                 "meta": payload,
             }
         )
-        self.refresh_binds()
-        self.update_engine_config()
 
     def handle_export_profile(self, profile_id: str) -> None:
         profile = self.store.get_profile(profile_id)
@@ -583,10 +582,12 @@ class MainWindow(QMainWindow):
             profile_payload = dict(self.store.get_active_profile())
             profile_payload["name"] = "imported"
             profile_payload["binds"] = data
+            report = self.store.conflicts.report(profile_payload)
             profile = self.store.import_profile(profile_payload, name_override="imported")
             binds_count = len(data)
         else:
             name = data.get("name", "imported")
+            report = self.store.conflicts.report(data)
             profile = self.store.import_profile(data, name_override=name)
             binds_count = len(profile.get("binds", []))
         self.store.set_active_profile(profile.get("id"))
@@ -601,11 +602,16 @@ class MainWindow(QMainWindow):
                     "count": binds_count,
                     "added": binds_count,
                     "skipped": 0,
-                    "conflicts": 0,
+                    "conflicts": len(report),
                 },
             }
         )
-        self.refresh_all()
+        if report:
+            QMessageBox.information(
+                self,
+                "Импорт профиля",
+                "Профиль импортирован, но найдены конфликты:\n" + self._format_conflict_report(report),
+            )
 
     def handle_import_into_profile(self, profile_id: str) -> None:
         if not profile_id:
@@ -621,38 +627,38 @@ class MainWindow(QMainWindow):
             binds_data = []
         if not binds_data:
             return
-        mode = self._choose_conflict_mode()
+        report = self.store.conflicts.report({"binds": binds_data}, profile_id)
+        mode = self._choose_conflict_mode(report)
         if not mode:
             return
-        existing = {b.get("trigger"): b for b in self.store.list_binds(profile_id)}
-        added = 0
+        existing_ids = {b.get("trigger"): b.get("id") for b in self.store.list_binds(profile_id)}
         skipped = 0
         conflicts = 0
+        # Ids from the file are dropped; only "replace" targets a stored bind.
+        # Keyed by trigger, so a trigger repeated in the file keeps its last bind.
+        pending: dict[str, dict] = {}
         for bind in binds_data:
+            bind = {key: value for key, value in bind.items() if key != "id"}
             trigger = bind.get("trigger", "")
-            if trigger in existing:
-                conflicts += 1
-                if mode == "replace":
-                    self.store.update_bind(existing[trigger]["id"], bind, profile_id)
-                    added += 1
-                elif mode == "suffix":
-                    suffix = 2
+            if trigger not in existing_ids:
+                pending[trigger] = bind
+                continue
+            conflicts += 1
+            if mode == "replace":
+                pending[trigger] = {**bind, "id": existing_ids[trigger]}
+            elif mode == "suffix":
+                suffix = 2
+                new_trigger = f"{trigger}_{suffix}"
+                while new_trigger in existing_ids or new_trigger in pending:
+                    suffix += 1
                     new_trigger = f"{trigger}_{suffix}"
-                    while new_trigger in existing:
-                        suffix += 1
-                        new_trigger = f"{trigger}_{suffix}"
-                    bind = dict(bind)
-                    bind["trigger"] = new_trigger
-                    self.store.add_bind(bind, profile_id)
-                    existing[new_trigger] = bind
-                    added += 1
-                elif mode == "skip":
-                    skipped += 1
-                    continue
-            else:
-                self.store.add_bind(bind, profile_id)
-                existing[trigger] = bind
-                added += 1
+                bind["trigger"] = new_trigger
+                pending[new_trigger] = bind
+            elif mode == "skip":
+                skipped += 1
+        batch = list(pending.values())
+        added = len(batch)
+        self.store.upsert_binds(batch, profile_id)
 
         profile = self.store.get_profile(profile_id)
         append_event(
@@ -670,7 +676,6 @@ class MainWindow(QMainWindow):
                 },
             }
         )
-        self.refresh_binds()
 
     def _read_import_file(self) -> dict | list | None:
         filename, _ = QFileDialog.getOpenFileName(
@@ -687,10 +692,12 @@ class MainWindow(QMainWindow):
         except json.JSONDecodeError:
             return None
 
-    def _choose_conflict_mode(self) -> str | None:
+    def _choose_conflict_mode(self, report: list[dict] | None = None) -> str | None:
         box = QMessageBox(self)
         box.setWindowTitle("Конфликты триггеров")
         box.setText("Найдены совпадающие триггеры. Выберите режим импорта:")
+        if report:
+            box.setDetailedText(self._format_conflict_report(report))
         replace_btn = box.addButton("Заменить", QMessageBox.AcceptRole)
         suffix_btn = box.addButton("Добавить с суффиксом", QMessageBox.AcceptRole)
         skip_btn = box.addButton("Пропустить конфликтные", QMessageBox.DestructiveRole)
@@ -707,6 +714,24 @@ class MainWindow(QMainWindow):
             return None
         return None
 
+    def _format_conflict_report(self, report: list[dict], limit: int = 20) -> str:
+        kinds = {
+            "trigger": "триггер",
+            "hotkey": "макрос",
+            "settings": "хоткей настроек",
+            "commit": "commit-клавиша",
+        }
+        lines = []
+        for item in report[:limit]:
+            where = "в профиле" if item.get("existing") else "в импорте"
+            lines.append(
+                f"• {kinds.get(item['kind'], item['kind'])} «{item['label']}» — "
+                f"{kinds.get(item['other_kind'], item['other_kind'])} «{item['other_label']}» ({where})"
+            )
+        if len(report) > limit:
+            lines.append(f"… и ещё {len(report) - limit}")
+        return "\n".join(lines)
+
     def update_engine_config(self) -> None:
         profile = self.store.get_active_profile()
         settings_data = profile.get("settings", {})
@@ -714,10 +739,13 @@ class MainWindow(QMainWindow):
         variables = profile.get("variables", {})
         hotkeys_list = self.store.list_hotkeys(profile.get("id"))
         self.engine.update_config(profile, settings_data, binds_list, variables, hotkeys_list)
+        self.suggestion_popup.set_limit(int(settings_data.get("autocomplete_limit", 5) or 5))
         self._refresh_settings_hotkeys(settings_data)
 
     def closeEvent(self, event) -> None:
+        self.store.close()
         self.engine.stop()
+        self.suggestion_popup.close()
         super().closeEvent(event)
 
     def refresh_all(self) -> None:
@@ -740,72 +768,140 @@ class MainWindow(QMainWindow):
     def _refresh_help_sections(self, profile: dict) -> None:
         if not hasattr(self, "help_page"):
             return
-        binds = profile.get("binds", []) or []
-        dynamic = {"tips": [], "teleports": [], "news": [], "changelog": []}
+        self._help_items = {"tips": {}, "teleports": {}, "news": {}, "changelog": {}}
+        for bind in profile.get("binds", []) or []:
+            entry = self._help_item(bind)
+            if entry is not None:
+                self._help_items[entry[0]][bind.get("id", "")] = entry[1]
+        if hasattr(self.help_page, "set_dynamic_items"):
+            self.help_page.set_dynamic_items(
+                {section: list(items.values()) for section, items in self._help_items.items()}
+            )
+
+    def _help_item(self, bind: dict) -> tuple[str, dict] | None:
         section_map = {
             "hints": "tips",
             "teleports": "teleports",
             "news": "news",
             "changelog": "changelog",
         }
-        for bind in binds:
-            section = section_map.get(bind.get("help_section"))
-            if not section:
-                continue
-            title = bind.get("title") or bind.get("trigger") or "Бинд"
-            category = bind.get("category") or "Без категории"
-            content = str(bind.get("content", "") or "").strip()
-            preview = content if len(content) <= 160 else f"{content[:157]}..."
-            body = preview or "Без описания"
-            dynamic[section].append(
-                {
-                    "title": title,
-                    "category": category,
-                    "body": body,
-                }
-            )
-        if hasattr(self.help_page, "set_dynamic_items"):
-            self.help_page.set_dynamic_items(dynamic)
-
-    def _refresh_settings_hotkeys(self, settings: dict) -> None:
-        kb = get_keyboard()
-        if kb is None:
+        section = section_map.get(bind.get("help_section"))
+        if not section:
+            return None
+        title = bind.get("title") or bind.get("trigger") or "Бинд"
+        category = bind.get("category") or "Без категории"
+        content = str(bind.get("content", "") or "").strip()
+        preview = content if len(content) <= 160 else f"{content[:157]}..."
+        body = preview or "Без описания"
+        return section, {"title": title, "category": category, "body": body}
+
+    def _put_help_item(self, bind_id: str, bind: dict | None) -> set[str]:
+        # Returns the help sections whose items changed.
+        touched = set()
+        entry = self._help_item(bind) if bind is not None else None
+        for section, items in self._help_items.items():
+            if bind_id in items and (entry is None or entry[0] != section):
+                del items[bind_id]
+                touched.add(section)
+        if entry is not None:
+            self._help_items[entry[0]][bind_id] = entry[1]
+            touched.add(entry[0])
+        return touched
+
+    def _on_store_changes(self, events: list) -> None:
+        if any(isinstance(event, ActiveProfileChanged) for event in events):
+            self.refresh_all()
             return
-        for handle in self._settings_hotkey_handles:
-            try:
-                kb.remove_hotkey(handle)
-            except Exception:
+        active_id = self.store.get_active_profile().get("id")
+        changed: dict[str, dict] = {}
+        removed: list[str] = []
+        help_sections: set[str] = set()
+        profiles_changed = False
+        for event in events:
+            if isinstance(event, ProfilesChanged):
+                profiles_changed = True
+            if event.profile_id != active_id:
                 continue
-        self._settings_hotkey_handles = []
+            if isinstance(event, (BindAdded, BindUpdated)):
+                bind = event.bind
+                self.binds_page.put_bind(bind)
+                help_sections |= self._put_help_item(bind.id, bind)
+                changed[bind.id] = bind
+            elif isinstance(event, BindDeleted):
+                bind_id = event.bind.id
+                self.binds_page.remove_bind(bind_id)
+                help_sections |= self._put_help_item(bind_id, None)
+                changed.pop(bind_id, None)
+                removed.append(bind_id)
+            elif isinstance(event, SettingsChanged):
+                self._apply_settings(event.settings, event.previous)
+            elif isinstance(event, VariablesChanged):
+                self.engine.update_variables(event.variables)
+            elif isinstance(event, HotkeysChanged):
+                self.hotkeys_page.set_hotkeys(list(event.hotkeys))
+                self.engine.update_hotkeys(list(event.hotkeys))
+            elif isinstance(event, ProfilesChanged):
+                # The engine tags its log records with the profile name.
+                self.update_engine_config()
+        if changed or removed:
+            self.engine.update_binds(list(changed.values()), removed)
+        for section in help_sections:
+            if hasattr(self.help_page, "set_dynamic_section"):
+                self.help_page.set_dynamic_section(section, list(self._help_items[section].values()))
+        if profiles_changed:
+            profiles_list = self.store.list_profiles()
+            self.profiles_page.set_profiles(profiles_list, active_id)
+            self.import_export_page.set_profiles(profiles_list, active_id)
+
+    def _apply_settings(self, settings: dict, previous: dict) -> None:
+        prefix = (settings.get("trigger_prefixes") or ["."])[0]
+        if prefix != (previous.get("trigger_prefixes") or ["."])[0]:
+            self.binds_page.set_prefix(prefix)
+            self.binds_page.refresh()
+        self.binds_page.set_binder_enabled(settings.get("binder_enabled", True))
+        self.engine.update_settings(settings)
+        self.suggestion_popup.set_limit(int(settings.get("autocomplete_limit", 5) or 5))
+        if settings.get("hotkeys") != previous.get("hotkeys"):
+            self._refresh_settings_hotkeys(settings)
 
+    def _refresh_settings_hotkeys(self, settings: dict) -> None:
         hotkeys = settings.get("hotkeys", {})
-        handlers = {
-            "toggle": (self._handle_toggle_hotkey, "Вкл/выкл binder"),
-            "open": (self._handle_open_hotkey, "Открыть окно"),
-            "profile_switch": (self._handle_profile_switch_hotkey, "Переключить профиль"),
-        }
+        combos: dict[str, str] = {}
         errors: list[str] = []
-        for key, (handler, label) in handlers.items():
+        for key, label in SETTINGS_HOTKEY_LABELS.items():
             combo = normalize_hotkey(str(hotkeys.get(key, "")))
             if not combo:
                 continue
-            if not is_hotkey_valid(combo):
+            if not is_hotkey_valid(combo) or "," in combo:
                 errors.append(f"Некорректная комбинация для «{label}»: {combo}. Нажмите «Записать».")
                 continue
-            try:
-                handle = kb.add_hotkey(combo, handler)
-            except Exception:
-                errors.append(f"Не удалось зарегистрировать «{label}»: {combo}. Нажмите «Записать».")
-                continue
-            self._settings_hotkey_handles.append(handle)
+            combos[key] = combo
+        # Served by the engine's chord dispatcher from its single key hook.
+        self.engine.set_app_hotkeys(combos)
         self.settings_page.set_hotkey_errors(errors)
 
+    def _on_settings_hotkey(self, key: str) -> None:
+        # Runs on the hook thread: only thread-safe calls here, the rest is
+        # posted to the GUI thread.
+        if key == "macro_cancel":
+            self.engine.cancel_macros()
+            return
+        self.hook_bridge.post(key)
+
+    def _apply_settings_hotkey(self, key: str, count: int) -> None:
+        if key == "toggle":
+            if count % 2:
+                self._handle_toggle_hotkey()
+        elif key == "open":
+            self._handle_open_hotkey()
+        elif key == "profile_switch":
+            self._handle_profile_switch_hotkey(count)
+
     def _handle_toggle_hotkey(self) -> None:
         profile = self.store.get_active_profile()
         settings_data = profile.get("settings", {})
         enabled = not settings_data.get("binder_enabled", True)
-        settings_data["binder_enabled"] = enabled
-        self.store.update_settings(profile.get("id"), settings_data)
+        self.store.update_settings(profile.get("id"), {**settings_data, "binder_enabled": enabled})
         append_event(
             {
                 "type": "settings_changed",
@@ -815,14 +911,13 @@ class MainWindow(QMainWindow):
                 "meta": {"binder_enabled": enabled},
             }
         )
-        self.refresh_binds()
 
     def _handle_open_hotkey(self) -> None:
         self.show()
         self.raise_()
         self.activateWindow()
 
-    def _handle_profile_switch_hotkey(self) -> None:
+    def _handle_profile_switch_hotkey(self, steps: int = 1) -> None:
         profiles = self.store.list_profiles()
         if not profiles:
             return
@@ -832,7 +927,7 @@ class MainWindow(QMainWindow):
             current_index = ids.index(active.get("id"))
         except ValueError:
             current_index = 0
-        next_index = (current_index + 1) % len(ids)
+        next_index = (current_index + steps) % len(ids)
         next_id = ids[next_index]
         self.store.set_active_profile(next_id)
         profile = self.store.get_profile(next_id)
@@ -845,4 +940,3 @@ class MainWindow(QMainWindow):
                 "meta": {"name": profile.get("name")},
             }
         )
-        self.refresh_all()
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Callable, Iterable
+
 from PySide6.QtCore import QSize, Qt, Signal
 from PySide6.QtWidgets import (
     QComboBox,
@@ -30,7 +32,12 @@ class BindsPage(QWidget):
     def __init__(self) -> None:
         super().__init__()
         self.prefix = "."
-        self._binds: list[dict] = []
+        # bind id -> bind, in list order; edits replace in place.
+        self._binds: dict[str, dict] = {}
+        # bind id -> card currently shown, for in-place updates.
+        self._cards: dict[str, QWidget] = {}
+        # (query, category or None) -> binds; set when the store can filter.
+        self._search: Callable[[str, str | None], list] | None = None
         layout = QVBoxLayout(self)
         layout.setContentsMargins(24, 24, 24, 24)
         layout.setSpacing(16)
@@ -100,51 +107,112 @@ class BindsPage(QWidget):
         self.category.currentIndexChanged.connect(self.refresh)
         self.reset_btn.clicked.connect(self.reset_filters)
 
+    def set_search(self, search: Callable[[str, str | None], list] | None) -> None:
+        self._search = search
+
     def set_binds(self, binds: list[dict]) -> None:
-        self._binds = binds
-        self._update_categories(binds)
+        self._binds = {bind.get("id", ""): bind for bind in binds}
+        self._update_categories(self._binds.values())
         self.refresh()
 
+    def put_bind(self, bind: dict) -> None:
+        """
+        Adds or replaces one bind card without rebuilding the list. Only this
+        bind is checked against the active search/category filter; it matches
+        the same fields as the store's search.
+        """
+        bind_id = bind.get("id", "")
+        is_new = bind_id not in self._binds
+        self._binds[bind_id] = bind
+        if self.category.findText(bind.get("category", "Без категории")) == -1:
+            self._update_categories(self._binds.values())
+        query, category = self._filters()
+        old = self._cards.pop(bind_id, None)
+        position = None
+        if old is not None:
+            position = self.container_layout.indexOf(old)
+            self.container_layout.removeWidget(old)
+            old.deleteLater()
+        if not self._matches(bind, query, category):
+            return
+        if position is None:
+            if is_new:
+                # New binds go last, before the trailing stretch.
+                position = len(self._cards)
+            else:
+                # Cards follow the bind order; count the visible ones before it.
+                position = 0
+                for item_id in self._binds:
+                    if item_id == bind_id:
+                        break
+                    position += item_id in self._cards
+        card = self._make_card(bind)
+        self.container_layout.insertWidget(position, card)
+        self._cards[bind_id] = card
+
+    def remove_bind(self, bind_id: str) -> None:
+        self._binds.pop(bind_id, None)
+        card = self._cards.pop(bind_id, None)
+        if card is not None:
+            self.container_layout.removeWidget(card)
+            card.deleteLater()
+
     def refresh(self) -> None:
         while self.container_layout.count():
             item = self.container_layout.takeAt(0)
             widget = item.widget()
             if widget:
                 widget.deleteLater()
+        self._cards = {}
 
-        query = self.search.text().strip().lower()
-        category = self.category.currentText()
+        query, category = self._filters()
+        binds = self._binds.values()
+        if self._search is not None and (query or category != "Все категории"):
+            binds = self._search(query, None if category == "Все категории" else category)
+            query, category = "", "Все категории"
 
-        for bind in self._binds:
-            if category != "Все категории" and bind.get("category", "") != category:
+        for bind in binds:
+            if not self._matches(bind, query, category):
                 continue
-            if query:
-                haystack = " ".join(
-                    [
-                        str(bind.get("trigger", "")),
-                        str(bind.get("title", "")),
-                        str(bind.get("content", "")),
-                    ]
-                ).lower()
-                if query not in haystack:
-                    continue
-            card = self._bind_card(
-                self.prefix,
-                bind.get("trigger", ""),
-                bind.get("title", ""),
-                bind.get("category", "Без категории"),
-                bind.get("content", ""),
-                bind.get("type", "Text"),
-                bind.get("id", ""),
-            )
+            card = self._make_card(bind)
+            self._cards[bind.get("id", "")] = card
             self.container_layout.addWidget(card)
         self.container_layout.addStretch(1)
 
+    def _filters(self) -> tuple[str, str]:
+        return self.search.text().strip().lower(), self.category.currentText()
+
+    def _matches(self, bind: dict, query: str, category: str) -> bool:
+        if category != "Все категории" and bind.get("category", "") != category:
+            return False
+        if query:
+            haystack = " ".join(
+                [
+                    str(bind.get("trigger", "")),
+                    str(bind.get("title", "")),
+                    str(bind.get("content", "")),
+                ]
+            ).lower()
+            if query not in haystack:
+                return False
+        return True
+
+    def _make_card(self, bind: dict) -> QWidget:
+        return self._bind_card(
+            self.prefix,
+            bind.get("trigger", ""),
+            bind.get("title", ""),
+            bind.get("category", "Без категории"),
+            bind.get("content", ""),
+            bind.get("type", "Text"),
+            bind.get("id", ""),
+        )
+
     def reset_filters(self) -> None:
         self.search.clear()
         self.category.setCurrentIndex(0)
 
-    def _update_categories(self, binds: list[dict]) -> None:
+    def _update_categories(self, binds: Iterable[dict]) -> None:
         current = self.category.currentText() if self.category.count() else "Все категории"
         categories = sorted({b.get("category", "Без категории") for b in binds})
         self.category.blockSignals(True)
@@ -200,6 +200,15 @@ class HelpPage(QWidget):
         self.news_section.set_items(merged["news"])
         self.changelog_section.set_items(merged["changelog"])
 
+    def set_dynamic_section(self, key: str, items: list[dict]) -> None:
+        sections = {
+            "tips": self.tips_section,
+            "teleports": self.teleports_section,
+            "news": self.news_section,
+            "changelog": self.changelog_section,
+        }
+        sections[key].set_items(self._base_items[key] + items)
+
 
 def build_page() -> tuple[QWidget, QPushButton]:
     page = HelpPage()
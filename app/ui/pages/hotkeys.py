@@ -22,10 +22,15 @@ class HotkeysPage(QWidget):
     edit_requested = Signal(str)
     delete_requested = Signal(str)
     test_requested = Signal(str)
+    cancel_requested = Signal()
+
+    STATE_LABELS = {"running": "▶ выполняется", "queued": "⏳ в очереди"}
 
     def __init__(self) -> None:
         super().__init__()
         self._hotkeys: list[dict] = []
+        self._macro_states: dict[str, str] = {}
+        self._status_labels: dict[str, QLabel] = {}
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(24, 24, 24, 24)
@@ -40,7 +45,11 @@ class HotkeysPage(QWidget):
         add_btn = QPushButton("Добавить макрос")
         add_btn.setObjectName("Primary")
         add_btn.clicked.connect(self.add_requested.emit)
+        stop_btn = QPushButton("Остановить макросы")
+        stop_btn.setObjectName("Secondary")
+        stop_btn.clicked.connect(self.cancel_requested.emit)
         action_layout.addWidget(add_btn)
+        action_layout.addWidget(stop_btn)
         action_layout.addStretch(1)
 
         layout.addWidget(action_row)
@@ -62,7 +71,23 @@ class HotkeysPage(QWidget):
         self._hotkeys = hotkeys
         self.refresh()
 
+    def set_macro_states(self, jobs: list[dict]) -> None:
+        states: dict[str, str] = {}
+        for job in jobs:
+            job_id = job.get("id") or ""
+            if states.get(job_id) != "running":
+                states[job_id] = job.get("state", "")
+        self._macro_states = states
+        for hotkey_id, label in self._status_labels.items():
+            self._apply_state(label, hotkey_id)
+
+    def _apply_state(self, label: QLabel, hotkey_id: str) -> None:
+        text = self.STATE_LABELS.get(self._macro_states.get(hotkey_id, ""), "")
+        label.setText(text)
+        label.setVisible(bool(text))
+
     def refresh(self) -> None:
+        self._status_labels = {}
         while self.container_layout.count():
             item = self.container_layout.takeAt(0)
             widget = item.widget()
@@ -92,7 +117,13 @@ class HotkeysPage(QWidget):
         hotkey_label = QLabel(hotkey_text or "(не задан)" )
         hotkey_label.setStyleSheet("color: #cfa3a3; font-size: 13px;")
 
+        status_label = QLabel()
+        status_label.setStyleSheet("color: #8fd19e; font-size: 12px;")
+        self._status_labels[hotkey.get("id", "")] = status_label
+        self._apply_state(status_label, hotkey.get("id", ""))
+
         header_layout.addWidget(title_label)
+        header_layout.addWidget(status_label)
         header_layout.addStretch(1)
         header_layout.addWidget(hotkey_label)
 
@@ -8,6 +8,7 @@ from PySide6.QtWidgets import (
     QPushButton,
     QScrollArea,
     QSizePolicy,
+    QSpinBox,
     QVBoxLayout,
     QWidget,
 )
@@ -151,13 +152,23 @@ class SettingsPage(QWidget):
 
         self.allow_no_prefix = ToggleSwitch()
         self.auto_layout = ToggleSwitch()
+        self.autocomplete = ToggleSwitch()
 
         # stateChanged(int) -> emit_change(*args) (чтобы не падало)
         self.allow_no_prefix.toggled.connect(self.emit_change)
         self.auto_layout.toggled.connect(self.emit_change)
+        self.autocomplete.toggled.connect(self.emit_change)
 
         triggers_layout.addWidget(_toggle_row("Разрешить триггер без префикса", self.allow_no_prefix))
         triggers_layout.addWidget(_toggle_row("Авто-конверсия RU↔EN, если триггер не найден", self.auto_layout))
+        triggers_layout.addWidget(_toggle_row("Подсказки триггеров при вводе", self.autocomplete))
+
+        self.autocomplete_limit = QSpinBox()
+        self.autocomplete_limit.setRange(1, 20)
+        self.autocomplete_limit.setMinimumHeight(FIELD_H)
+        self.autocomplete_limit.setMaximumWidth(120)
+        self.autocomplete_limit.valueChanged.connect(self.emit_change)
+        triggers_layout.addWidget(_row("Сколько подсказок показывать:", self.autocomplete_limit))
         triggers_layout.addWidget(_hint("Подсказка: триггер хранится без префикса, префиксы задаются здесь."))
 
         # ---------- Commit keys ----------
@@ -203,8 +214,9 @@ class SettingsPage(QWidget):
         self.toggle_hotkey = _make_line_edit("Нажмите «Записать»")
         self.open_hotkey = _make_line_edit("Нажмите «Записать»")
         self.profile_hotkey = _make_line_edit("Нажмите «Записать»")
+        self.cancel_hotkey = _make_line_edit("Нажмите «Записать»")
 
-        for field in (self.toggle_hotkey, self.open_hotkey, self.profile_hotkey):
+        for field in (self.toggle_hotkey, self.open_hotkey, self.profile_hotkey, self.cancel_hotkey):
             field.setReadOnly(True)
 
         hotkeys_layout.addWidget(
@@ -225,6 +237,12 @@ class SettingsPage(QWidget):
                 self._hotkey_field("profile_switch", self.profile_hotkey),
             )
         )
+        hotkeys_layout.addWidget(
+            _row(
+                "Остановить макросы:",
+                self._hotkey_field("macro_cancel", self.cancel_hotkey),
+            )
+        )
         self.hotkeys_error = QLabel()
         self.hotkeys_error.setStyleSheet("color: #cfa3a3; font-size: 11px;")
         self.hotkeys_error.setWordWrap(True)
@@ -278,6 +296,14 @@ class SettingsPage(QWidget):
         self.auto_layout.setChecked(settings.get("auto_layout", True))
         self.auto_layout.blockSignals(False)
 
+        self.autocomplete.blockSignals(True)
+        self.autocomplete.setChecked(settings.get("autocomplete", False))
+        self.autocomplete.blockSignals(False)
+
+        self.autocomplete_limit.blockSignals(True)
+        self.autocomplete_limit.setValue(int(settings.get("autocomplete_limit", 5) or 5))
+        self.autocomplete_limit.blockSignals(False)
+
         commit_keys = set(settings.get("commit_keys", []))
         for cb, key in (
             (self.space_cb, "space"),
@@ -292,6 +318,7 @@ class SettingsPage(QWidget):
         self._set_hotkey_value(self.toggle_hotkey, hotkeys.get("toggle", ""))
         self._set_hotkey_value(self.open_hotkey, hotkeys.get("open", ""))
         self._set_hotkey_value(self.profile_hotkey, hotkeys.get("profile_switch", ""))
+        self._set_hotkey_value(self.cancel_hotkey, hotkeys.get("macro_cancel", ""))
 
         apps = settings.get("apps_filter", {})
         self.only_apps.blockSignals(True)
@@ -317,11 +344,14 @@ class SettingsPage(QWidget):
             "trigger_prefixes": prefixes or ["."],
             "allow_no_prefix": self.allow_no_prefix.isChecked(),
             "auto_layout": self.auto_layout.isChecked(),
+            "autocomplete": self.autocomplete.isChecked(),
+            "autocomplete_limit": self.autocomplete_limit.value(),
             "commit_keys": commit_keys,
             "hotkeys": {
                 "toggle": self._get_hotkey_value(self.toggle_hotkey),
                 "open": self._get_hotkey_value(self.open_hotkey),
                 "profile_switch": self._get_hotkey_value(self.profile_hotkey),
+                "macro_cancel": self._get_hotkey_value(self.cancel_hotkey),
             },
             "apps_filter": {
                 "only": self.only_apps.text().strip(),
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from PySide6.QtCore import QPoint, Qt, Signal
+from PySide6.QtGui import QCursor
+from PySide6.QtWidgets import QFrame, QLabel, QPushButton, QVBoxLayout, QWidget
+
+
+class SuggestionPopup(QWidget):
+    selected = Signal(str)
+
+    def __init__(self, limit: int = 5) -> None:
+        super().__init__(
+            None,
+            Qt.Tool | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.WindowDoesNotAcceptFocus,
+        )
+        self.setAttribute(Qt.WA_ShowWithoutActivating, True)
+        self.setFocusPolicy(Qt.NoFocus)
+        self._buttons: list[QPushButton] = []
+
+        frame = QFrame(self)
+        frame.setObjectName("Card")
+        outer = QVBoxLayout(self)
+        outer.setContentsMargins(0, 0, 0, 0)
+        outer.addWidget(frame)
+
+        self._layout = QVBoxLayout(frame)
+        self._layout.setContentsMargins(8, 8, 8, 8)
+        self._layout.setSpacing(4)
+        hint = QLabel("Подсказки")
+        hint.setStyleSheet("color: #a7a7a7; font-size: 11px;")
+        self._layout.addWidget(hint)
+        self.set_limit(limit)
+
+    def set_limit(self, limit: int) -> None:
+        limit = max(1, limit)
+        while len(self._buttons) < limit:
+            btn = QPushButton()
+            btn.setFocusPolicy(Qt.NoFocus)
+            btn.setStyleSheet("text-align: left; padding: 4px 10px;")
+            btn.clicked.connect(lambda checked=False, b=btn: self.selected.emit(b.property("bind_id")))
+            btn.setVisible(False)
+            self._layout.addWidget(btn)
+            self._buttons.append(btn)
+        for btn in self._buttons[limit:]:
+            btn.setVisible(False)
+        del self._buttons[limit:]
+
+    def set_items(self, items: list[tuple[str, str, str]]) -> None:
+        if not items:
+            self.hide()
+            return
+        for btn, item in zip(self._buttons, items):
+            bind_id, trigger, title = item
+            btn.setProperty("bind_id", bind_id)
+            btn.setText(f"{trigger}  —  {title}" if title else trigger)
+            btn.setVisible(True)
+        for btn in self._buttons[len(items) :]:
+            btn.setVisible(False)
+        self.adjustSize()
+        if not self.isVisible():
+            self.move(QCursor.pos() + QPoint(16, 20))
+            self.show()
@@ -0,0 +1,22 @@
+import json
+
+from app.config import DATA_DIR, USAGE_FILE
+
+
+def load_usage() -> dict[str, int]:
+    if not USAGE_FILE.exists():
+        return {}
+    try:
+        with USAGE_FILE.open("r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {str(key): int(value) for key, value in data.items() if isinstance(value, int)}
+
+
+def save_usage(usage: dict[str, int]) -> None:
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    with USAGE_FILE.open("w", encoding="utf-8") as handle:
+        json.dump(usage, handle, ensure_ascii=False)
@@ -0,0 +1,35 @@
+from app.chords import ChordDispatcher
+
+CODES = {"ctrl": (29, 97), "a": (30,), "b": (48,), "x": (45,)}
+
+
+def _parse(combo):
+    return (tuple(CODES[key] for key in combo.split("+")),)
+
+
+def test_chords_fire_from_either_modifier_and_ignore_other_keys():
+    fired = []
+    chords = ChordDispatcher(_parse)
+    chords.set_bindings({"ctrl+a": lambda: fired.append("ctrl+a"), "ctrl+b": lambda: fired.append("ctrl+b")})
+    assert chords.codes == {29, 97, 30, 48}
+
+    # A key outside every chord is never tracked, so its key-up can be skipped.
+    assert not chords.press(45)
+    assert chords.press(97) is False
+    assert chords.press(30)
+    chords.release(30)
+    assert chords.press(48)
+    chords.release(48)
+    chords.release(97)
+    assert not chords.press(30)
+    assert fired == ["ctrl+a", "ctrl+b"]
+
+
+def test_auto_repeat_does_not_fire_twice():
+    fired = []
+    chords = ChordDispatcher(_parse)
+    chords.set_bindings({"ctrl+a": lambda: fired.append(1)})
+    chords.press(29)
+    assert chords.press(30)
+    assert not chords.press(30)
+    assert fired == [1]
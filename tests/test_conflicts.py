@@ -0,0 +1,72 @@
+import pytest
+
+from app.conflicts import ConflictIndex
+from app.data_store import DataStore
+from app.layout import convert_layout
+from app.storage import ShardedStorage, SqliteStorage
+
+
+def _profile(profile_id, trigger, commit_keys=("space",)):
+    return {
+        "id": profile_id,
+        "name": profile_id.upper(),
+        "binds": [{"id": "b", "title": trigger, "trigger": trigger}],
+        "hotkeys": [{"id": "h", "title": "macro", "hotkey": "ctrl+1"}],
+        "settings": {"commit_keys": list(commit_keys)},
+    }
+
+
+def test_layout_conversion_goes_both_ways():
+    assert convert_layout("руддщ") == "hello"
+    assert convert_layout("Hello, 1") == "руддщ, 1"
+
+
+def test_removing_a_profile_drops_only_its_claims():
+    index = ConflictIndex([_profile("a", "hi"), _profile("b", "hi")])
+    assert {claim.profile_id for claim in index.trigger_conflicts("рш")} == {"a", "b"}
+    index.remove_profile("a")
+    assert {claim.profile_id for claim in index.trigger_conflicts("hi")} == {"b"}
+    assert {claim.profile_id for claim in index.hotkey_conflicts("ctrl+1")} == {"b"}
+    assert index.profile_name("a") == ""
+
+
+def test_settings_replace_the_commit_keys_of_one_profile():
+    index = ConflictIndex([_profile("a", "hi", ("space", "enter")), _profile("b", "yo", ("enter",))])
+    index.set_settings("a", {"commit_keys": ["tab"]})
+    assert [claim.profile_id for claim in index.hotkey_conflicts("enter")] == ["b"]
+    assert [claim.profile_id for claim in index.hotkey_conflicts("tab")] == ["a"]
+
+
+def _reopened_with_one_unloaded_profile(tmp_path, storage_factory):
+    path = tmp_path / "profiles.json"
+    store = DataStore(path, storage=storage_factory())
+    other = store.add_profile("Other")
+    store.add_bind({"title": "other", "trigger": "other"}, other.id)
+    store.add_hotkey({"title": "macro", "hotkey": "ctrl+9", "content": "x"}, other.id)
+    store.close()
+    return DataStore(path, storage=storage_factory()), other
+
+
+@pytest.mark.parametrize("kind", ["sharded", "sqlite"])
+def test_conflicts_include_unloaded_profiles_without_loading_them(tmp_path, kind):
+    if kind == "sharded":
+        factory = lambda: ShardedStorage(tmp_path / "profiles")
+    else:
+        factory = lambda: SqliteStorage(tmp_path / "profiles.db")
+    store, other = _reopened_with_one_unloaded_profile(tmp_path, factory)
+    assert [claim.profile_id for claim in store.conflicts.trigger_conflicts("other")] == [other.id]
+    assert [claim.profile_id for claim in store.conflicts.hotkey_conflicts("ctrl+9")] == [other.id]
+    assert store.conflicts.profile_name(other.id) == "Other"
+    assert other.id not in store._binds
+    # Loading the profile replaces its claims instead of adding them twice.
+    store.get_profile(other.id)
+    assert [claim.profile_id for claim in store.conflicts.trigger_conflicts("other")] == [other.id]
+    store.close()
+
+
+def test_sharded_claims_fall_back_to_the_shard(tmp_path):
+    factory = lambda: ShardedStorage(tmp_path / "profiles")
+    store, other = _reopened_with_one_unloaded_profile(tmp_path, factory)
+    store._storage.claims_path(other.id).unlink()
+    assert [claim.profile_id for claim in store.conflicts.trigger_conflicts("other")] == [other.id]
+    store.close()
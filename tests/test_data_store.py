@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+import time
+
+from app.changes import BindAdded
+from app.data_store import DataStore
+from app.storage import JournalStorage, JsonFileStorage, SqliteStorage
+
+
+def _replace_file(path, data):
+    tmp = path.with_name(path.name + ".deploy")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def test_pending_edit_does_not_clobber_external_replace(tmp_path):
+    path = tmp_path / "profiles.json"
+    store = DataStore(path, save_delay=60, storage=JsonFileStorage(path))
+    store.flush()
+    events = []
+    store.subscribe(events.extend)
+
+    local = store.add_bind({"title": "local", "trigger": "local", "content": "L"})
+    deployed = json.loads(path.read_text(encoding="utf-8"))
+    active = deployed["active_profile_id"]
+    profile = next(item for item in deployed["profiles"] if item["id"] == active)
+    profile["binds"].append({"id": "deployed", "title": "deployed", "trigger": "dep", "content": "D"})
+    _replace_file(path, deployed)
+
+    # The writer gets there before the watcher would.
+    store.flush()
+
+    on_disk = json.loads(path.read_text(encoding="utf-8"))
+    disk_ids = {bind["id"] for item in on_disk["profiles"] for bind in item["binds"]}
+    assert {local.id, "deployed"} <= disk_ids
+    assert store.get_bind("deployed") is not None
+    assert store.get_bind(local.id) is not None
+    assert any(isinstance(event, BindAdded) and event.bind.id == "deployed" for event in events)
+    # Our own write is not mistaken for another external change.
+    assert not store.reload_external()
+    store.close()
+
+
+def test_external_replace_merges_with_unsaved_edits(tmp_path):
+    path = tmp_path / "profiles.json"
+    store = DataStore(path, save_delay=60, storage=JsonFileStorage(path))
+    kept = store.add_bind({"title": "kept", "trigger": "k", "content": "K"})
+    store.flush()
+
+    store.update_bind(kept.id, {**kept, "title": "edited"})
+    deployed = json.loads(path.read_text(encoding="utf-8"))
+    for item in deployed["profiles"]:
+        item["variables"] = {"me_name": "Remote"}
+    _replace_file(path, deployed)
+
+    assert store.reload_external()
+    assert store.get_bind(kept.id).title == "edited"
+    assert store.get_active_profile().variables["me_name"] == "Remote"
+    store.close()
+
+
+def test_search_inside_transaction_sees_edits_without_flushing(tmp_path):
+    path = tmp_path / "profiles.json"
+    store = DataStore(path, save_delay=60, storage=SqliteStorage(tmp_path / "profiles.db"))
+    store.add_bind({"title": "saved", "trigger": "saved", "content": "on disk"})
+    store.flush()
+    assert [bind.title for bind in store.search_binds("disk")] == ["saved"]
+
+    # Holds the io lock the way the writer does while it waits for the store lock.
+    writing = threading.Event()
+    release = threading.Event()
+
+    def writer():
+        with store._io_lock:
+            writing.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=writer)
+    with store.transaction():
+        store.add_bind({"title": "new", "trigger": "new", "content": "on disk soon"})
+        thread.start()
+        writing.wait(5)
+        start = time.monotonic()
+        assert [bind.title for bind in store.search_binds("disk")] == ["saved", "new"]
+        assert time.monotonic() - start < 1
+    release.set()
+    thread.join(5)
+    store.close()
+
+
+def test_journal_keeps_mutations_when_the_process_dies_before_the_writer(tmp_path):
+    path = tmp_path / "profiles.json"
+    store = DataStore(path, save_delay=60, storage=JournalStorage(path))
+    kept = store.add_bind({"title": "kept", "trigger": "k", "content": "K"})
+    store.update_bind(kept.id, {**kept, "title": "edited"})
+    with store.transaction():
+        store.add_bind({"title": "batched", "trigger": "b"})
+    # No flush or close: the store is abandoned as if the process was killed.
+    reopened = DataStore(path, storage=JournalStorage(path))
+    assert reopened.get_bind(kept.id).title == "edited"
+    assert [bind.title for bind in reopened.search_binds("batched")] == ["batched"]
+    reopened.close()
+
+
+def test_journal_compaction_keeps_lines_appended_after_the_snapshot(tmp_path):
+    path = tmp_path / "profiles.json"
+    storage = JournalStorage(path, compact_bytes=1)
+    store = DataStore(path, save_delay=60, storage=storage)
+    store.add_bind({"title": "first", "trigger": "f"})
+    mark = storage.mark()
+    snapshot = dict(store.data)
+    late = store.add_bind({"title": "late", "trigger": "l"})
+    storage.compact(snapshot, mark)
+    assert storage.journal_path.stat().st_size > 0
+    reopened = DataStore(path, storage=JournalStorage(path))
+    assert reopened.get_bind(late.id) is not None
+    assert [bind.title for bind in reopened.search_binds("first")] == ["first"]
+    reopened.close()
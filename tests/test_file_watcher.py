@@ -0,0 +1,44 @@
+import json
+import time
+
+from app.file_watcher import FileWatcher
+from app.storage import JsonFileStorage
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_failing_callback_does_not_stop_the_watcher(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text("{}", encoding="utf-8")
+    calls, errors = [], []
+
+    def on_change():
+        calls.append(path.read_text(encoding="utf-8"))
+        if len(calls) == 1:
+            raise AttributeError("'list' object has no attribute 'get'")
+
+    watcher = FileWatcher(path, on_change, interval=0.01, on_error=lambda _path, exc: errors.append(exc))
+    watcher.start()
+    try:
+        path.write_text("[1]", encoding="utf-8")
+        assert _wait_for(lambda: errors)
+        path.write_text('{"profiles": []}', encoding="utf-8")
+        assert _wait_for(lambda: len(calls) == 2)
+    finally:
+        watcher.stop()
+    assert isinstance(errors[0], AttributeError)
+
+
+def test_read_external_ignores_files_that_are_not_profiles(tmp_path):
+    path = tmp_path / "profiles.json"
+    storage = JsonFileStorage(path)
+    for payload in ([], {"profiles": {}}, {"profiles": ["x"]}, {}):
+        path.write_text(json.dumps(payload), encoding="utf-8")
+        assert storage.read_external() is None
+    path.write_text(json.dumps({"profiles": [{"id": "p"}]}), encoding="utf-8")
+    assert storage.read_external() == {"profiles": [{"id": "p"}]}
@@ -0,0 +1,22 @@
+from app import macro_compiler
+from app.macro_compiler import compile_macro
+
+
+def _keys(*values):
+    return [{"type": "press_key", "value": value} for value in values]
+
+
+def test_consecutive_keys_are_merged_into_one_send():
+    assert compile_macro(_keys("ctrl+a", "t", "enter")) == (("send", "ctrl+a, t, enter"),)
+
+
+def test_comma_keys_are_never_merged(monkeypatch):
+    # Whether "," is a valid key depends on the keyboard backend.
+    monkeypatch.setattr(macro_compiler, "is_hotkey_valid", lambda key: True)
+    assert compile_macro(_keys("a", ",", "b", "ctrl+,", "c", "d")) == (
+        ("send", "a"),
+        ("send", ","),
+        ("send", "b"),
+        ("send", "ctrl+,"),
+        ("send", "c, d"),
+    )
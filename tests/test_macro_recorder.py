@@ -0,0 +1,64 @@
+from app.macro_recorder import DELAY_QUANTUM, MERGE_GAP, compress_recording
+
+
+def _typed(text, start=0.0, step=0.1):
+    events = []
+    for index, char in enumerate(text):
+        name = "space" if char == " " else char
+        events.append(("down", name, start + index * step))
+        events.append(("up", name, start + index * step + 0.02))
+    return events
+
+
+HELLO = (
+    *_typed("/me hx"),
+    ("down", "backspace", 0.6),
+    ("down", "i", 0.7),
+    ("down", "enter", 0.8),
+    ("down", "esc", 0.9),
+)
+
+PAUSED = (
+    ("down", "a", 0.0),
+    ("down", "b", 0.1),
+    ("down", "c", 0.1 + MERGE_GAP - 0.01),
+    ("down", "d", 0.1 + MERGE_GAP - 0.01 + 1.234),
+    ("down", "e", 2.0),
+)
+
+HOTKEYS = (
+    ("down", "left ctrl", 0.0),
+    ("down", "c", 0.1),
+    ("up", "c", 0.15),
+    ("down", "с", 0.2),
+    ("up", "left ctrl", 0.25),
+    ("down", "left shift", 0.3),
+    ("down", "A", 0.35),
+    ("down", "tab", 0.4),
+    ("up", "left shift", 0.45),
+    ("down", "left alt", 0.5),
+    ("up", "left alt", 0.55),
+)
+
+
+def test_typing_coalesces_into_one_text_step():
+    assert compress_recording(HELLO) == [{"type": "type_text", "value": "/me hi", "enter": True, "delay": 0.0}]
+
+
+def test_short_gaps_merge_and_long_gaps_become_quantized_delays():
+    steps = compress_recording(PAUSED)
+    assert [step["value"] for step in steps] == ["abc", "de"]
+    assert steps[0]["delay"] == round(round(1.234 / DELAY_QUANTUM) * DELAY_QUANTUM, 2) == 1.25
+    assert steps[1]["delay"] == 0.0
+
+
+def test_merge_gap_is_the_sleep_threshold():
+    events = (("down", "a", 0.0), ("down", "b", 0.5))
+    assert len(compress_recording(events, merge_gap=1.0)) == 1
+    assert compress_recording(events, merge_gap=0.5)[0]["delay"] == 0.5
+
+
+def test_combos_keep_their_latin_key_and_bare_modifiers_disappear():
+    steps = compress_recording(HOTKEYS)
+    assert [step["type"] for step in steps] == ["press_key", "press_key", "type_text", "press_key"]
+    assert [step["value"] for step in steps] == ["ctrl+c", "ctrl+c", "A", "shift+tab"]
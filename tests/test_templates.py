@@ -0,0 +1,56 @@
+import threading
+import time
+
+import pytest
+
+from app import templates
+from app.templates import TemplateError, compile_template
+
+
+def test_nested_values_are_bounded_before_they_are_built():
+    start = time.perf_counter()
+    text = compile_template('{= len(str((("x"*3999,)*1000,)*1000))}').render({})
+    assert text == ""
+    assert time.perf_counter() - start < 0.1
+
+
+def test_join_and_string_formatting_are_bounded():
+    assert compile_template('{= join(("a",)*1000, "-"*4000)}').render({}) == ""
+    assert compile_template('{= "%999999999d" % 1}').render({}) == ""
+    assert compile_template('{= join(("a", "b"), ", ")} {= (1, 2)*2}').render({}) == "a, b (1, 2, 1, 2)"
+
+
+def test_work_budget_is_checked_inside_an_expression(monkeypatch):
+    monkeypatch.setattr(templates, "RENDER_WORK", 0)
+    with pytest.raises(TemplateError, match="budget"):
+        compile_template("{= upper(me_name)}").render({"me_name": "x"})
+    # Text and variable segments are never charged.
+    assert compile_template("{me_name} {g:он|она} {1}").render({"me_name": "x"}, ("a",)) == "x он a"
+
+
+def test_renders_do_not_fail_under_cpu_contention():
+    template = compile_template("{me_name} {= upper(me_name) + str(n)} " * 16)
+    stop = threading.Event()
+
+    def spin():
+        while not stop.is_set():
+            sum(range(1000))
+
+    threads = [threading.Thread(target=spin) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    try:
+        for n in range(300):
+            assert template.render({"me_name": "bob"}, n=n).startswith(f"bob BOB{n} ")
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def test_arg_call_waits_for_its_highest_constant_index():
+    assert compile_template("{= arg(2)}").arg_count == 2
+    assert compile_template("{= arg(1)} {3}").arg_count == 3
+    assert compile_template("{= arg(n)}").arg_count == 1
+    assert compile_template("{args}").arg_count == 1
+    assert compile_template("plain").arg_count == 0
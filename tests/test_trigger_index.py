@@ -0,0 +1,50 @@
+import random
+
+from app.trigger_index import PrefixIndex
+
+
+def _tops(index):
+    found = {}
+
+    def walk(node, path):
+        found[path] = [item[0] for item in node.top]
+        for ch, child in node.children.items():
+            walk(child, path + ch)
+
+    walk(index._root, "")
+    return found
+
+
+def test_put_and_remove_match_a_full_rebuild():
+    rng = random.Random(7)
+    usage = {}
+    binds = {}
+    index = PrefixIndex((), usage, limit=3)
+    for step in range(1500):
+        roll = rng.random()
+        if roll < 0.3 and binds:
+            bind_id = rng.choice(sorted(binds))
+            del binds[bind_id]
+            index.remove(bind_id)
+        elif roll < 0.7:
+            bind_id = str(rng.randint(0, 200))
+            trigger = "".join(rng.choice("abc") for _ in range(rng.randint(1, 4)))
+            binds[bind_id] = {"id": bind_id, "trigger": trigger, "title": trigger}
+            index.put(binds[bind_id])
+        elif binds:
+            index.bump(rng.choice(sorted(binds)))
+        if step % 100 == 0:
+            rebuilt = PrefixIndex(binds.values(), dict(usage), limit=3)
+            assert {path: [index._rank(index._items[i]) for i in ids] for path, ids in _tops(index).items()} == {
+                path: [rebuilt._rank(rebuilt._items[i]) for i in ids] for path, ids in _tops(rebuilt).items()
+            }
+
+
+def test_removed_trigger_leaves_no_suggestion():
+    index = PrefixIndex([{"id": "a", "trigger": "hello"}, {"id": "b", "trigger": "help"}], {})
+    index.remove("b")
+    cursor = index.cursor()
+    for ch in "hel":
+        suggestions = cursor.advance(ch)
+    assert [item[0] for item in suggestions] == ["a"]
+    assert cursor.advance("p") == []